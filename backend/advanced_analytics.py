@@ -256,7 +256,7 @@ class EnsemblePredictionSystem:
         """Run quick simulation analysis for current game state"""
         mines_remaining = game_session.mine_count
         tiles_revealed = game_session.tiles_revealed
-        safe_tiles_remaining = (25 - game_session.mine_count) - tiles_revealed
+        safe_tiles_remaining = (self.prob_engine.grid_size - game_session.mine_count) - tiles_revealed
         
         if safe_tiles_remaining <= 0:
             return {
@@ -288,7 +288,7 @@ class EnsemblePredictionSystem:
     def _simulate_continue_scenario(self, game_session: GameSession) -> float:
         """Simulate the expected value of continuing"""
         mines_remaining = game_session.mine_count
-        tiles_remaining = 25 - game_session.tiles_revealed
+        tiles_remaining = self.prob_engine.grid_size - game_session.tiles_revealed
         safe_tiles_remaining = tiles_remaining - mines_remaining
         
         if safe_tiles_remaining <= 0 or tiles_remaining <= 0:
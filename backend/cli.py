@@ -0,0 +1,78 @@
+import asyncio
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from fairness_audit import audit_nonce_range
+from game_config import DEFAULT_GAME_CONFIG, get_game_config, load_game_profiles
+from migrations import migrate_tile_lists
+from provably_fair import ProvablyFairSystem
+
+ROOT_DIR = Path(__file__).parent
+
+app = typer.Typer(help="Operational commands for the Mines backend")
+
+@app.callback()
+def main():
+    """Operational commands for the Mines backend"""
+
+@app.command("fairness-audit")
+def fairness_audit(
+    mine_counts: List[int] = typer.Option([1, 3, 5, 10, 24], "--mine-count", "-m", help="Repeat for several mine counts"),
+    games: int = typer.Option(1000000, help="Layouts generated per mine count"),
+    profile: str = typer.Option(DEFAULT_GAME_CONFIG.name),
+    server_seed: Optional[str] = typer.Option(None, help="Random when omitted"),
+    client_seed: str = typer.Option("fairness-audit"),
+    nonce_start: int = typer.Option(0),
+    workers: int = typer.Option(os.cpu_count() or 1, help="Processes generating layouts")
+):
+    """Audit mine placement over a nonce range and print the report as JSON"""
+    load_game_profiles(os.environ.get('GAME_PROFILES', ''))
+    try:
+        config = get_game_config(profile)
+        for mine_count in mine_counts:
+            config.check_state(mine_count)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    
+    fairness = ProvablyFairSystem(config)
+    server_seed = server_seed or fairness.generate_server_seed()
+    if not fairness.validate_fairness_parameters(server_seed, client_seed, nonce_start):
+        raise typer.BadParameter("Invalid fairness parameters")
+    
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        audit = audit_nonce_range(config, server_seed, client_seed, nonce_start, games, mine_counts, executor)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    report = audit.result().dict()
+    report["server_seed_hash"] = fairness.create_seed_hash(server_seed)
+    typer.echo(json.dumps(report, default=str, indent=2))
+
+@app.command("migrate-game-state")
+def migrate_game_state(batch_size: int = typer.Option(1000, help="Documents per bulk write")):
+    """Rewrite stored game sessions from tile lists to mine and revealed masks"""
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        migrated = asyncio.run(migrate_tile_lists(client[os.environ['DB_NAME']].game_sessions, batch_size))
+    finally:
+        client.close()
+    typer.echo(f"Migrated {migrated} game sessions")
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,254 @@
+import math
+import threading
+import numpy as np
+from concurrent.futures import Executor, as_completed
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from models import ChiSquareTest, FairnessAuditResult, KolmogorovSmirnovTest, MineCountAudit, ModuloBias
+from game_config import DEFAULT_GAME_CONFIG, GameConfig
+from monte_carlo_engine import ProgressCallback, SimulationCancelled
+from provably_fair import WORD_BYTES, ProvablyFairSystem
+
+AUDIT_CHUNK_SIZE = 20000  # Nonces per process-pool task
+
+def chi_square_sf(statistic: float, degrees_of_freedom: int) -> float:
+    """Upper tail probability of the chi-square distribution"""
+    # Regularized upper incomplete gamma Q(df / 2, statistic / 2), as in Numerical Recipes
+    if statistic <= 0:
+        return 1.0
+    a = degrees_of_freedom / 2
+    x = statistic / 2
+    log_prefactor = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        # The series for the lower tail converges quickly here
+        term = total = 1 / a
+        denominator = a
+        for _ in range(10000):
+            denominator += 1
+            term *= x / denominator
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return min(max(1 - total * math.exp(log_prefactor), 0.0), 1.0)
+    
+    # Continued fraction for the upper tail (modified Lentz)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    fraction = d
+    for i in range(1, 10000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        fraction *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(max(math.exp(log_prefactor) * fraction, 0.0), 1.0)
+
+def kolmogorov_sf(statistic: float, samples: int) -> float:
+    """Asymptotic p-value of a one-sample KS statistic (Stephens' small-sample correction)"""
+    if samples == 0 or statistic <= 0:
+        return 1.0
+    root = math.sqrt(samples)
+    scaled = (root + 0.12 + 0.11 / root) * statistic
+    if scaled < 0.2:
+        return 1.0  # The alternating series converges slowly here and the tail is 1 to double precision
+    total = sum(2 * (-1) ** (k - 1) * math.exp(-2 * k * k * scaled * scaled) for k in range(1, 101))
+    return min(max(total, 0.0), 1.0)
+
+def scaled_chi_square(counts: np.ndarray, games: int, probability: float) -> ChiSquareTest:
+    """Chi-square test of exchangeable indicator counts, such as tiles, that sum to a fixed total in every game"""
+    # A fixed total makes the cells negatively correlated, which the (cells - 1) / cells factor corrects
+    cells = len(counts)
+    expected = games * probability
+    variance = games * probability * (1 - probability)
+    statistic = (cells - 1) / cells * float(np.sum((counts - expected) ** 2)) / variance
+    return ChiSquareTest(statistic=statistic, degrees_of_freedom=cells - 1,
+                         p_value=chi_square_sf(statistic, cells - 1))
+
+def pair_chi_square(pair_counts: np.ndarray, games: int, mine_count: int) -> Optional[ChiSquareTest]:
+    """Chi-square test of mine pair co-occurrence beyond what the per-tile frequencies explain"""
+    # Uniform layouts look the same after relabelling tiles, so once the constant and per-tile parts
+    # are projected out, the pair counts share one variance over grid_size * (grid_size - 3) / 2 cells
+    grid_size = len(pair_counts)
+    both = mine_count * (mine_count - 1) / (grid_size * (grid_size - 1))
+    three = both * (mine_count - 2) / (grid_size - 2) if grid_size > 2 else 0.0
+    four = three * (mine_count - 3) / (grid_size - 3) if grid_size > 3 else 0.0
+    variance = both * (1 - both) - 2 * (three - both * both) + (four - both * both)
+    degrees_of_freedom = grid_size * (grid_size - 3) // 2
+    if degrees_of_freedom < 1 or variance < 1e-12:
+        return None  # With one mine or one safe tile, pairs are fixed by the tile counts
+    
+    counts = pair_counts + pair_counts.T
+    row_totals = counts.sum(axis=1)
+    total = row_totals.sum() / 2
+    tile_part = row_totals / (grid_size - 2) - total / ((grid_size - 1) * (grid_size - 2))
+    residual = counts - tile_part[:, None] - tile_part[None, :]
+    low, high = np.triu_indices(grid_size, 1)
+    statistic = float(np.sum(residual[low, high] ** 2)) / (games * variance)
+    return ChiSquareTest(statistic=statistic, degrees_of_freedom=degrees_of_freedom,
+                         p_value=chi_square_sf(statistic, degrees_of_freedom))
+
+def modulo_bias(grid_size: int, mine_count: int, word_bits: int = WORD_BYTES * 8) -> ModuloBias:
+    """Exact bias of reducing uniform words modulo the free tiles, over every draw of one game"""
+    space = 1 << word_bits
+    max_relative_bias = 0.0
+    total_variation = 0.0
+    for remaining in range(grid_size, grid_size - mine_count, -1):
+        excess = space % remaining
+        if excess:
+            # The lowest `excess` residues get one extra word each
+            max_relative_bias = max(max_relative_bias, (remaining - excess) / space)
+            total_variation += excess * (remaining - excess) / (remaining * space)
+    return ModuloBias(
+        max_relative_bias=max_relative_bias,
+        total_variation_bound=total_variation,
+        games_to_detect=1 / total_variation ** 2 if total_variation else None
+    )
+
+class MineCountCounters:
+    """Fixed-size tile, pair and lowest-mine frequency counters for one mine count"""
+    
+    def __init__(self, grid_size: int, mine_count: int):
+        self.grid_size = grid_size
+        self.mine_count = mine_count
+        self.games = 0
+        self.positions = np.zeros(grid_size, dtype=np.int64)
+        self.pairs = np.zeros(grid_size * grid_size, dtype=np.int64)  # Flat index low * grid_size + high
+        self.min_positions = np.zeros(grid_size, dtype=np.int64)
+    
+    def add(self, layouts: np.ndarray):
+        """Count a (games, mine_count) array of mine positions"""
+        layouts = np.sort(layouts, axis=1)
+        self.games += len(layouts)
+        self.positions += np.bincount(layouts.ravel(), minlength=self.grid_size)
+        self.min_positions += np.bincount(layouts[:, 0], minlength=self.grid_size)
+        if self.mine_count >= 2:
+            low, high = np.triu_indices(self.mine_count, 1)
+            pair_index = layouts[:, low] * self.grid_size + layouts[:, high]
+            self.pairs += np.bincount(pair_index.ravel(), minlength=self.grid_size * self.grid_size)
+    
+    def merge(self, other: "MineCountCounters"):
+        self.games += other.games
+        self.positions += other.positions
+        self.pairs += other.pairs
+        self.min_positions += other.min_positions
+    
+    def report(self) -> MineCountAudit:
+        grid_size, mine_count, games = self.grid_size, self.mine_count, self.games
+        tile_probability = mine_count / grid_size
+        
+        # P(lowest mine <= k) = 1 - C(grid_size - 1 - k, mine_count) / C(grid_size, mine_count)
+        layouts_total = math.comb(grid_size, mine_count)
+        exact_cdf = np.array([1 - math.comb(grid_size - 1 - k, mine_count) / layouts_total for k in range(grid_size)])
+        ks_statistic = float(np.max(np.abs(np.cumsum(self.min_positions) / games - exact_cdf)))
+        
+        return MineCountAudit(
+            games=games,
+            max_position_deviation=float(np.max(np.abs(self.positions / games - tile_probability))),
+            position_chi_square=scaled_chi_square(self.positions, games, tile_probability),
+            pair_chi_square=pair_chi_square(self.pairs.reshape(grid_size, grid_size), games, mine_count),
+            # Discrete distributions make the continuous KS p-value conservative
+            min_position_ks=KolmogorovSmirnovTest(statistic=ks_statistic,
+                                                  p_value=kolmogorov_sf(ks_statistic, games)),
+            modulo_bias=modulo_bias(grid_size, mine_count)
+        )
+
+class FairnessAudit:
+    """Streaming mine placement statistics; memory does not grow with the number of games"""
+    
+    def __init__(self, config: GameConfig = DEFAULT_GAME_CONFIG, source: str = "nonce_range"):
+        self.config = config
+        self.source = source
+        self.counters: Dict[int, MineCountCounters] = {}
+    
+    @property
+    def games(self) -> int:
+        return sum(counters.games for counters in self.counters.values())
+    
+    def _counters(self, mine_count: int) -> MineCountCounters:
+        counters = self.counters.get(mine_count)
+        if counters is None:
+            self.config.check_state(mine_count)
+            counters = self.counters[mine_count] = MineCountCounters(self.config.grid_size, mine_count)
+        return counters
+    
+    def add_layouts(self, mine_count: int, layouts: Sequence[Sequence[int]]):
+        """Count layouts that all have `mine_count` mines"""
+        if len(layouts):
+            self._counters(mine_count).add(np.asarray(layouts, dtype=np.int64).reshape(-1, mine_count))
+    
+    def add_games(self, games: Iterable[Tuple[int, List[int]]]):
+        """Count (mine_count, mine_positions) pairs of mixed mine counts"""
+        grouped: Dict[int, List[List[int]]] = {}
+        for mine_count, positions in games:
+            grouped.setdefault(mine_count, []).append(positions)
+        for mine_count, layouts in grouped.items():
+            self.add_layouts(mine_count, layouts)
+    
+    def merge(self, other: "FairnessAudit"):
+        for mine_count, counters in other.counters.items():
+            self._counters(mine_count).merge(counters)
+    
+    def result(self) -> FairnessAuditResult:
+        # Mongo documents need string keys
+        return FairnessAuditResult(
+            profile=self.config.name,
+            source=self.source,
+            games=self.games,
+            mine_counts={str(mine_count): self.counters[mine_count].report()
+                         for mine_count in sorted(self.counters) if self.counters[mine_count].games}
+        )
+
+def audit_chunk(config: GameConfig, server_seed: str, client_seed: str, nonce_start: int, count: int,
+                mine_count: int) -> FairnessAudit:
+    """Process-pool entry point: count the layouts of one nonce range"""
+    audit = FairnessAudit(config)
+    layouts = ProvablyFairSystem(config).generate_game_results(server_seed, client_seed, nonce_start, count, mine_count)
+    audit.add_layouts(mine_count, layouts)
+    return audit
+
+def audit_nonce_range(config: GameConfig, server_seed: str, client_seed: str, nonce_start: int,
+                      games_per_mine_count: int, mine_counts: List[int], executor: Optional[Executor] = None,
+                      chunk_size: int = AUDIT_CHUNK_SIZE, progress: Optional[ProgressCallback] = None,
+                      cancel_event: Optional[threading.Event] = None) -> FairnessAudit:
+    """Audit generate_game_result over the same nonce range for every mine count"""
+    nonce_stop = nonce_start + games_per_mine_count
+    chunks = [
+        (mine_count, chunk_start, min(chunk_size, nonce_stop - chunk_start))
+        for mine_count in mine_counts
+        for chunk_start in range(nonce_start, nonce_stop, chunk_size)
+    ]
+    total_games = games_per_mine_count * len(mine_counts)
+    audit = FairnessAudit(config)
+    
+    def merge(chunk_audit: FairnessAudit):
+        # Counters only add up, so the result does not depend on the order chunks complete in
+        audit.merge(chunk_audit)
+        if progress is not None:
+            progress(audit.games / total_games, audit.result())
+    
+    if executor is None:
+        for mine_count, chunk_start, count in chunks:
+            if cancel_event is not None and cancel_event.is_set():
+                raise SimulationCancelled()
+            merge(audit_chunk(config, server_seed, client_seed, chunk_start, count, mine_count))
+    else:
+        futures = [
+            executor.submit(audit_chunk, config, server_seed, client_seed, chunk_start, count, mine_count)
+            for mine_count, chunk_start, count in chunks
+        ]
+        try:
+            for future in as_completed(futures):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise SimulationCancelled()
+                merge(future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+    return audit
@@ -0,0 +1,64 @@
+import json
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+MAX_GRID_SIZE = 63  # Game state masks are stored as signed 64-bit Mongo integers
+
+@dataclass(frozen=True)
+class GameConfig:
+    """Board geometry and house edge of one Mines variant"""
+    
+    name: str = "default"
+    rows: int = 5
+    columns: int = 5
+    house_edge_factor: float = 0.95  # Share of the fair multiplier step paid on each reveal
+    
+    def __post_init__(self):
+        if self.rows < 1 or self.columns < 1 or self.rows * self.columns < 2:
+            raise ValueError("A game profile needs at least two tiles")
+        if self.rows * self.columns > MAX_GRID_SIZE:
+            raise ValueError(f"A game profile can have at most {MAX_GRID_SIZE} tiles")
+        if not 0 < self.house_edge_factor <= 1:
+            raise ValueError("house_edge_factor must be in (0, 1]")
+    
+    @property
+    def grid_size(self) -> int:
+        return self.rows * self.columns
+    
+    @property
+    def max_mines(self) -> int:
+        """At least one tile has to be safe"""
+        return self.grid_size - 1
+    
+    def check_state(self, mine_count: int, tiles_revealed: int = 0):
+        """Raise ValueError unless the state can occur on this board"""
+        if not 1 <= mine_count <= self.max_mines:
+            raise ValueError(f"mine_count must be between 1 and {self.max_mines} for the {self.name} profile")
+        if not 0 <= tiles_revealed <= self.grid_size - mine_count:
+            raise ValueError(f"tiles_revealed exceeds the safe tiles for the {self.name} profile")
+    
+    def describe(self) -> Dict:
+        return {**asdict(self), 'grid_size': self.grid_size, 'max_mines': self.max_mines}
+
+DEFAULT_GAME_CONFIG = GameConfig()
+
+GAME_PROFILES: Dict[str, GameConfig] = {DEFAULT_GAME_CONFIG.name: DEFAULT_GAME_CONFIG}
+
+def register_game_config(config: GameConfig) -> GameConfig:
+    """Make a profile selectable by name; a name cannot be rebound to different settings"""
+    existing = GAME_PROFILES.get(config.name)
+    if existing is not None and existing != config:
+        raise ValueError(f"Game profile {config.name} is already registered")
+    GAME_PROFILES[config.name] = config
+    return config
+
+def get_game_config(name: str = DEFAULT_GAME_CONFIG.name) -> GameConfig:
+    """Registered profile by name"""
+    config = GAME_PROFILES.get(name)
+    if config is None:
+        raise ValueError(f"Unknown game profile: {name}")
+    return config
+
+def load_game_profiles(spec: str) -> List[GameConfig]:
+    """Register profiles from a JSON list of GameConfig fields"""
+    return [register_game_config(GameConfig(**fields)) for fields in json.loads(spec or "[]")]
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import mmap
+import os
+import secrets
+from binascii import hexlify
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DIGEST_BYTES = 32
+CHECKPOINT_INTERVAL = 10000  # Seeds between stored anchor digests
+
+def chain_link(digest: bytes) -> bytes:
+    """Commitment to a seed: SHA-256 of its hex form, exactly as create_seed_hash computes it"""
+    return hashlib.sha256(hexlify(digest)).digest()
+
+class HashChain:
+    """Reverse SHA-256 chain of server seeds, stored as raw digests in a memory-mapped file"""
+    
+    # Seed i hashes to seed i - 1 and seed 0 hashes to the published terminal hash, so seeds are
+    # served in index order and revealing one never exposes a seed that has not been played yet
+    
+    def __init__(self, path: str, length: int, terminal_hash: str, checkpoint_interval: int, checkpoints: List[str]):
+        self.path = path
+        self.length = length
+        self.terminal_hash = terminal_hash
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoints = [bytes.fromhex(checkpoint) for checkpoint in checkpoints]  # Seeds at multiples of the interval
+        with open(path, "rb") as chain_file:
+            if os.fstat(chain_file.fileno()).st_size != length * DIGEST_BYTES:
+                raise ValueError(f"Hash chain file {path} does not hold {length} digests")
+            self._view = mmap.mmap(chain_file.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    @classmethod
+    def generate(cls, path: str, length: int, checkpoint_interval: int = CHECKPOINT_INTERVAL,
+                 root_seed: Optional[bytes] = None) -> "HashChain":
+        """Write a new chain in one streaming pass from a random root, which becomes the last seed served"""
+        if length < 1 or checkpoint_interval < 1:
+            raise ValueError("A hash chain needs at least one seed and a positive checkpoint interval")
+        digest = root_seed or secrets.token_bytes(DIGEST_BYTES)
+        checkpoints = []
+        with open(path, "w+b") as chain_file:
+            chain_file.truncate(length * DIGEST_BYTES)
+            with mmap.mmap(chain_file.fileno(), length * DIGEST_BYTES) as view:
+                # Hashing runs from the last seed served to the first, so the file fills back to front
+                for index in range(length - 1, -1, -1):
+                    offset = index * DIGEST_BYTES
+                    view[offset:offset + DIGEST_BYTES] = digest
+                    if index % checkpoint_interval == 0:
+                        checkpoints.append(digest.hex())
+                    digest = chain_link(digest)
+                view.flush()
+        
+        checkpoints.reverse()
+        with open(cls.metadata_path(path), "w") as metadata_file:
+            json.dump({
+                "length": length,
+                "terminal_hash": digest.hex(),
+                "checkpoint_interval": checkpoint_interval,
+                "checkpoints": checkpoints
+            }, metadata_file)
+        return cls(path, length, digest.hex(), checkpoint_interval, checkpoints)
+    
+    @classmethod
+    def open(cls, path: str) -> "HashChain":
+        """Map an existing chain file and its metadata"""
+        with open(cls.metadata_path(path)) as metadata_file:
+            metadata = json.load(metadata_file)
+        return cls(path, **metadata)
+    
+    @staticmethod
+    def metadata_path(path: str) -> str:
+        return path + ".json"
+    
+    def __len__(self) -> int:
+        return self.length
+    
+    def digest_at(self, index: int) -> bytes:
+        if not 0 <= index < self.length:
+            raise IndexError(f"Hash chain index {index} is out of range")
+        offset = index * DIGEST_BYTES
+        return self._view[offset:offset + DIGEST_BYTES]
+    
+    def seed_at(self, index: int) -> str:
+        """Server seed for the index-th game served from the chain"""
+        return self.digest_at(index).hex()
+    
+    def commitment_at(self, index: int) -> str:
+        """Published hash of the index-th seed, which is the previous seed or the terminal hash"""
+        return self.terminal_hash if index == 0 else self.seed_at(index - 1)
+    
+    def verify_segment(self, start: int = 0, stop: Optional[int] = None) -> Optional[int]:
+        """Check every link in [start, stop) in one linear pass; returns the first bad index or None"""
+        stop = self.length if stop is None else min(stop, self.length)
+        if start >= stop:
+            return None
+        view, sha256 = self._view, hashlib.sha256
+        expected = bytes.fromhex(self.terminal_hash) if start == 0 else self.digest_at(start - 1)
+        for index in range(start, stop):
+            offset = index * DIGEST_BYTES
+            digest = view[offset:offset + DIGEST_BYTES]
+            # chain_link inlined; this loop runs once per seed in the chain
+            if sha256(hexlify(digest)).digest() != expected:
+                return index
+            if index % self.checkpoint_interval == 0 and digest != self.checkpoints[index // self.checkpoint_interval]:
+                return index
+            expected = digest
+        return None
+    
+    def verify_seed(self, index: int, server_seed: str) -> bool:
+        """Check a revealed seed against the nearest checkpoint at or below its index"""
+        if not 0 <= index < self.length:
+            return False
+        checkpoint = index // self.checkpoint_interval
+        digest = bytes.fromhex(server_seed)
+        for _ in range(index - checkpoint * self.checkpoint_interval):
+            digest = chain_link(digest)
+        return digest == self.checkpoints[checkpoint]
+    
+    def segments(self, segment_size: int, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """Consecutive [start, stop) ranges that together cover the requested span"""
+        stop = self.length if stop is None else min(stop, self.length)
+        for segment_start in range(start, stop, segment_size):
+            yield segment_start, min(segment_start + segment_size, stop)
+    
+    def describe(self) -> Dict:
+        return {
+            "terminal_hash": self.terminal_hash,
+            "length": self.length,
+            "checkpoint_interval": self.checkpoint_interval
+        }
+    
+    def close(self):
+        self._view.close()
+
+_open_chains: Dict[str, HashChain] = {}
+
+def verify_chain_segment(path: str, start: int, stop: int) -> Optional[int]:
+    """Process-pool entry point: verify one segment with a per-process mapping of the chain"""
+    chain = _open_chains.get(path)
+    if chain is None:
+        chain = _open_chains[path] = HashChain.open(path)
+    return chain.verify_segment(start, stop)
@@ -0,0 +1,30 @@
+import logging
+
+from pymongo import UpdateOne
+
+from models import tile_masks
+
+logger = logging.getLogger(__name__)
+
+async def migrate_tile_lists(collection, batch_size: int = 1000) -> int:
+    """Replace stored tile lists with mine and revealed masks; returns documents migrated"""
+    # Safe to rerun or interrupt: only documents that still carry a tile list are touched
+    migrated = 0
+    operations = []
+    cursor = collection.find({"tiles": {"$exists": True}}, {"_id": 1, "tiles.position": 1, "tiles.status": 1,
+                                                             "tiles.is_mine": 1})
+    async for game_doc in cursor:
+        mine_mask, revealed_mask = tile_masks(game_doc["tiles"])
+        operations.append(UpdateOne(
+            {"_id": game_doc["_id"]},
+            {"$set": {"mine_mask": mine_mask, "revealed_mask": revealed_mask}, "$unset": {"tiles": ""}}
+        ))
+        if len(operations) >= batch_size:
+            await collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+            operations = []
+            logger.info(f"Migrated {migrated} game sessions to bitmask state")
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+        migrated += len(operations)
+    return migrated
@@ -1,43 +1,118 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 from datetime import datetime
 import uuid
 from enum import Enum
+from game_config import DEFAULT_GAME_CONFIG, get_game_config
 
 class GameStatus(str, Enum):
     ACTIVE = "active"
     COMPLETED = "completed"
     LOST = "lost"
 
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class SeedPairStatus(str, Enum):
+    ACTIVE = "active"
+    REVEALED = "revealed"
+
 class TileStatus(str, Enum):
     HIDDEN = "hidden"
     REVEALED_SAFE = "revealed_safe"
     REVEALED_MINE = "revealed_mine"
 
 class Tile(BaseModel):
-    position: int = Field(..., description="Position on 5x5 grid (0-24)")
+    position: int = Field(..., description="Position on the grid (0-24 on the default 5x5 board)")
     status: TileStatus = TileStatus.HIDDEN
     is_mine: bool = False
 
-class GameSession(BaseModel):
+def positions_mask(positions: Iterable[int]) -> int:
+    """Bitmask with bit i set for every tile position i"""
+    mask = 0
+    for position in positions:
+        mask |= 1 << position
+    return mask
+
+def mask_positions(mask: int) -> List[int]:
+    """Ascending tile positions of the set bits"""
+    positions = []
+    while mask:
+        low_bit = mask & -mask
+        positions.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return positions
+
+def tile_masks(tiles: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Mine and revealed masks of a stored tile list, the layout used before masks"""
+    mine_mask = positions_mask(tile["position"] for tile in tiles if tile["is_mine"])
+    revealed_mask = positions_mask(tile["position"] for tile in tiles if tile["status"] != TileStatus.HIDDEN)
+    return mine_mask, revealed_mask
+
+class GameSessionBase(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    mine_count: int = Field(..., ge=1, le=24, description="Number of mines (1-24)")
+    profile: str = Field(default=DEFAULT_GAME_CONFIG.name, description="Game profile (board size and house edge)")
+    mine_count: int = Field(..., ge=1, description="Number of mines (1-24 on the default profile)")
     bet_amount: float = Field(..., gt=0, description="Initial bet amount")
     current_multiplier: float = Field(default=1.0, description="Current multiplier")
     tiles_revealed: int = Field(default=0, description="Number of safe tiles revealed")
     status: GameStatus = GameStatus.ACTIVE
-    tiles: List[Tile] = Field(default_factory=list)
+    user_id: Optional[str] = None
     server_seed: Optional[str] = None
     client_seed: Optional[str] = None
     nonce: int = Field(default=0)
+    seed_pair_id: Optional[str] = Field(default=None, description="Seed pair the game drew its seeds and nonce from")
+    chain_index: Optional[int] = Field(default=None, description="Position of the server seed in the active hash chain")
     cash_out_amount: Optional[float] = None
     final_multiplier: Optional[float] = None
+    revealed_mask: int = Field(default=0, ge=0, description="Bit i is set once tile i has been revealed")
+
+class GameSessionView(GameSessionBase):
+    tiles: List[Tile] = Field(default_factory=list, description="Derived from the masks; hidden mines read as safe")
+
+class GameSession(GameSessionBase):
+    mine_mask: int = Field(default=0, ge=0, description="Bit i is set when tile i holds a mine")
+    
+    @model_validator(mode="before")
+    @classmethod
+    def convert_tile_list(cls, data: Any) -> Any:
+        """Read documents written before tile lists were replaced by masks"""
+        if isinstance(data, dict) and "tiles" in data and "mine_mask" not in data:
+            data = dict(data)
+            data["mine_mask"], data["revealed_mask"] = tile_masks(data.pop("tiles"))
+        return data
+    
+    def to_view(self) -> GameSessionView:
+        """API shape with the tile list; mines stay hidden while the game is active"""
+        mine_mask = self.mine_mask if self.status != GameStatus.ACTIVE else self.mine_mask & self.revealed_mask
+        tiles = []
+        for position in range(get_game_config(self.profile).grid_size):
+            bit = 1 << position
+            if not self.revealed_mask & bit:
+                status = TileStatus.HIDDEN
+            elif self.mine_mask & bit:
+                status = TileStatus.REVEALED_MINE
+            else:
+                status = TileStatus.REVEALED_SAFE
+            tiles.append(Tile(position=position, status=status, is_mine=bool(mine_mask & bit)))
+        return GameSessionView(**self.dict(exclude={"mine_mask"}), tiles=tiles)
 
 class GameSessionCreate(BaseModel):
-    mine_count: int = Field(..., ge=1, le=24)
+    profile: str = Field(default=DEFAULT_GAME_CONFIG.name, description="Game profile (board size and house edge)")
+    mine_count: int = Field(..., ge=1)
     bet_amount: float = Field(..., gt=0)
     client_seed: Optional[str] = None
+    user_id: Optional[str] = Field(default=None, description="Play on the user's active seed pair with an incrementing nonce")
+    
+    @model_validator(mode="after")
+    def check_profile(self):
+        get_game_config(self.profile).check_state(self.mine_count)
+        return self
 
 class GameSessionUpdate(BaseModel):
     revealed_positions: List[int] = Field(..., description="List of tile positions to reveal")
@@ -51,6 +126,7 @@ class ProbabilityAnalysis(BaseModel):
 
 class MonteCarloResult(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    profile: str = DEFAULT_GAME_CONFIG.name
     mine_count: int
     iterations: int = Field(..., description="Number of simulation runs")
     average_multiplier: float
@@ -59,12 +135,176 @@ class MonteCarloResult(BaseModel):
     optimal_cash_out_point: int = Field(..., description="Optimal number of tiles to reveal")
     expected_profit: float
     confidence_interval: Dict[str, float] = Field(..., description="95% confidence interval")
+    iterations_used: Optional[Dict[str, int]] = Field(default=None, description="Games simulated per cash-out point (adaptive runs)")
+    achieved_precision: Optional[Dict[str, Dict[str, float]]] = Field(default=None, description="Half-width and relative error per cash-out point (adaptive runs)")
+    target_met: Optional[bool] = Field(default=None, description="Whether every point met the precision target (adaptive runs)")
+    effective_sample_size: Optional[float] = Field(default=None, description="Naive-sampling games giving the same variance at the optimal point (variance-reduced runs)")
+    variance_reduction_factor: Optional[float] = Field(default=None, description="Naive-sampling variance over achieved variance at the optimal point (variance-reduced runs)")
 
 class MonteCarloRequest(BaseModel):
-    mine_count: int = Field(..., ge=1, le=24)
-    iterations: int = Field(default=10000, ge=1000, le=100000)
+    profile: str = Field(default=DEFAULT_GAME_CONFIG.name, description="Game profile (board size and house edge)")
+    mine_count: int = Field(..., ge=1)
+    iterations: int = Field(default=10000, ge=1000, le=100_000_000)
     bet_amount: float = Field(default=1.0, gt=0)
     cash_out_points: Optional[List[int]] = Field(default=None, description="Specific cash-out points to analyze")
+    engine: str = Field(default="vectorized", pattern="^(vectorized|legacy|exact)$", description="Simulation engine: vectorized, legacy or exact (closed form, no sampling)")
+    single_pass: bool = Field(default=False, description="Evaluate all cash-out points from one set of simulated games (vectorized engine)")
+    seed: Optional[int] = Field(default=None, ge=0, description="Seed for reproducible results (vectorized engine)")
+    target_half_width: Optional[float] = Field(default=None, gt=0, description="Stop each point once its 95% CI half-width is this small")
+    target_relative_error: Optional[float] = Field(default=None, gt=0, description="Stop each point once its relative error is this small")
+    max_iterations: Optional[int] = Field(default=None, ge=1000, le=100_000_000, description="Per-point game budget for adaptive runs")
+    max_seconds: Optional[float] = Field(default=None, gt=0, description="Wall-clock budget for adaptive runs")
+    variance_reduction: str = Field(default="none", pattern="^(none|importance_sampling|antithetic|control_variate)$", description="Variance reduction for the vectorized engine: none, importance_sampling (tilted reveals with likelihood-ratio weights), antithetic (games paired with their reversed reveal order) or control_variate (clipped safe run with its exact mean)")
+    
+    @property
+    def is_adaptive(self) -> bool:
+        """Precision-targeted runs simulate rounds of `iterations` games until the target is met"""
+        return self.target_half_width is not None or self.target_relative_error is not None
+
+    @model_validator(mode="after")
+    def check_engine_iterations(self):
+        get_game_config(self.profile).check_state(self.mine_count)
+        if self.engine == "legacy" and self.iterations > 100000:
+            raise ValueError("The legacy engine supports at most 100000 iterations")
+        if self.engine != "vectorized" and self.is_adaptive:
+            raise ValueError("Precision targets require the vectorized engine")
+        if self.variance_reduction != "none":
+            if self.engine != "vectorized":
+                raise ValueError("Variance reduction requires the vectorized engine")
+            if self.is_adaptive:
+                raise ValueError("Variance reduction does not support precision targets")
+        return self
+
+class BankrollSimulationRequest(BaseModel):
+    profile: str = Field(default=DEFAULT_GAME_CONFIG.name, description="Game profile (board size and house edge)")
+    mine_count: int = Field(..., ge=1)
+    cash_out_point: int = Field(..., ge=1, description="Tiles revealed before cashing out each game")
+    initial_bankroll: float = Field(default=100.0, gt=0)
+    bet_size: float = Field(default=1.0, gt=0)
+    num_games: int = Field(default=1000, ge=1, le=100000, description="Maximum games per path")
+    num_paths: int = Field(default=10000, ge=1, le=1000000, description="Independent bankroll paths")
+    seed: Optional[int] = Field(default=None, ge=0, description="Seed for reproducible results")
+
+    @model_validator(mode="after")
+    def check_workload(self):
+        config = get_game_config(self.profile)
+        config.check_state(self.mine_count)
+        if self.cash_out_point > config.grid_size - self.mine_count:
+            raise ValueError("Cash-out point exceeds the number of safe tiles")
+        if self.num_games * self.num_paths > 200_000_000:
+            raise ValueError("num_games * num_paths must not exceed 200000000")
+        return self
+
+class BankrollSimulationResult(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    profile: str = DEFAULT_GAME_CONFIG.name
+    mine_count: int
+    cash_out_point: int
+    initial_bankroll: float
+    bet_size: float
+    num_games: int
+    num_paths: int
+    ruin_probability: float = Field(..., description="Share of paths that could no longer cover a bet")
+    time_to_ruin_quantiles: Dict[str, float] = Field(..., description="Games played before ruin, over ruined paths")
+    final_bankroll_quantiles: Dict[str, float]
+    mean_final_bankroll: float
+    percentile_bands: List[Dict[str, float]] = Field(..., description="Bankroll percentiles at checkpoints over time")
+
+class StrategyPolicySpec(BaseModel):
+    type: str = Field(..., pattern="^(fixed|target_multiplier|recommendation)$", description="fixed, target_multiplier or recommendation (follow the strategy engine)")
+    name: Optional[str] = Field(default=None, description="Label used in comparison results")
+    cash_out_point: Optional[int] = Field(default=None, ge=1, description="Tiles to reveal (fixed policies)")
+    target_multiplier: Optional[float] = Field(default=None, gt=1, description="Cash out once the multiplier reaches this value")
+    stop_loss: Optional[float] = Field(default=None, gt=0, description="End a session once its loss reaches this amount")
+    take_profit: Optional[float] = Field(default=None, gt=0, description="End a session once its profit reaches this amount")
+    
+    @model_validator(mode="after")
+    def check_policy_parameters(self):
+        if self.type == "fixed" and self.cash_out_point is None:
+            raise ValueError("Fixed policies require cash_out_point")
+        if self.type == "target_multiplier" and self.target_multiplier is None:
+            raise ValueError("Target multiplier policies require target_multiplier")
+        return self
+
+class StrategyComparisonRequest(BaseModel):
+    profile: str = Field(default=DEFAULT_GAME_CONFIG.name, description="Game profile (board size and house edge)")
+    mine_count: int = Field(..., ge=1)
+    policies: List[StrategyPolicySpec] = Field(..., min_length=1, max_length=10)
+    bet_amount: float = Field(default=1.0, gt=0)
+    games_per_session: int = Field(default=100, ge=1, le=10000)
+    num_sessions: int = Field(default=10000, ge=1, le=1000000)
+    seed: Optional[int] = Field(default=None, ge=0, description="Seed for reproducible results")
+    
+    @model_validator(mode="after")
+    def check_workload(self):
+        get_game_config(self.profile).check_state(self.mine_count)
+        if self.games_per_session * self.num_sessions > 100_000_000:
+            raise ValueError("games_per_session * num_sessions must not exceed 100000000")
+        return self
+
+class StrategyEvaluation(BaseModel):
+    name: str
+    cash_out_point: int = Field(..., description="Tiles each game reveals under this policy at the requested mine count")
+    mean_session_profit: float
+    session_profit_stdev: float
+    win_rate: float = Field(..., description="Share of played games that reached the cash-out point")
+    average_games_played: float
+    stop_loss_rate: float = Field(..., description="Share of sessions ended by the stop-loss")
+    take_profit_rate: float = Field(..., description="Share of sessions ended by the take-profit")
+
+class StrategyComparisonResult(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    profile: str = DEFAULT_GAME_CONFIG.name
+    mine_count: int
+    bet_amount: float
+    games_per_session: int
+    num_sessions: int
+    evaluations: List[StrategyEvaluation]
+    head_to_head: List[Dict[str, Any]] = Field(..., description="Paired session-profit differences on common random numbers")
+
+class PayoutDistributionRequest(BaseModel):
+    profile: str = Field(default=DEFAULT_GAME_CONFIG.name, description="Game profile (board size and house edge)")
+    mine_count: int = Field(..., ge=1)
+    policy: StrategyPolicySpec = Field(..., description="Cash-out policy; session stop-loss and take-profit limits do not apply to a single game")
+    bet_amount: float = Field(default=1.0, gt=0)
+    profit_thresholds: List[float] = Field(default_factory=list, max_length=100, description="Report the chance that profit reaches each threshold")
+    
+    @model_validator(mode="after")
+    def check_profile(self):
+        get_game_config(self.profile).check_state(self.mine_count)
+        return self
+
+class PayoutOutcome(BaseModel):
+    outcome: str = Field(..., description="cash_out or bust")
+    tiles_revealed: int = Field(..., description="Safe tiles revealed before the game ended")
+    multiplier: float
+    profit: float
+    probability: float
+
+class PayoutDistributionResult(BaseModel):
+    profile: str = DEFAULT_GAME_CONFIG.name
+    mine_count: int
+    policy: str
+    bet_amount: float
+    pmf: List[PayoutOutcome] = Field(..., description="Every way a game can end under the policy, in reveal order")
+    mean_multiplier: float
+    mean_profit: float
+    profit_variance: float
+    profit_stdev: float
+    profit_quantiles: Dict[str, float]
+    tail_probabilities: Dict[str, float] = Field(..., description="Chance of a loss, of breaking even or better, and of reaching each requested profit threshold")
+
+class SimulationJob(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    kind: str = Field(..., description="monte_carlo, risk_analysis or fairness_audit")
+    status: JobStatus = JobStatus.QUEUED
+    params: Dict[str, Any] = Field(default_factory=dict)
+    progress: float = Field(default=0.0, ge=0, le=1)
+    partial_result: Optional[Dict[str, Any]] = Field(default=None, description="Latest intermediate result")
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class StrategyRecommendation(BaseModel):
     action: str = Field(..., description="continue, cash_out, or high_risk")
@@ -74,7 +314,42 @@ class StrategyRecommendation(BaseModel):
     expected_value: float = Field(..., description="Expected value of recommended action")
     alternative_actions: List[Dict[str, Any]] = Field(default_factory=list)
 
+class GameStateInput(BaseModel):
+    mine_count: int = Field(..., ge=1)
+    tiles_revealed: int = Field(default=0, ge=0)
+    current_multiplier: Optional[float] = Field(default=None, gt=0, description="Defaults to the multiplier for the state")
+    bet_amount: float = Field(default=1.0, gt=0)
+
+class BatchAnalysisRequest(BaseModel):
+    profile: str = Field(default=DEFAULT_GAME_CONFIG.name, description="Game profile of the raw states")
+    game_ids: List[str] = Field(default_factory=list, max_length=1000)
+    states: List[GameStateInput] = Field(default_factory=list, max_length=1000)
+    objective: str = Field(default="risk_neutral", pattern="^(risk_neutral|crra|cara)$")
+    risk_aversion: float = 0.0
+    wealth: float = Field(default=100.0, description="Bankroll in bets, used by crra")
+    
+    @model_validator(mode="after")
+    def check_batch_size(self):
+        if not 1 <= len(self.game_ids) + len(self.states) <= 1000:
+            raise ValueError("Provide between 1 and 1000 game ids and states in total")
+        config = get_game_config(self.profile)
+        for state in self.states:
+            config.check_state(state.mine_count, state.tiles_revealed)
+        return self
+
+class BatchAnalysisItem(BaseModel):
+    game_id: Optional[str] = Field(default=None, description="Set for items requested by game id")
+    profile: str = DEFAULT_GAME_CONFIG.name
+    state: GameStateInput
+    probability: ProbabilityAnalysis
+    recommendation: StrategyRecommendation
+
+class BatchAnalysisResult(BaseModel):
+    items: List[BatchAnalysisItem] = Field(..., description="Game ids first, in request order, then raw states")
+    missing_game_ids: List[str] = Field(default_factory=list)
+
 class ProvablyFairVerification(BaseModel):
+    profile: str = Field(default=DEFAULT_GAME_CONFIG.name, description="Game profile (board size and house edge)")
     server_seed: str
     client_seed: str
     nonce: int
@@ -82,6 +357,121 @@ class ProvablyFairVerification(BaseModel):
     is_valid: bool = Field(..., description="Whether the game is provably fair")
     verification_hash: str
 
+class SeedPair(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    user_id: str
+    server_seed: Optional[str] = Field(default=None, description="Only disclosed once the pair is revealed")
+    server_seed_hash: str
+    client_seed: str
+    nonce: int = Field(default=0, description="Next nonce to be played; games used nonces 0 to nonce - 1")
+    active_games: int = Field(default=0, description="Games on the pair still in play; it cannot be revealed until none are")
+    status: SeedPairStatus = SeedPairStatus.ACTIVE
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    revealed_at: Optional[datetime] = None
+
+class SeedRotation(BaseModel):
+    revealed: Optional[SeedPair] = Field(default=None, description="The retired pair, including its server seed")
+    active: SeedPair
+
+class LayoutBatchRequest(BaseModel):
+    profile: str = Field(default=DEFAULT_GAME_CONFIG.name, description="Game profile (board size and house edge)")
+    server_seed: str
+    client_seed: str
+    nonce_start: int = Field(default=0, ge=0)
+    count: int = Field(..., ge=1, le=10000, description="Consecutive nonces to generate")
+    mine_count: int = Field(..., ge=1)
+    
+    @model_validator(mode="after")
+    def check_profile(self):
+        get_game_config(self.profile).check_state(self.mine_count)
+        return self
+
+class LayoutBatchResult(BaseModel):
+    profile: str = DEFAULT_GAME_CONFIG.name
+    server_seed_hash: str
+    client_seed: str
+    mine_count: int
+    nonce_start: int
+    layouts: List[List[int]] = Field(..., description="Sorted mine positions; entry i is for nonce nonce_start + i")
+
+class HashChainRequest(BaseModel):
+    length: int = Field(default=1000000, ge=1, le=100000000)
+    checkpoint_interval: int = Field(default=10000, ge=1)
+
+class HashChainInfo(BaseModel):
+    terminal_hash: str = Field(..., description="Published hash committing to every seed in the chain")
+    length: int
+    checkpoint_interval: int
+    next_index: int = Field(default=0, description="Seeds served so far")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class HashChainVerificationRequest(BaseModel):
+    start: int = Field(default=0, ge=0)
+    stop: Optional[int] = Field(default=None, ge=1, description="Defaults to the end of the chain")
+
+class HashChainVerification(BaseModel):
+    terminal_hash: str
+    start: int
+    stop: int
+    is_valid: bool
+    first_invalid_index: Optional[int] = None
+    elapsed_seconds: float
+
+class FairnessAuditRequest(BaseModel):
+    profile: str = DEFAULT_GAME_CONFIG.name
+    mine_counts: List[int] = Field(default_factory=lambda: [1, 3, 5, 10, 24])
+    games_per_mine_count: int = Field(default=1000000, ge=1, le=100000000)
+    server_seed: Optional[str] = Field(default=None, description="Random when omitted; the RNG is audited, not a seed")
+    client_seed: str = Field(default="fairness-audit")
+    nonce_start: int = Field(default=0, ge=0)
+    
+    @model_validator(mode="after")
+    def check_mine_counts(self):
+        config = get_game_config(self.profile)
+        for mine_count in self.mine_counts:
+            config.check_state(mine_count)
+        return self
+
+class StoredGamesAuditRequest(BaseModel):
+    profile: str = DEFAULT_GAME_CONFIG.name
+    mine_counts: Optional[List[int]] = Field(default=None, description="All mine counts when omitted")
+    limit: Optional[int] = Field(default=None, ge=1, description="Most recent games only")
+    
+    @model_validator(mode="after")
+    def check_profile(self):
+        get_game_config(self.profile)
+        return self
+
+class ChiSquareTest(BaseModel):
+    statistic: float
+    degrees_of_freedom: int
+    p_value: float
+
+class KolmogorovSmirnovTest(BaseModel):
+    statistic: float
+    p_value: float
+
+class ModuloBias(BaseModel):
+    max_relative_bias: float = Field(..., description="Largest relative excess probability of any residue in one draw")
+    total_variation_bound: float = Field(..., description="Upper bound on the distance from uniform layouts")
+    games_to_detect: Optional[float] = Field(default=None, description="Rough number of games before the bias is statistically visible; None when unbiased")
+
+class MineCountAudit(BaseModel):
+    games: int
+    max_position_deviation: float = Field(..., description="Largest gap between a tile's mine frequency and mine_count / grid_size")
+    position_chi_square: ChiSquareTest
+    pair_chi_square: Optional[ChiSquareTest] = Field(default=None, description="Pair structure beyond the tile frequencies; None when pairs are fixed by them")
+    min_position_ks: KolmogorovSmirnovTest = Field(..., description="Lowest mine position against its exact distribution")
+    modulo_bias: ModuloBias
+
+class FairnessAuditResult(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    profile: str = DEFAULT_GAME_CONFIG.name
+    source: str = Field(..., description="nonce_range or stored_games")
+    games: int
+    mine_counts: Dict[str, MineCountAudit] = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
 class UserStatistics(BaseModel):
     user_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     total_games: int = Field(default=0)
@@ -1,16 +1,80 @@
 import random
-import statistics
 import math
-from typing import List, Dict, Tuple
-from models import MonteCarloResult, MonteCarloRequest
+import multiprocessing
+import threading
+import time
+import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Any, Callable, List, Dict, Tuple, Optional, Union
+from models import (MonteCarloResult, MonteCarloRequest, BankrollSimulationRequest, BankrollSimulationResult,
+                    StrategyComparisonRequest, StrategyComparisonResult, StrategyEvaluation,
+                    PayoutDistributionRequest, PayoutDistributionResult, PayoutOutcome)
+from game_config import DEFAULT_GAME_CONFIG, GameConfig
 from probability_engine import MinesProbabilityEngine
+from strategy_policies import build_policy
+from streaming_stats import RunningStats
+
+MAX_ADAPTIVE_ITERATIONS = 100_000_000  # Default per-point budget for precision-targeted runs
+BANKROLL_PERCENTILES = (5, 25, 50, 75, 95)
+BANKROLL_CHECKPOINTS = 100  # Points in time reported in percentile bands
+IMPORTANCE_SURVIVAL_TARGET = 0.5  # Minimum chance that a tilted game survives to the deepest point
+
+# Called with the completed fraction of a run and a partial result (None when unavailable)
+ProgressCallback = Callable[[float, Any], None]
+
+class SimulationCancelled(Exception):
+    """Raised from a running simulation once its cancel event is set"""
 
 class MonteCarloSimulationEngine:
     """Advanced Monte Carlo simulation engine for Mines game strategy optimization"""
     
-    def __init__(self):
-        self.prob_engine = MinesProbabilityEngine()
-        self.grid_size = 25
+    def __init__(self, batch_size: int = 65536, shard_size: int = 65536,
+                 max_workers: Optional[int] = None, executor: Optional[Executor] = None,
+                 config: GameConfig = DEFAULT_GAME_CONFIG):
+        self.config = config
+        self.prob_engine = MinesProbabilityEngine(config)
+        self.grid_size = config.grid_size
+        self.batch_size = batch_size  # Games simulated per NumPy block
+        self.shard_size = shard_size  # Games per independently seeded shard
+        self.max_workers = max_workers
+        self._executor = executor
+        self._owns_executor = False
+        self._executor_lock = threading.Lock()
+        self._profile_engines: Dict[GameConfig, "MonteCarloSimulationEngine"] = {config: self}
+    
+    def with_config(self, config: GameConfig) -> "MonteCarloSimulationEngine":
+        """Engine for another game profile that shares this engine's settings and process pool"""
+        engine = self._profile_engines.get(config)
+        if engine is None:
+            engine = MonteCarloSimulationEngine(self.batch_size, self.shard_size, self.max_workers,
+                                                self._get_executor(), config)
+            self._profile_engines[config] = engine
+        return engine
+    
+    def _get_executor(self) -> Optional[Executor]:
+        """Return the shard executor, starting the process pool on first use"""
+        if self._executor is None and self.max_workers and self.max_workers > 1:
+            with self._executor_lock:
+                if self._executor is None:
+                    # Spawned workers avoid forking a process that already runs threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                    self._owns_executor = True
+        return self._executor
+    
+    @staticmethod
+    def _check_cancelled(cancel_event: Optional[threading.Event]):
+        if cancel_event is not None and cancel_event.is_set():
+            raise SimulationCancelled()
+    
+    def shutdown(self):
+        """Stop the process pool if this engine started it"""
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._owns_executor = False
     
     def simulate_single_game(self, mine_count: int, cash_out_point: int) -> Tuple[float, bool]:
         """Simulate a single game with specified parameters"""
@@ -39,45 +103,490 @@ class MonteCarloSimulationEngine:
         
         return multiplier, True  # Successfully cashed out
     
-    def run_monte_carlo_simulation(self, request: MonteCarloRequest) -> MonteCarloResult:
-        """Run comprehensive Monte Carlo simulation"""
-        results = []
+    def simulate_safe_runs(self, mine_count: int, games: int, rng: np.random.Generator) -> np.ndarray:
+        """Simulate a block of games and return the safe tiles revealed before the first mine"""
+        # Each game reveals tiles in the order of its random keys. By symmetry a random reveal
+        # order over a fixed layout (tiles 0..mine_count-1 are mines) is equivalent to a random
+        # layout, so the outcome of every cash-out point is decided by the first mine's rank.
+        keys = rng.random((games, self.grid_size))
+        first_mine = keys[:, :mine_count].min(axis=1)
+        return np.count_nonzero(keys[:, mine_count:] < first_mine[:, None], axis=1)
+    
+    def simulate_antithetic_safe_runs(self, mine_count: int, pairs: int,
+                                      rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Safe runs for game pairs whose second game reveals tiles in the reverse order"""
+        # Reversing the order maps keys u to 1 - u: the first mine becomes the mine with the
+        # largest key and the safe tiles revealed before it are those with even larger keys
+        keys = rng.random((pairs, self.grid_size))
+        mine_keys = keys[:, :mine_count]
+        safe_keys = keys[:, mine_count:]
+        safe_runs = np.count_nonzero(safe_keys < mine_keys.min(axis=1)[:, None], axis=1)
+        mirrored_runs = np.count_nonzero(safe_keys > mine_keys.max(axis=1)[:, None], axis=1)
+        return safe_runs, mirrored_runs
+    
+    def importance_proposal(self, mine_count: int, depth: int) -> Tuple[np.ndarray, np.ndarray]:
+        """True and tilted per-step safe probabilities for the first `depth` reveals"""
+        safe = self.prob_engine.step_safe_table[mine_count, :depth]
+        # Raising every step to at least target^(1/depth) lets at least `target` of the tilted
+        # games reach the deepest point, which bounds the relative error however rare it is
+        proposal = np.maximum(safe, IMPORTANCE_SURVIVAL_TARGET ** (1.0 / max(depth, 1)))
+        return safe, proposal
+    
+    def simulate_tilted_safe_runs(self, proposal: np.ndarray, games: int, rng: np.random.Generator) -> np.ndarray:
+        """Simulate safe runs when reveal i is safe with probability proposal[i]"""
+        safe_steps = rng.random((games, len(proposal))) < proposal
+        # First unsafe step, or the full depth when every step is safe
+        return np.where(safe_steps.all(axis=1), len(proposal), np.argmin(safe_steps, axis=1))
+    
+    def _count_successes(self, mine_count: int, cash_out_point: int, iterations: int,
+                         rng: np.random.Generator) -> int:
+        """Count games that survive to the cash-out point, simulated in NumPy blocks"""
         successes = 0
+        remaining = iterations
+        while remaining > 0:
+            games = min(self.batch_size, remaining)
+            safe_runs = self.simulate_safe_runs(mine_count, games, rng)
+            successes += int(np.count_nonzero(safe_runs >= cash_out_point))
+            remaining -= games
+        return successes
+    
+    def _count_successes_single_pass(self, mine_count: int, cash_out_points: List[int], iterations: int,
+                                     rng: np.random.Generator,
+                                     proposal: Optional[np.ndarray] = None) -> Dict[int, int]:
+        """Count survivors for every cash-out point from one shared set of simulated games"""
+        # Only the step of the first mine matters, so a histogram of safe runs decides every point
+        safe_run_counts = np.zeros(self.grid_size + 1, dtype=np.int64)
+        remaining = iterations
+        while remaining > 0:
+            games = min(self.batch_size, remaining)
+            if proposal is None:
+                safe_runs = self.simulate_safe_runs(mine_count, games, rng)
+            else:
+                safe_runs = self.simulate_tilted_safe_runs(proposal, games, rng)
+            safe_run_counts += np.bincount(safe_runs, minlength=self.grid_size + 1)
+            remaining -= games
         
-        # Determine cash out points to test
-        if request.cash_out_points:
-            cash_out_points = request.cash_out_points
+        survivors = np.cumsum(safe_run_counts[::-1])[::-1]  # survivors[k] = games with safe run >= k
+        return {
+            point: int(survivors[max(point, 0)]) if point <= self.grid_size else 0
+            for point in cash_out_points
+        }
+    
+    def _count_antithetic_pairs(self, mine_count: int, cash_out_points: List[int], iterations: int,
+                                rng: np.random.Generator) -> Dict[int, np.ndarray]:
+        """Per point: [pairs, pairs where both games survive, pairs where exactly one survives]"""
+        # A joint histogram of the paired safe runs decides every point
+        bins = self.grid_size + 1
+        pair_counts = np.zeros(bins * bins, dtype=np.int64)
+        total_pairs = (iterations + 1) // 2  # An odd game count is rounded up to a whole pair
+        remaining = total_pairs
+        while remaining > 0:
+            pairs = min(self.batch_size, remaining)
+            safe_runs, mirrored_runs = self.simulate_antithetic_safe_runs(mine_count, pairs, rng)
+            pair_counts += np.bincount(safe_runs * bins + mirrored_runs, minlength=bins * bins)
+            remaining -= pairs
+        pair_counts = pair_counts.reshape(bins, bins)
+        
+        runs = np.arange(bins)
+        counts = {}
+        for point in cash_out_points:
+            survives = runs >= point
+            both = pair_counts[survives][:, survives].sum()
+            one = pair_counts[survives][:, ~survives].sum() + pair_counts[~survives][:, survives].sum()
+            counts[point] = np.array([total_pairs, both, one], dtype=np.int64)
+        return counts
+    
+    def _control_variate_sums(self, mine_count: int, cash_out_points: List[int], iterations: int,
+                              rng: np.random.Generator) -> Dict[int, np.ndarray]:
+        """Per point: [games, sum Y, sum C, sum C^2, sum Y*C] for survival Y and clipped safe run C"""
+        bins = self.grid_size + 1
+        safe_run_counts = np.zeros(bins, dtype=np.int64)
+        remaining = iterations
+        while remaining > 0:
+            games = min(self.batch_size, remaining)
+            safe_run_counts += np.bincount(self.simulate_safe_runs(mine_count, games, rng), minlength=bins)
+            remaining -= games
+        
+        runs = np.arange(bins)
+        control = np.minimum(runs, self._deepest_point(cash_out_points))
+        control_sum = int((safe_run_counts * control).sum())
+        control_square_sum = int((safe_run_counts * control ** 2).sum())
+        counts = {}
+        for point in cash_out_points:
+            survives = runs >= point
+            counts[point] = np.array([
+                iterations,
+                safe_run_counts[survives].sum(),
+                control_sum,
+                control_square_sum,
+                (safe_run_counts * control)[survives].sum()
+            ], dtype=np.int64)
+        return counts
+    
+    def _shard_success_counts(self, mine_count: int, cash_out_points: List[int], games: int,
+                              seed_sequence: np.random.SeedSequence, single_pass: bool,
+                              proposal: Optional[np.ndarray] = None,
+                              variance_reduction: str = "none") -> Dict[int, Any]:
+        """Survivor counts per cash-out point for one shard, independently or from common random numbers"""
+        rng = np.random.default_rng(seed_sequence)
+        if variance_reduction == "antithetic":
+            return self._count_antithetic_pairs(mine_count, cash_out_points, games, rng)
+        if variance_reduction == "control_variate":
+            return self._control_variate_sums(mine_count, cash_out_points, games, rng)
+        if single_pass or proposal is not None:
+            return self._count_successes_single_pass(mine_count, cash_out_points, games, rng, proposal)
+        return {
+            point: self._count_successes(mine_count, point, games, rng)
+            for point in cash_out_points
+        }
+    
+    def _success_counts(self, mine_count: int, cash_out_points: List[int], iterations: int,
+                        single_pass: bool = False,
+                        seed: Union[int, np.random.SeedSequence, None] = None,
+                        on_shard: Optional[Callable[[int, Dict[int, int]], None]] = None,
+                        cancel_event: Optional[threading.Event] = None,
+                        proposal: Optional[np.ndarray] = None,
+                        variance_reduction: str = "none") -> Dict[int, Any]:
+        """Survivor counts per cash-out point, merged from deterministically seeded shards"""
+        # The shard layout depends only on iterations and shard_size, and each shard draws from
+        # its own child of the seed tree, so a seeded run is reproducible for any worker count
+        shard_games = [self.shard_size] * (iterations // self.shard_size)
+        if iterations % self.shard_size:
+            shard_games.append(iterations % self.shard_size)
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        shard_seeds = seed.spawn(len(shard_games))
+        
+        # Survivor counts (or per-point arrays of integer sums for antithetic and control-variate
+        # runs) are sufficient statistics, so merging shards is an integer sum whose result
+        # does not depend on the order in which shards complete
+        totals = dict.fromkeys(cash_out_points, 0)
+        games_done = 0
+        
+        def merge(games: int, counts: Dict[int, int]):
+            nonlocal games_done
+            for point, successes in counts.items():
+                totals[point] = totals[point] + successes  # Never in place: partial results share arrays
+            games_done += games
+            if on_shard is not None:
+                on_shard(games_done, dict(totals))
+        
+        executor = self._get_executor()
+        if executor is None or len(shard_games) == 1:
+            for games, shard_seed in zip(shard_games, shard_seeds):
+                self._check_cancelled(cancel_event)
+                merge(games, self._shard_success_counts(mine_count, cash_out_points, games, shard_seed,
+                                                        single_pass, proposal, variance_reduction))
         else:
-            max_safe_tiles = self.grid_size - request.mine_count
-            cash_out_points = list(range(1, min(max_safe_tiles + 1, 15)))  # Test up to 14 tiles
+            futures = {
+                executor.submit(_run_shard, self.batch_size, mine_count, cash_out_points,
+                                games, shard_seed, single_pass, proposal, variance_reduction, self.config): games
+                for games, shard_seed in zip(shard_games, shard_seeds)
+            }
+            try:
+                for future in as_completed(futures):
+                    self._check_cancelled(cancel_event)
+                    merge(futures[future], future.result())
+            finally:
+                for future in futures:
+                    future.cancel()
+        return totals
+    
+    def _adaptive_success_counts(self, request: MonteCarloRequest, cash_out_points: List[int],
+                                 on_round: Optional[Callable[[float, Dict[int, Tuple[int, int]]], None]] = None,
+                                 cancel_event: Optional[threading.Event] = None) -> Dict[int, Tuple[int, int]]:
+        """Simulate in rounds until each cash-out point meets the requested precision"""
+        seed_sequence = np.random.SeedSequence(request.seed)
+        budget = request.max_iterations or MAX_ADAPTIVE_ITERATIONS
+        started = time.monotonic()
         
-        best_point = 1
-        best_expected_value = 0
+        totals = {point: (0, 0) for point in cash_out_points}
+        active = list(totals)
+        while active:
+            # Every round draws from the next child of the seed tree, so stopping decisions
+            # (and therefore results) are reproducible unless max_seconds cuts a run short.
+            # Active points have all simulated the same number of games so far.
+            games = min(request.iterations, budget - totals[active[0]][1])
+            round_counts = self._success_counts(request.mine_count, active, games, request.single_pass,
+                                                seed_sequence.spawn(1)[0], cancel_event=cancel_event)
+            
+            still_active = []
+            for point in active:
+                successes = totals[point][0] + round_counts[point]
+                point_games = totals[point][1] + games
+                totals[point] = (successes, point_games)
+                
+                multiplier = self._cash_out_multiplier(request.mine_count, point)
+                half_width, relative_error = self._adaptive_precision(successes, point_games, multiplier)
+                if point_games < budget and not self._precision_met(request, half_width, relative_error):
+                    still_active.append(point)
+            active = still_active
+            
+            if on_round is not None:
+                on_round(1 - len(active) / len(totals), dict(totals))
+            
+            if request.max_seconds is not None and time.monotonic() - started >= request.max_seconds:
+                break
+        return totals
+    
+    @staticmethod
+    def _adaptive_precision(successes: int, games: int, multiplier: float) -> Tuple[float, float]:
+        """95% half-width and relative error of a point's average multiplier"""
+        # Agresti-Coull adjustment keeps the estimate honest when no game (or every game) survives
+        adjusted_rate = (successes + 2) / (games + 4)
+        half_width = 1.96 * abs(multiplier) * math.sqrt(adjusted_rate * (1 - adjusted_rate) / games)
+        relative_error = 1.96 * math.sqrt((1 - adjusted_rate) / (games * adjusted_rate))
+        return half_width, relative_error
+    
+    @staticmethod
+    def _precision_met(request: MonteCarloRequest, half_width: float, relative_error: float) -> bool:
+        """Whether a point satisfies every precision target set on the request"""
+        if request.target_half_width is not None and half_width > request.target_half_width:
+            return False
+        if request.target_relative_error is not None and relative_error > request.target_relative_error:
+            return False
+        return True
+    
+    def _default_cash_out_points(self, mine_count: int) -> List[int]:
+        """Cash-out points tested when the request does not specify any"""
+        max_safe_tiles = self.grid_size - mine_count
+        return list(range(1, min(max_safe_tiles + 1, 15)))  # Test up to 14 tiles
+    
+    def _cash_out_multiplier(self, mine_count: int, cash_out_point: int) -> float:
+        """Payout at a cash-out point; points past the last safe tile are never reached and pay nothing"""
+        if cash_out_point > self.grid_size - mine_count:
+            return 0.0
+        return self.prob_engine.calculate_multiplier(mine_count, cash_out_point)
+    
+    def _point_summary(self, successes: int, multiplier_stats: RunningStats, bet_amount: float) -> Dict:
+        """Summarize one cash-out point from its running multiplier statistics"""
+        success_rate = successes / multiplier_stats.count
+        return {
+            'success_rate': success_rate,
+            'average_multiplier': multiplier_stats.mean,
+            'expected_value': success_rate * multiplier_stats.mean * bet_amount,
+            'variance': multiplier_stats.variance,
+            'iterations': multiplier_stats.count
+        }
+    
+    def _legacy_point_results(self, request: MonteCarloRequest, cash_out_points: List[int],
+                              progress: Optional[ProgressCallback] = None,
+                              cancel_event: Optional[threading.Event] = None) -> Dict[int, Dict]:
+        """Per-point statistics from the game-by-game simulator"""
         point_results = {}
-        
-        # Test each cash out point
-        for cash_out_point in cash_out_points:
-            point_multipliers = []
+        for index, cash_out_point in enumerate(cash_out_points):
+            self._check_cancelled(cancel_event)
+            if progress is not None:
+                progress(index / len(cash_out_points), None)
+            multiplier_stats = RunningStats()
             point_successes = 0
             
             for _ in range(request.iterations):
                 multiplier, success = self.simulate_single_game(request.mine_count, cash_out_point)
-                point_multipliers.append(multiplier)
+                multiplier_stats.update(multiplier)
                 if success:
                     point_successes += 1
             
-            success_rate = point_successes / request.iterations
-            average_multiplier = statistics.mean(point_multipliers)
-            expected_value = success_rate * average_multiplier * request.bet_amount
+            point_results[cash_out_point] = self._point_summary(point_successes, multiplier_stats, request.bet_amount)
+        return point_results
+    
+    def _vectorized_point_results(self, request: MonteCarloRequest, cash_out_points: List[int],
+                                  progress: Optional[ProgressCallback] = None,
+                                  cancel_event: Optional[threading.Event] = None) -> Dict[int, Dict]:
+        """Per-point statistics from the batched NumPy simulator"""
+        def partial_result(fraction: float, point_counts: Dict[int, Tuple[int, int]]):
+            partial = self._count_point_results(request, cash_out_points, point_counts)
+            progress(fraction, self._build_result(request, cash_out_points, partial))
+        
+        if request.variance_reduction != "none":
+            return self._variance_reduced_point_results(request, cash_out_points, progress, cancel_event)
+        
+        if request.is_adaptive:
+            point_counts = self._adaptive_success_counts(
+                request, cash_out_points,
+                on_round=partial_result if progress is not None else None,
+                cancel_event=cancel_event
+            )
+        else:
+            def on_shard(games_done: int, counts: Dict[int, int]):
+                partial_result(games_done / request.iterations,
+                               {point: (successes, games_done) for point, successes in counts.items()})
+            
+            success_counts = self._success_counts(request.mine_count, cash_out_points, request.iterations,
+                                                  request.single_pass, request.seed,
+                                                  on_shard=on_shard if progress is not None else None,
+                                                  cancel_event=cancel_event)
+            point_counts = {point: (successes, request.iterations) for point, successes in success_counts.items()}
+        return self._count_point_results(request, cash_out_points, point_counts)
+    
+    def _count_point_results(self, request: MonteCarloRequest, cash_out_points: List[int],
+                             point_counts: Dict[int, Tuple[int, int]]) -> Dict[int, Dict]:
+        """Per-point statistics from (successes, games) counts"""
+        point_results = {}
+        for cash_out_point in cash_out_points:
+            successes, games = point_counts[cash_out_point]
+            multiplier = self._cash_out_multiplier(request.mine_count, cash_out_point)
+            
+            # A game either pays the point's fixed multiplier or nothing
+            multiplier_stats = RunningStats()
+            multiplier_stats.update_constant(multiplier, successes)
+            multiplier_stats.update_constant(0.0, games - successes)
+            
+            point_results[cash_out_point] = self._point_summary(successes, multiplier_stats, request.bet_amount)
+            if request.is_adaptive:
+                half_width, relative_error = self._adaptive_precision(successes, games, multiplier)
+                point_results[cash_out_point].update({
+                    'half_width': half_width,
+                    'relative_error': relative_error,
+                    'target_met': self._precision_met(request, half_width, relative_error)
+                })
+        return point_results
+    
+    def _deepest_point(self, cash_out_points: List[int]) -> int:
+        """Reveal depth that covers every requested cash-out point"""
+        return min(max(max(cash_out_points), 1), self.grid_size)
+    
+    def _variance_reduced_stats(self, mine_count: int, cash_out_points: List[int], iterations: int,
+                                variance_reduction: str, seed: Optional[int] = None,
+                                on_shard: Optional[Callable[[int, Dict[int, Any]], None]] = None,
+                                cancel_event: Optional[threading.Event] = None) -> Dict[int, Any]:
+        """Merged shard statistics for a variance-reduced run"""
+        if variance_reduction == "importance_sampling":
+            # One shared set of tilted games serves every point, as in single-pass mode
+            _, proposal = self.importance_proposal(mine_count, self._deepest_point(cash_out_points))
+            return self._success_counts(mine_count, cash_out_points, iterations, seed=seed, on_shard=on_shard,
+                                        cancel_event=cancel_event, proposal=proposal)
+        return self._success_counts(mine_count, cash_out_points, iterations, seed=seed, on_shard=on_shard,
+                                    cancel_event=cancel_event, variance_reduction=variance_reduction)
+    
+    def _variance_reduced_estimates(self, mine_count: int, cash_out_points: List[int], stats: Dict[int, Any],
+                                    games: int, variance_reduction: str) -> Dict[int, Tuple[float, float, int]]:
+        """(success rate, estimator variance, games) per cash-out point from merged shard statistics"""
+        estimates = {}
+        if variance_reduction == "importance_sampling":
+            safe, proposal = self.importance_proposal(mine_count, self._deepest_point(cash_out_points))
+            for point in cash_out_points:
+                steps = min(max(point, 0), len(proposal))
+                # Every surviving game took the same safe steps, so its likelihood ratio is deterministic
+                likelihood_ratio = 0.0 if point > self.grid_size else float(np.prod(safe[:steps] / proposal[:steps]))
+                proposal_rate = stats[point] / games
+                variance = likelihood_ratio ** 2 * proposal_rate * (1 - proposal_rate) / max(games - 1, 1)
+                estimates[point] = (likelihood_ratio * proposal_rate, variance, games)
+                
+        elif variance_reduction == "antithetic":
+            for point in cash_out_points:
+                pairs, both, one = (int(value) for value in stats[point])
+                # Each pair contributes the average of its two indicators: 1, 1/2 or 0
+                mean = (both + one / 2) / pairs
+                pair_variance = max((both + one / 4) / pairs - mean ** 2, 0.0) * pairs / max(pairs - 1, 1)
+                estimates[point] = (mean, pair_variance / pairs, 2 * pairs)
+                
+        elif variance_reduction == "control_variate":
+            depth = self._deepest_point(cash_out_points)
+            # E[min(R, depth)] = sum of P(R >= j) for j = 1..depth, known in closed form
+            control_mean = float(self.prob_engine.survival_table[mine_count, 1:depth + 1].sum())
+            for point in cash_out_points:
+                n, y_sum, c_sum, cc_sum, yc_sum = (int(value) for value in stats[point])
+                # Y is an indicator, so sum Y^2 = sum Y
+                s_yy = y_sum - y_sum ** 2 / n
+                s_cc = cc_sum - c_sum ** 2 / n
+                s_yc = yc_sum - y_sum * c_sum / n
+                beta = s_yc / s_cc if s_cc > 0 else 0.0
+                rate = y_sum / n - beta * (c_sum / n - control_mean)
+                residual = max(s_yy - beta * s_yc, 0.0) / max(n - 1, 1)
+                estimates[point] = (min(max(rate, 0.0), 1.0), residual / n, n)
+        
+        return estimates
+    
+    @staticmethod
+    def _variance_reduction_factor(success_rate: float, variance: float, games: int) -> float:
+        """Naive-sampling variance over the achieved estimator variance for the same games"""
+        naive_variance = success_rate * (1 - success_rate) / games
+        return naive_variance / variance if variance > 0 and naive_variance > 0 else 1.0
+    
+    def _variance_reduced_point_results(self, request: MonteCarloRequest, cash_out_points: List[int],
+                                        progress: Optional[ProgressCallback] = None,
+                                        cancel_event: Optional[threading.Event] = None) -> Dict[int, Dict]:
+        """Per-point statistics from an importance-sampling, antithetic or control-variate estimator"""
+        def on_shard(games_done: int, stats: Dict[int, Any]):
+            estimates = self._variance_reduced_estimates(request.mine_count, cash_out_points, stats, games_done,
+                                                         request.variance_reduction)
+            partial = self._estimate_point_results(request, cash_out_points, estimates)
+            progress(games_done / request.iterations, self._build_result(request, cash_out_points, partial))
+        
+        stats = self._variance_reduced_stats(request.mine_count, cash_out_points, request.iterations,
+                                             request.variance_reduction, request.seed,
+                                             on_shard=on_shard if progress is not None else None,
+                                             cancel_event=cancel_event)
+        estimates = self._variance_reduced_estimates(request.mine_count, cash_out_points, stats, request.iterations,
+                                                     request.variance_reduction)
+        return self._estimate_point_results(request, cash_out_points, estimates)
+    
+    def _estimate_point_results(self, request: MonteCarloRequest, cash_out_points: List[int],
+                                estimates: Dict[int, Tuple[float, float, int]]) -> Dict[int, Dict]:
+        """Per-point statistics from success-rate estimates and their variances"""
+        point_results = {}
+        for cash_out_point in cash_out_points:
+            success_rate, variance, games = estimates[cash_out_point]
+            multiplier = self._cash_out_multiplier(request.mine_count, cash_out_point)
+            factor = self._variance_reduction_factor(success_rate, variance, games)
+            average_multiplier = multiplier * success_rate
             
             point_results[cash_out_point] = {
                 'success_rate': success_rate,
                 'average_multiplier': average_multiplier,
-                'expected_value': expected_value,
-                'variance': statistics.variance(point_multipliers) if len(point_multipliers) > 1 else 0,
-                'multipliers': point_multipliers
+                'expected_value': success_rate * average_multiplier * request.bet_amount,
+                # Per-game variance of the payout estimator, so variance / games is its variance
+                'variance': multiplier ** 2 * variance * games,
+                'iterations': games,
+                'effective_sample_size': games * factor,
+                'variance_reduction_factor': factor
             }
+        return point_results
+    
+    def _exact_point_results(self, request: MonteCarloRequest, cash_out_points: List[int]) -> Dict[int, Dict]:
+        """Closed-form per-point statistics for uniformly random reveals"""
+        point_results = {}
+        for cash_out_point in cash_out_points:
+            success_rate = self.prob_engine.calculate_survival_probability(request.mine_count, cash_out_point)
+            multiplier = self._cash_out_multiplier(request.mine_count, cash_out_point)
+            average_multiplier = multiplier * success_rate
             
+            point_results[cash_out_point] = {
+                'success_rate': success_rate,
+                'average_multiplier': average_multiplier,
+                'expected_value': success_rate * average_multiplier * request.bet_amount,
+                'variance': multiplier ** 2 * success_rate * (1 - success_rate),
+                'iterations': 0
+            }
+        return point_results
+    
+    def run_monte_carlo_simulation(self, request: MonteCarloRequest,
+                                   progress: Optional[ProgressCallback] = None,
+                                   cancel_event: Optional[threading.Event] = None) -> MonteCarloResult:
+        """Run comprehensive Monte Carlo simulation"""
+        # Determine cash out points to test
+        if request.cash_out_points:
+            cash_out_points = request.cash_out_points
+        else:
+            cash_out_points = self._default_cash_out_points(request.mine_count)
+        
+        if request.engine == "legacy":
+            point_results = self._legacy_point_results(request, cash_out_points, progress, cancel_event)
+        elif request.engine == "exact":
+            point_results = self._exact_point_results(request, cash_out_points)
+        else:
+            point_results = self._vectorized_point_results(request, cash_out_points, progress, cancel_event)
+        
+        return self._build_result(request, cash_out_points, point_results)
+    
+    def _build_result(self, request: MonteCarloRequest, cash_out_points: List[int],
+                      point_results: Dict[int, Dict]) -> MonteCarloResult:
+        """Pick the optimal cash-out point and report its statistics"""
+        best_point = cash_out_points[0]
+        best_expected_value = 0
+        for cash_out_point in cash_out_points:
+            expected_value = point_results[cash_out_point]['expected_value']
             if expected_value > best_expected_value:
                 best_expected_value = expected_value
                 best_point = cash_out_point
@@ -86,19 +595,25 @@ class MonteCarloSimulationEngine:
         optimal_results = point_results[best_point]
         
         # Calculate confidence interval
-        multipliers = optimal_results['multipliers']
-        if len(multipliers) > 1:
-            std_error = statistics.stdev(multipliers) / math.sqrt(len(multipliers))
+        if request.engine == "exact":
+            # No sampling error
             confidence_interval = {
-                'lower': max(0, statistics.mean(multipliers) - 1.96 * std_error),
-                'upper': statistics.mean(multipliers) + 1.96 * std_error
+                'lower': optimal_results['average_multiplier'],
+                'upper': optimal_results['average_multiplier']
+            }
+        elif optimal_results['iterations'] > 1:
+            std_error = math.sqrt(optimal_results['variance']) / math.sqrt(optimal_results['iterations'])
+            confidence_interval = {
+                'lower': max(0, optimal_results['average_multiplier'] - 1.96 * std_error),
+                'upper': optimal_results['average_multiplier'] + 1.96 * std_error
             }
         else:
             confidence_interval = {'lower': 0, 'upper': 0}
         
-        return MonteCarloResult(
+        result = MonteCarloResult(
+            profile=self.config.name,
             mine_count=request.mine_count,
-            iterations=request.iterations,
+            iterations=optimal_results['iterations'],
             average_multiplier=optimal_results['average_multiplier'],
             success_rate=optimal_results['success_rate'],
             variance=optimal_results['variance'],
@@ -106,33 +621,134 @@ class MonteCarloSimulationEngine:
             expected_profit=(best_expected_value - request.bet_amount),
             confidence_interval=confidence_interval
         )
+        
+        if request.is_adaptive:
+            # Mongo documents need string keys
+            result.iterations_used = {str(point): r['iterations'] for point, r in point_results.items()}
+            result.achieved_precision = {
+                str(point): {'half_width': r['half_width'], 'relative_error': r['relative_error']}
+                for point, r in point_results.items()
+            }
+            result.target_met = all(r['target_met'] for r in point_results.values())
+        
+        if 'effective_sample_size' in optimal_results:
+            result.effective_sample_size = optimal_results['effective_sample_size']
+            result.variance_reduction_factor = optimal_results['variance_reduction_factor']
+        
+        return result
     
-    def analyze_risk_reward_profile(self, mine_count: int, iterations: int = 10000) -> Dict:
+    def _risk_metrics(self, successes: int, multiplier_stats: RunningStats, profit_stats: RunningStats,
+                      downside_stats: RunningStats) -> Dict:
+        """Risk-reward metrics for one cash-out point from its running statistics"""
+        success_rate = successes / multiplier_stats.count
+        volatility = profit_stats.stdev
+        
+        # Sharpe-like ratio (profit to volatility)
+        risk_adjusted_return = profit_stats.mean / volatility if volatility > 0 else 0
+        
+        return {
+            'success_rate': success_rate,
+            'average_multiplier': multiplier_stats.mean,
+            'average_profit': profit_stats.mean,
+            'volatility': volatility,
+            'downside_risk': downside_stats.stdev,
+            'max_drawdown': profit_stats.minimum if profit_stats.count else 0,
+            'risk_adjusted_return': risk_adjusted_return,
+            'expected_value': success_rate * multiplier_stats.mean
+        }
+    
+    def analyze_risk_reward_profile(self, mine_count: int, iterations: int = 10000,
+                                    engine: str = "vectorized", single_pass: bool = False,
+                                    seed: Optional[int] = None, variance_reduction: str = "none",
+                                    progress: Optional[ProgressCallback] = None,
+                                    cancel_event: Optional[threading.Event] = None) -> Dict:
         """Comprehensive risk-reward analysis across different strategies"""
+        if engine == "legacy":
+            return self._legacy_risk_reward_profile(mine_count, iterations, progress, cancel_event)
+        if engine == "exact":
+            return self._exact_risk_reward_profile(mine_count)
+        
         max_safe_tiles = self.grid_size - mine_count
+        cash_out_points = list(range(1, min(max_safe_tiles + 1, 16)))
+        
+        if variance_reduction != "none":
+            def on_estimates(games_done: int, stats: Dict[int, Any]):
+                estimates = self._variance_reduced_estimates(mine_count, cash_out_points, stats, games_done,
+                                                             variance_reduction)
+                progress(games_done / iterations, self._risk_profile_from_estimates(mine_count, estimates))
+            
+            stats = self._variance_reduced_stats(mine_count, cash_out_points, iterations, variance_reduction, seed,
+                                                 on_shard=on_estimates if progress is not None else None,
+                                                 cancel_event=cancel_event)
+            estimates = self._variance_reduced_estimates(mine_count, cash_out_points, stats, iterations,
+                                                         variance_reduction)
+            return self._risk_profile_from_estimates(mine_count, estimates)
+        
+        def on_shard(games_done: int, counts: Dict[int, int]):
+            progress(games_done / iterations, self._risk_profile_from_counts(mine_count, counts, games_done))
+        
+        success_counts = self._success_counts(mine_count, cash_out_points, iterations, single_pass, seed,
+                                              on_shard=on_shard if progress is not None else None,
+                                              cancel_event=cancel_event)
+        return self._risk_profile_from_counts(mine_count, success_counts, iterations)
+    
+    def _risk_profile_from_counts(self, mine_count: int, success_counts: Dict[int, int], games: int) -> Dict:
+        """Risk-reward metrics per cash-out point from survivor counts"""
         results = {}
         
-        for cash_out_point in range(1, min(max_safe_tiles + 1, 16)):
-            multipliers = []
-            profits = []
+        for cash_out_point, successes in success_counts.items():
+            losses = games - successes
+            multiplier = self._cash_out_multiplier(mine_count, cash_out_point)
+            win_profit = multiplier - 1.0  # Assuming bet of 1
             
-            for _ in range(iterations):
-                multiplier, success = self.simulate_single_game(mine_count, cash_out_point)
-                multipliers.append(multiplier)
-                profit = multiplier - 1.0 if success else -1.0  # Assuming bet of 1
-                profits.append(profit)
+            multiplier_stats = RunningStats()
+            multiplier_stats.update_constant(multiplier, successes)
+            multiplier_stats.update_constant(0.0, losses)
             
-            success_rate = sum(1 for m in multipliers if m > 0) / iterations
-            avg_multiplier = statistics.mean(multipliers)
-            avg_profit = statistics.mean(profits)
-            volatility = statistics.stdev(profits) if len(profits) > 1 else 0
+            profit_stats = RunningStats()
+            profit_stats.update_constant(win_profit, successes)
+            profit_stats.update_constant(-1.0, losses)
             
-            # Risk metrics
-            downside_risk = statistics.stdev([p for p in profits if p < 0]) if any(p < 0 for p in profits) else 0
-            max_drawdown = min(profits) if profits else 0
+            # A win below 1x still loses part of the stake
+            downside_stats = RunningStats()
+            if win_profit < 0:
+                downside_stats.update_constant(win_profit, successes)
+            downside_stats.update_constant(-1.0, losses)
             
-            # Sharpe-like ratio (profit to volatility)
-            risk_adjusted_return = avg_profit / volatility if volatility > 0 else 0
+            results[cash_out_point] = self._risk_metrics(successes, multiplier_stats, profit_stats, downside_stats)
+        
+        return results
+    
+    def _risk_profile_from_estimates(self, mine_count: int, estimates: Dict[int, Tuple[float, float, int]]) -> Dict:
+        """Risk-reward metrics from variance-reduced success-rate estimates"""
+        results = {}
+        for cash_out_point, (success_rate, variance, games) in estimates.items():
+            # Fractional survivor counts give the same two-point payout statistics
+            profile = self._risk_profile_from_counts(mine_count, {cash_out_point: success_rate * games}, games)
+            results[cash_out_point] = profile[cash_out_point]
+            results[cash_out_point]['variance_reduction_factor'] = self._variance_reduction_factor(
+                success_rate, variance, games
+            )
+        return results
+    
+    def _exact_risk_reward_profile(self, mine_count: int) -> Dict:
+        """Closed-form risk-reward analysis for uniformly random reveals"""
+        max_safe_tiles = self.grid_size - mine_count
+        results = {}
+        
+        for cash_out_point in range(1, min(max_safe_tiles + 1, 16)):
+            success_rate = self.prob_engine.calculate_survival_probability(mine_count, cash_out_point)
+            multiplier = self.prob_engine.calculate_multiplier(mine_count, cash_out_point)
+            win_profit = multiplier - 1.0  # Assuming bet of 1
+            
+            avg_multiplier = multiplier * success_rate
+            avg_profit = avg_multiplier - 1.0
+            # Profit takes two values that differ by the multiplier
+            volatility = multiplier * math.sqrt(success_rate * (1 - success_rate))
+            
+            # A win below 1x still loses part of the stake
+            downside_risk = volatility if win_profit < 0 else 0.0
+            max_drawdown = -1.0 if success_rate < 1 else win_profit
             
             results[cash_out_point] = {
                 'success_rate': success_rate,
@@ -141,12 +757,43 @@ class MonteCarloSimulationEngine:
                 'volatility': volatility,
                 'downside_risk': downside_risk,
                 'max_drawdown': max_drawdown,
-                'risk_adjusted_return': risk_adjusted_return,
+                'risk_adjusted_return': avg_profit / volatility if volatility > 0 else 0,
                 'expected_value': success_rate * avg_multiplier
             }
         
         return results
     
+    def _legacy_risk_reward_profile(self, mine_count: int, iterations: int,
+                                    progress: Optional[ProgressCallback] = None,
+                                    cancel_event: Optional[threading.Event] = None) -> Dict:
+        """Risk-reward analysis from the game-by-game simulator"""
+        max_safe_tiles = self.grid_size - mine_count
+        cash_out_points = list(range(1, min(max_safe_tiles + 1, 16)))
+        results = {}
+        
+        for index, cash_out_point in enumerate(cash_out_points):
+            self._check_cancelled(cancel_event)
+            if progress is not None:
+                progress(index / len(cash_out_points), dict(results))
+            multiplier_stats = RunningStats()
+            profit_stats = RunningStats()
+            downside_stats = RunningStats()
+            successes = 0
+            
+            for _ in range(iterations):
+                multiplier, success = self.simulate_single_game(mine_count, cash_out_point)
+                profit = multiplier - 1.0 if success else -1.0  # Assuming bet of 1
+                multiplier_stats.update(multiplier)
+                profit_stats.update(profit)
+                if profit < 0:
+                    downside_stats.update(profit)
+                if success:
+                    successes += 1
+            
+            results[cash_out_point] = self._risk_metrics(successes, multiplier_stats, profit_stats, downside_stats)
+        
+        return results
+    
     def simulate_bankroll_management(self, mine_count: int, cash_out_point: int, 
                                    initial_bankroll: float, bet_size: float, 
                                    num_games: int = 1000) -> Dict:
@@ -182,4 +829,228 @@ class MonteCarloSimulationEngine:
             'min_bankroll': min(bankroll_history),
             'bankroll_history': bankroll_history[-100:],  # Last 100 games only
             'went_bankrupt': bankroll < bet_size
-        }
\ No newline at end of file
+        }
+    
+    def simulate_bankroll_paths(self, request: BankrollSimulationRequest) -> BankrollSimulationResult:
+        """Advance many independent bankroll paths in lockstep and report ruin statistics"""
+        rng = np.random.default_rng(request.seed)
+        success_probability = self.prob_engine.calculate_survival_probability(request.mine_count,
+                                                                             request.cash_out_point)
+        multiplier = self.prob_engine.calculate_multiplier(request.mine_count, request.cash_out_point)
+        win_profit = request.bet_size * (multiplier - 1)
+        
+        bankrolls = np.full(request.num_paths, request.initial_bankroll)
+        # Game after which each path could no longer cover a bet (-1 while solvent)
+        ruin_times = np.where(bankrolls < request.bet_size, 0, -1)
+        checkpoints = set(np.linspace(0, request.num_games, BANKROLL_CHECKPOINTS + 1).astype(int).tolist())
+        percentile_bands = [self._percentile_band(0, bankrolls)]
+        games_played = 0
+        
+        for game in range(1, request.num_games + 1):
+            solvent = ruin_times < 0
+            if not solvent.any():
+                break
+            
+            # At a fixed cash-out point each game is a Bernoulli trial on the survival probability
+            wins = rng.random(request.num_paths) < success_probability
+            bankrolls += np.where(solvent, np.where(wins, win_profit, -request.bet_size), 0.0)
+            ruin_times[solvent & (bankrolls < request.bet_size)] = game
+            games_played = game
+            
+            if game in checkpoints:
+                percentile_bands.append(self._percentile_band(game, bankrolls))
+        
+        # Every path was ruined before the last checkpoint
+        if percentile_bands[-1]['game'] != games_played:
+            percentile_bands.append(self._percentile_band(games_played, bankrolls))
+        
+        ruined = ruin_times[ruin_times >= 0]
+        return BankrollSimulationResult(
+            profile=self.config.name,
+            mine_count=request.mine_count,
+            cash_out_point=request.cash_out_point,
+            initial_bankroll=request.initial_bankroll,
+            bet_size=request.bet_size,
+            num_games=request.num_games,
+            num_paths=request.num_paths,
+            ruin_probability=len(ruined) / request.num_paths,
+            time_to_ruin_quantiles=self._quantiles(ruined) if len(ruined) else {},
+            final_bankroll_quantiles=self._quantiles(bankrolls),
+            mean_final_bankroll=float(bankrolls.mean()),
+            percentile_bands=percentile_bands
+        )
+    
+    def compare_strategies(self, request: StrategyComparisonRequest) -> StrategyComparisonResult:
+        """Play strategy policies head-to-head over sessions built from common random numbers"""
+        policies = [build_policy(spec) for spec in request.policies]
+        names = []
+        for index, policy in enumerate(policies):
+            names.append(policy.name if policy.name not in names else f"{policy.name}_{index + 1}")
+        
+        # Policies are compiled once, so the batched loop never calls back into Python per step
+        cash_out_points = [policy.cash_out_point(policy.compile(self.prob_engine), request.mine_count)
+                           for policy in policies]
+        win_profits = [request.bet_amount * (self.prob_engine.calculate_multiplier(request.mine_count, point) - 1)
+                       for point in cash_out_points]
+        
+        games = request.games_per_session
+        session_profits = np.zeros((len(policies), request.num_sessions))
+        games_played = np.zeros((len(policies), request.num_sessions), dtype=np.int64)
+        games_won = np.zeros(len(policies), dtype=np.int64)
+        stop_loss_hits = np.zeros(len(policies), dtype=np.int64)
+        take_profit_hits = np.zeros(len(policies), dtype=np.int64)
+        
+        rng = np.random.default_rng(request.seed)
+        sessions_per_batch = max(1, self.batch_size // games)
+        for start in range(0, request.num_sessions, sessions_per_batch):
+            sessions = min(sessions_per_batch, request.num_sessions - start)
+            # Every policy plays the same mine layouts and reveal orders
+            safe_runs = self.simulate_safe_runs(request.mine_count, sessions * games, rng).reshape(sessions, games)
+            rows = np.arange(sessions)
+            
+            for index, policy in enumerate(policies):
+                point = cash_out_points[index]
+                if point == 0:
+                    continue  # Never plays, so every session breaks even
+                wins = safe_runs >= point
+                cumulative = np.cumsum(np.where(wins, win_profits[index], -request.bet_amount), axis=1)
+                
+                # A session ends after the first game that crosses one of its limits
+                hit_loss = cumulative <= -policy.stop_loss if policy.stop_loss else np.zeros_like(wins)
+                hit_profit = cumulative >= policy.take_profit if policy.take_profit else np.zeros_like(wins)
+                limited = hit_loss | hit_profit
+                last_game = np.where(limited.any(axis=1), limited.argmax(axis=1), games - 1)
+                
+                session_profits[index, start:start + sessions] = cumulative[rows, last_game]
+                games_played[index, start:start + sessions] = last_game + 1
+                games_won[index] += int(np.cumsum(wins, axis=1)[rows, last_game].sum())
+                stop_loss_hits[index] += int(hit_loss[rows, last_game].sum())
+                take_profit_hits[index] += int(hit_profit[rows, last_game].sum())
+        
+        evaluations = []
+        for index, name in enumerate(names):
+            profits = session_profits[index]
+            total_games = int(games_played[index].sum())
+            evaluations.append(StrategyEvaluation(
+                name=name,
+                cash_out_point=cash_out_points[index],
+                mean_session_profit=float(profits.mean()),
+                session_profit_stdev=float(profits.std(ddof=1)) if len(profits) > 1 else 0.0,
+                win_rate=games_won[index] / total_games if total_games else 0.0,
+                average_games_played=total_games / request.num_sessions,
+                stop_loss_rate=stop_loss_hits[index] / request.num_sessions,
+                take_profit_rate=take_profit_hits[index] / request.num_sessions
+            ))
+        
+        return StrategyComparisonResult(
+            profile=self.config.name,
+            mine_count=request.mine_count,
+            bet_amount=request.bet_amount,
+            games_per_session=games,
+            num_sessions=request.num_sessions,
+            evaluations=evaluations,
+            head_to_head=self._head_to_head(names, session_profits)
+        )
+    
+    @staticmethod
+    def _head_to_head(names: List[str], session_profits: np.ndarray) -> List[Dict[str, Any]]:
+        """Paired comparisons of session profits for every pair of policies"""
+        comparisons = []
+        sessions = session_profits.shape[1]
+        for first in range(len(names)):
+            for second in range(first + 1, len(names)):
+                # Common random numbers cancel shared luck, so paired differences are tight
+                differences = session_profits[first] - session_profits[second]
+                std_error = float(differences.std(ddof=1)) / math.sqrt(sessions) if sessions > 1 else 0.0
+                comparisons.append({
+                    'policy': names[first],
+                    'opponent': names[second],
+                    'mean_profit_difference': float(differences.mean()),
+                    'std_error': std_error,
+                    'win_probability': float(np.mean(differences > 0)),
+                    'tie_probability': float(np.mean(differences == 0))
+                })
+        return comparisons
+    
+    def exact_payout_distribution(self, request: PayoutDistributionRequest) -> PayoutDistributionResult:
+        """Exact single-game payout distribution of a cash-out policy, with no sampling"""
+        policy = build_policy(request.policy)
+        decisions = policy.compile_row(self.prob_engine, request.mine_count)
+        multipliers = self.prob_engine.multiplier_table[request.mine_count]
+        step_safe = self.prob_engine.step_safe_table[request.mine_count]
+        bet = request.bet_amount
+        
+        # Forward propagation over the (tiles_revealed, alive) chain: every surviving game is in
+        # the same state, so each step either ends the game or splits off the mass that busts
+        pmf = []
+        alive = 1.0
+        for tiles_revealed in range(self.grid_size - request.mine_count + 1):
+            if not decisions[tiles_revealed]:
+                multiplier = float(multipliers[tiles_revealed])
+                pmf.append(PayoutOutcome(outcome="cash_out", tiles_revealed=tiles_revealed, multiplier=multiplier,
+                                         profit=bet * (multiplier - 1), probability=alive))
+                break
+            bust = alive * (1 - float(step_safe[tiles_revealed]))
+            if bust > 0:
+                pmf.append(PayoutOutcome(outcome="bust", tiles_revealed=tiles_revealed, multiplier=0.0,
+                                         profit=-bet, probability=bust))
+            alive -= bust
+        
+        probabilities = np.array([outcome.probability for outcome in pmf])
+        profits = np.array([outcome.profit for outcome in pmf])
+        mean_profit = float(probabilities @ profits)
+        profit_variance = float(probabilities @ (profits - mean_profit) ** 2)
+        
+        # Lower quantiles of the discrete distribution: smallest profit whose CDF reaches the level
+        order = np.argsort(profits, kind="stable")
+        cdf = np.cumsum(probabilities[order])
+        profit_quantiles = {
+            f"p{pct}": float(profits[order][min(np.searchsorted(cdf, pct / 100 - 1e-12), len(cdf) - 1)])
+            for pct in BANKROLL_PERCENTILES
+        }
+        
+        tail_probabilities = {
+            'loss': float(probabilities[profits < 0].sum()),
+            'break_even_or_better': float(probabilities[profits >= 0].sum())
+        }
+        for threshold in request.profit_thresholds:
+            tail_probabilities[f"profit_at_least_{threshold:g}"] = float(probabilities[profits >= threshold].sum())
+        
+        return PayoutDistributionResult(
+            profile=self.config.name,
+            mine_count=request.mine_count,
+            policy=policy.name,
+            bet_amount=bet,
+            pmf=pmf,
+            mean_multiplier=float(probabilities @ np.array([outcome.multiplier for outcome in pmf])),
+            mean_profit=mean_profit,
+            profit_variance=profit_variance,
+            profit_stdev=math.sqrt(profit_variance),
+            profit_quantiles=profit_quantiles,
+            tail_probabilities=tail_probabilities
+        )
+    
+    @staticmethod
+    def _quantiles(values: np.ndarray) -> Dict[str, float]:
+        """Standard percentiles keyed as p5, p25, ..."""
+        levels = np.percentile(values, BANKROLL_PERCENTILES)
+        return {f"p{pct}": float(level) for pct, level in zip(BANKROLL_PERCENTILES, levels)}
+    
+    def _percentile_band(self, game: int, bankrolls: np.ndarray) -> Dict[str, float]:
+        """Bankroll percentiles across paths after a given game"""
+        return {'game': game, **self._quantiles(bankrolls)}
+
+
+_shard_engines: Dict[Tuple[int, GameConfig], MonteCarloSimulationEngine] = {}
+
+def _run_shard(batch_size: int, mine_count: int, cash_out_points: List[int], games: int,
+               seed_sequence: np.random.SeedSequence, single_pass: bool,
+               proposal: Optional[np.ndarray] = None, variance_reduction: str = "none",
+               config: GameConfig = DEFAULT_GAME_CONFIG) -> Dict[int, Any]:
+    """Process-pool entry point: simulate one shard with a per-process engine"""
+    engine = _shard_engines.get((batch_size, config))
+    if engine is None:
+        engine = _shard_engines[(batch_size, config)] = MonteCarloSimulationEngine(batch_size=batch_size,
+                                                                                   config=config)
+    return engine._shard_success_counts(mine_count, cash_out_points, games, seed_sequence, single_pass,
+                                        proposal, variance_reduction)
@@ -0,0 +1,99 @@
+import math
+import numpy as np
+from typing import Callable, Dict, Tuple
+
+OBJECTIVES = ("risk_neutral", "crra", "cara")
+
+def utility_functions(objective: str, risk_aversion: float = 0.0,
+                      wealth: float = 100.0) -> Tuple[Callable[[float], float], Callable[[float], float]]:
+    """Utility of a payout (in multiples of the bet) and its inverse"""
+    # crra: constant relative risk aversion on wealth after the game, measured in bets
+    # cara: constant absolute risk aversion on the payout
+    # Negative risk aversion models a risk-seeking player
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    
+    if objective == "crra":
+        if wealth <= 1:
+            raise ValueError("CRRA objectives need wealth above one bet")
+        if risk_aversion == 1:
+            return (lambda payout: math.log(wealth - 1 + payout),
+                    lambda value: math.exp(value) - wealth + 1)
+        power = 1 - risk_aversion
+        return (lambda payout: (wealth - 1 + payout) ** power / power,
+                lambda value: (value * power) ** (1 / power) - wealth + 1)
+    
+    if objective == "cara" and risk_aversion != 0:
+        return (lambda payout: (1 - math.exp(-risk_aversion * payout)) / risk_aversion,
+                lambda value: -math.log(1 - risk_aversion * value) / risk_aversion)
+    
+    return (lambda payout: payout), (lambda value: value)
+
+class OptimalStoppingSolution:
+    """Value function and continue/cash-out policy over every (mine_count, tiles_revealed) state"""
+    
+    def __init__(self, objective: str, risk_aversion: float, wealth: float, stop_values: np.ndarray,
+                 continue_values: np.ndarray, certainty_equivalents: Callable[[float], float]):
+        self.objective = objective
+        self.risk_aversion = risk_aversion
+        self.wealth = wealth
+        self.stop_values = stop_values  # Utility of cashing out now
+        self.continue_values = continue_values  # Utility of revealing once more, then acting optimally
+        self.values = np.maximum(stop_values, continue_values)
+        self.continue_table = continue_values > stop_values
+        self.certainty_equivalent = certainty_equivalents  # Sure payout with the same utility as a value
+        
+        # Surviving games all pass through the same states, so the first stop is the optimal point
+        self.optimal_points = {
+            mine_count: int(np.flatnonzero(~self.continue_table[mine_count])[0])
+            for mine_count in range(1, self.continue_table.shape[0] - 1)
+        }
+    
+    def should_continue(self, mine_count: int, tiles_revealed: int) -> bool:
+        """O(1) policy lookup; states outside the grid always cash out"""
+        if not (0 <= mine_count < self.continue_table.shape[0] and 0 <= tiles_revealed < self.continue_table.shape[1]):
+            return False
+        return bool(self.continue_table[mine_count, tiles_revealed])
+    
+    def certainty_equivalents(self, mine_count: int, tiles_revealed: int) -> Tuple[float, float]:
+        """Sure payouts (in bets) worth the same as continuing and as cashing out"""
+        return (self.certainty_equivalent(float(self.continue_values[mine_count, tiles_revealed])),
+                self.certainty_equivalent(float(self.stop_values[mine_count, tiles_revealed])))
+    
+    def summary(self) -> Dict:
+        """Optimal points and certainty-equivalent payouts from a fresh game, per mine count"""
+        return {
+            mine_count: {
+                'optimal_point': point,
+                'certainty_equivalent': self.certainty_equivalent(float(self.values[mine_count, 0]))
+            }
+            for mine_count, point in self.optimal_points.items()
+        }
+
+def solve_optimal_stopping(multiplier_table: np.ndarray, step_safe_table: np.ndarray, objective: str = "risk_neutral",
+                           risk_aversion: float = 0.0, wealth: float = 100.0) -> OptimalStoppingSolution:
+    """Backward induction over the full state space for the given objective"""
+    utility, inverse = utility_functions(objective, risk_aversion, wealth)
+    grid_size = multiplier_table.shape[1] - 1
+    bust = utility(0.0)
+    
+    # Unreachable states and the forced stop after the last safe tile never beat cashing out
+    stop_values = np.full(multiplier_table.shape, -np.inf)
+    continue_values = np.full(multiplier_table.shape, -np.inf)
+    try:
+        for mine_count in range(multiplier_table.shape[0]):
+            safe_tiles_total = grid_size - mine_count
+            for tiles_revealed in range(safe_tiles_total, -1, -1):
+                stop_values[mine_count, tiles_revealed] = utility(float(multiplier_table[mine_count, tiles_revealed]))
+                if tiles_revealed < safe_tiles_total:
+                    safe_probability = float(step_safe_table[mine_count, tiles_revealed])
+                    next_value = max(stop_values[mine_count, tiles_revealed + 1],
+                                     continue_values[mine_count, tiles_revealed + 1])
+                    continue_values[mine_count, tiles_revealed] = (safe_probability * next_value
+                                                                  + (1 - safe_probability) * bust)
+    except OverflowError:
+        raise ValueError("Risk aversion is too extreme for the multipliers on this grid")
+    
+    for table in (stop_values, continue_values):
+        table.setflags(write=False)
+    return OptimalStoppingSolution(objective, risk_aversion, wealth, stop_values, continue_values, inverse)
@@ -1,14 +1,83 @@
 import math
 import random
-from typing import List, Tuple, Dict
+import threading
+import numpy as np
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple, Dict
+from game_config import DEFAULT_GAME_CONFIG, GameConfig
 from models import GameSession, ProbabilityAnalysis, StrategyRecommendation
+from optimal_stopping import OptimalStoppingSolution, solve_optimal_stopping
+
+DEFAULT_WEALTH = 100.0  # Bankroll in bets assumed by wealth-based objectives
+MAX_MEMOIZED_POLICIES = 64
+MAX_MEMOIZED_RECOMMENDATIONS = 4096
+RISK_LEVELS = ("Low", "Medium", "High")
+
+class _MemoizedRecommendation(NamedTuple):
+    """Bet-independent part of a recommendation; the bet only rescales its expected values"""
+    action: str
+    confidence: float
+    reasoning: str
+    risk_level: str
+    safe_probability: float
+    mine_probability: float
+    next_multiplier: float
+    playable: bool  # Whether a safe tile remains, so continuing has a non-zero expected value
+
+@lru_cache(maxsize=32)
+def _build_tables(config: GameConfig) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Dense (mine_count, tiles_revealed) tables of multiplier, step safe probability, survival and EV"""
+    # Built lazily, once per profile, and shared by every engine for that profile
+    grid_size = config.grid_size
+    shape = (grid_size + 1, grid_size + 1)
+    multipliers = np.zeros(shape)  # 0 where the state cannot be reached
+    step_safe = np.zeros(shape)  # Chance that the next reveal is safe
+    survival = np.zeros(shape)  # Chance that every reveal so far was safe
+    
+    for mines in range(grid_size + 1):
+        safe_tiles_total = grid_size - mines
+        multiplier = 1.0
+        probability = 1.0
+        # Same running products as the scalar formulas, so lookups match them exactly
+        for tiles_revealed in range(grid_size + 1):
+            survival[mines, tiles_revealed] = probability
+            if tiles_revealed <= safe_tiles_total:
+                multipliers[mines, tiles_revealed] = round(multiplier, 4)
+            
+            remaining_total = grid_size - tiles_revealed
+            if remaining_total > 0:
+                step_safe[mines, tiles_revealed] = max(safe_tiles_total - tiles_revealed, 0) / remaining_total
+                probability *= step_safe[mines, tiles_revealed]
+            if tiles_revealed < safe_tiles_total:
+                risk_factor = remaining_total / (safe_tiles_total - tiles_revealed)
+                multiplier *= risk_factor * config.house_edge_factor
+    
+    # Expected payout per unit bet when cashing out after tiles_revealed
+    expected_values = survival * multipliers
+    tables = (multipliers, step_safe, survival, expected_values)
+    for table in tables:
+        table.setflags(write=False)  # Shared by every engine instance
+    return tables
 
 class MinesProbabilityEngine:
     """Advanced probability calculation engine for Mines game analysis"""
     
-    def __init__(self):
-        self.grid_size = 25  # 5x5 grid
-        
+    # Bump whenever the multiplier formula changes; cached simulation results are keyed on it
+    MULTIPLIER_VERSION = "1"
+    
+    def __init__(self, config: GameConfig = DEFAULT_GAME_CONFIG):
+        self.config = config
+        self.grid_size = config.grid_size
+        # Indexed [mine_count, tiles_revealed]; rows give whole curves for one mine count
+        (self.multiplier_table, self.step_safe_table,
+         self.survival_table, self.expected_value_table) = _build_tables(config)
+        self._optimal_policies: Dict[Tuple[str, float, float], OptimalStoppingSolution] = {}
+        self._recommendations: "OrderedDict[Tuple, _MemoizedRecommendation]" = OrderedDict()
+        self._recommendations_lock = threading.Lock()
+        self.recommendation_hits = 0
+        self.recommendation_misses = 0
+    
     def calculate_safe_probability(self, mines_remaining: int, tiles_remaining: int) -> float:
         """Calculate probability of next tile being safe"""
         if tiles_remaining <= 0:
@@ -24,6 +93,8 @@ class MinesProbabilityEngine:
     
     def calculate_multiplier(self, mines: int, tiles_revealed: int) -> float:
         """Calculate current multiplier based on mines and tiles revealed"""
+        if 0 <= mines <= self.grid_size and 0 <= tiles_revealed <= self.grid_size - mines:
+            return float(self.multiplier_table[mines, tiles_revealed])
         if tiles_revealed == 0:
             return 1.0
         
@@ -36,10 +107,45 @@ class MinesProbabilityEngine:
             remaining_total = self.grid_size - i
             if remaining_total > 0:
                 risk_factor = remaining_total / remaining_safe
-                multiplier *= risk_factor * 0.95  # House edge factor
+                multiplier *= risk_factor * self.config.house_edge_factor
         
         return round(multiplier, 4)
     
+    def calculate_survival_probability(self, mines: int, tiles_revealed: int) -> float:
+        """Exact probability that the first tiles_revealed random reveals are all safe"""
+        if 0 <= mines <= self.grid_size and 0 <= tiles_revealed <= self.grid_size:
+            return float(self.survival_table[mines, tiles_revealed])
+        safe_tiles_total = self.grid_size - mines
+        if tiles_revealed > safe_tiles_total:
+            return 0.0
+        
+        # Hypergeometric product over the reveal sequence
+        probability = 1.0
+        for i in range(max(tiles_revealed, 0)):
+            probability *= (safe_tiles_total - i) / (self.grid_size - i)
+        return probability
+    
+    def optimal_policy(self, objective: str = "risk_neutral", risk_aversion: float = 0.0,
+                       wealth: float = DEFAULT_WEALTH) -> OptimalStoppingSolution:
+        """Memoized backward-induction solution over every (mine_count, tiles_revealed) state"""
+        key = self._policy_key(objective, risk_aversion, wealth)
+        solution = self._optimal_policies.get(key)
+        if solution is None:
+            solution = solve_optimal_stopping(self.multiplier_table, self.step_safe_table, *key)
+            if len(self._optimal_policies) >= MAX_MEMOIZED_POLICIES:
+                self._optimal_policies.pop(next(iter(self._optimal_policies)))
+            self._optimal_policies[key] = solution
+        return solution
+    
+    @staticmethod
+    def _policy_key(objective: str, risk_aversion: float, wealth: float) -> Tuple[str, float, float]:
+        # Parameters an objective ignores must not split the memo
+        if objective == "risk_neutral":
+            risk_aversion, wealth = 0.0, DEFAULT_WEALTH
+        elif objective == "cara":
+            wealth = DEFAULT_WEALTH
+        return objective, float(risk_aversion), float(wealth)
+    
     def calculate_expected_value(self, game_session: GameSession, next_multiplier: float) -> float:
         """Calculate expected value of revealing another tile"""
         mines_remaining = game_session.mine_count
@@ -68,7 +174,10 @@ class MinesProbabilityEngine:
         safe_prob = self.calculate_safe_probability(mines_remaining, tiles_remaining)
         mine_prob = self.calculate_mine_probability(mines_remaining, tiles_remaining)
         
-        next_multiplier = self.calculate_multiplier(game_session.mine_count, game_session.tiles_revealed + 1)
+        # Once every safe tile is revealed there is no next multiplier to compute
+        next_multiplier = 0.0
+        if safe_tiles_remaining > 0:
+            next_multiplier = self.calculate_multiplier(game_session.mine_count, game_session.tiles_revealed + 1)
         expected_value = self.calculate_expected_value(game_session, next_multiplier)
         
         # Determine risk level
@@ -91,82 +200,188 @@ class MinesProbabilityEngine:
             risk_level=risk_level
         )
     
-    def generate_strategy_recommendation(self, game_session: GameSession) -> StrategyRecommendation:
-        """Generate AI-powered strategy recommendation"""
-        analysis = self.analyze_game_state(game_session)
+    def generate_strategy_recommendation(self, game_session: GameSession, objective: str = "risk_neutral",
+                                         risk_aversion: float = 0.0,
+                                         wealth: float = DEFAULT_WEALTH) -> StrategyRecommendation:
+        """Recommend the action of the optimal stopping policy for the game state"""
+        # Everything but the expected values is independent of the bet and the multiplier reached,
+        # so states share one entry
+        key = (self._policy_key(objective, risk_aversion, wealth), game_session.mine_count,
+               game_session.tiles_revealed)
+        with self._recommendations_lock:
+            memo = self._recommendations.get(key)
+            if memo is not None:
+                self._recommendations.move_to_end(key)
+                self.recommendation_hits += 1
+            else:
+                self.recommendation_misses += 1
         
-        mines_remaining = game_session.mine_count
-        tiles_remaining = self.grid_size - game_session.tiles_revealed
+        if memo is None:
+            memo = self._memoizable_recommendation(game_session.mine_count, game_session.tiles_revealed,
+                                                   objective, risk_aversion, wealth)
+            with self._recommendations_lock:
+                self._recommendations[key] = memo
+                if len(self._recommendations) > MAX_MEMOIZED_RECOMMENDATIONS:
+                    self._recommendations.popitem(last=False)
         
-        # Advanced recommendation logic
-        if analysis.mine_probability > 0.7:
-            action = "cash_out"
-            confidence = 0.9
-            reasoning = f"High mine probability ({analysis.mine_probability:.2%}). Recommended to secure current winnings."
-        elif analysis.expected_value > game_session.bet_amount * game_session.current_multiplier * 0.1:
-            action = "continue"
-            confidence = min(0.8, analysis.safe_probability)
-            reasoning = f"Positive expected value. Safe probability: {analysis.safe_probability:.2%}"
-        elif game_session.current_multiplier > 2.0 and analysis.mine_probability > 0.4:
-            action = "cash_out"
-            confidence = 0.7
-            reasoning = f"Good multiplier achieved ({game_session.current_multiplier:.2f}x) with moderate risk."
-        else:
-            action = "continue"
-            confidence = analysis.safe_probability
-            reasoning = f"Continue with caution. Monitor risk levels."
+        # Same operations as calculate_expected_value, so rescaled results match an uncached run
+        bet_amount = game_session.bet_amount
+        current_multiplier = game_session.current_multiplier
+        expected_value = 0.0
+        if memo.playable:
+            expected_value = round((memo.safe_probability * (bet_amount * memo.next_multiplier))
+                                   - (memo.mine_probability * (bet_amount * current_multiplier)), 4)
+        return self._build_recommendation(memo.action, memo.confidence, memo.reasoning, memo.risk_level,
+                                          expected_value, memo.safe_probability, bet_amount, current_multiplier)
+    
+    def _memoizable_recommendation(self, mine_count: int, tiles_revealed: int, objective: str,
+                                   risk_aversion: float, wealth: float) -> _MemoizedRecommendation:
+        policy = self.optimal_policy(objective, risk_aversion, wealth)
+        tiles_remaining = self.grid_size - tiles_revealed
+        safe_tiles_remaining = tiles_remaining - mine_count
+        mine_probability = self.calculate_mine_probability(mine_count, tiles_remaining)
+        playable = tiles_remaining > 0 and safe_tiles_remaining > 0
+        
+        in_play = 0 <= tiles_revealed < self.grid_size - mine_count
+        # O(1) lookups against the memoized policy and value function
+        should_continue = in_play and policy.should_continue(mine_count, tiles_revealed)
+        certainty_equivalents = policy.certainty_equivalents(mine_count, tiles_revealed) if in_play else None
+        action, confidence, reasoning = self._decide(objective, should_continue, certainty_equivalents)
         
+        return _MemoizedRecommendation(
+            action=action,
+            confidence=confidence,
+            reasoning=reasoning,
+            risk_level=RISK_LEVELS[0 if mine_probability <= 0.2 else 1 if mine_probability <= 0.5 else 2],
+            safe_probability=self.calculate_safe_probability(mine_count, tiles_remaining),
+            mine_probability=mine_probability,
+            next_multiplier=self.calculate_multiplier(mine_count, tiles_revealed + 1) if playable else 0.0,
+            playable=playable
+        )
+    
+    def recommendation_cache_stats(self) -> Dict[str, float]:
+        """Hit/miss counters for the recommendation memo"""
+        with self._recommendations_lock:
+            lookups = self.recommendation_hits + self.recommendation_misses
+            return {
+                "entries": len(self._recommendations),
+                "max_entries": MAX_MEMOIZED_RECOMMENDATIONS,
+                "hits": self.recommendation_hits,
+                "misses": self.recommendation_misses,
+                "hit_rate": self.recommendation_hits / lookups if lookups else 0.0
+            }
+    
+    @staticmethod
+    def _decide(objective: str, should_continue: bool,
+                certainty_equivalents: Optional[Tuple[float, float]]) -> Tuple[str, float, str]:
+        if certainty_equivalents is None:
+            return "cash_out", 1.0, "No safe tiles remain. Secure current winnings."
+        continue_value, cash_out_value = certainty_equivalents
+        gap = abs(continue_value - cash_out_value) / max(abs(continue_value), abs(cash_out_value), 1e-9)
+        reasoning = (f"Optimal {objective.replace('_', '-')} policy: continuing is worth {continue_value:.4f}x "
+                     f"against {cash_out_value:.4f}x for cashing out.")
+        return ("continue" if should_continue else "cash_out"), min(0.95, 0.5 + gap), reasoning
+    
+    @staticmethod
+    def _build_recommendation(action: str, confidence: float, reasoning: str, risk_level: str,
+                              expected_value: float, safe_probability: float, bet_amount: float,
+                              current_multiplier: float) -> StrategyRecommendation:
         # Alternative actions
         alternatives = []
         if action == "continue":
             alternatives.append({
                 "action": "cash_out",
-                "expected_value": game_session.bet_amount * game_session.current_multiplier,
+                "expected_value": bet_amount * current_multiplier,
                 "reasoning": "Secure current winnings"
             })
         else:
             alternatives.append({
                 "action": "continue",
-                "expected_value": analysis.expected_value,
-                "reasoning": f"Risk one more tile for {analysis.safe_probability:.2%} chance of success"
+                "expected_value": expected_value,
+                "reasoning": f"Risk one more tile for {safe_probability:.2%} chance of success"
             })
         
         return StrategyRecommendation(
             action=action,
             confidence=confidence,
             reasoning=reasoning,
-            risk_assessment=analysis.risk_level,
-            expected_value=analysis.expected_value,
+            risk_assessment=risk_level,
+            expected_value=expected_value,
             alternative_actions=alternatives
         )
     
-    def calculate_optimal_stopping_point(self, mine_count: int, bet_amount: float = 1.0) -> int:
-        """Calculate theoretical optimal stopping point using dynamic programming"""
-        safe_tiles_total = self.grid_size - mine_count
+    def analyze_game_states(self, mine_counts: np.ndarray, tiles_revealed: np.ndarray,
+                            current_multipliers: np.ndarray, bet_amounts: np.ndarray) -> List[ProbabilityAnalysis]:
+        """analyze_game_state over parallel arrays of game states"""
+        mine_counts = np.asarray(mine_counts, dtype=np.int64)
+        tiles_revealed = np.asarray(tiles_revealed, dtype=np.int64)
+        current_multipliers = np.asarray(current_multipliers, dtype=float)
+        bet_amounts = np.asarray(bet_amounts, dtype=float)
         
-        # Dynamic programming approach for optimal stopping
-        max_expected_value = 0
-        optimal_point = 0
+        tiles_remaining = self.grid_size - tiles_revealed
+        safe_tiles_remaining = tiles_remaining - mine_counts
+        has_tiles = tiles_remaining > 0
+        divisor = np.where(has_tiles, tiles_remaining, 1)
+        safe_probs = np.where(has_tiles, np.maximum(safe_tiles_remaining / divisor, 0.0), 0.0)
+        mine_probs = np.where(has_tiles, np.minimum(mine_counts / divisor, 1.0), 0.0)
         
-        for tiles_revealed in range(safe_tiles_total):
-            current_multiplier = self.calculate_multiplier(mine_count, tiles_revealed)
-            current_value = bet_amount * current_multiplier
-            
-            # Expected value of continuing
-            if tiles_revealed < safe_tiles_total:
-                next_multiplier = self.calculate_multiplier(mine_count, tiles_revealed + 1)
-                tiles_remaining = self.grid_size - tiles_revealed
-                mines_remaining = mine_count
-                safe_prob = (tiles_remaining - mines_remaining) / tiles_remaining
-                
-                continue_ev = safe_prob * bet_amount * next_multiplier
-                
-                if continue_ev > current_value and current_value > max_expected_value:
-                    max_expected_value = current_value
-                    optimal_point = tiles_revealed
-            else:
-                if current_value > max_expected_value:
-                    max_expected_value = current_value
-                    optimal_point = tiles_revealed
+        # Same operations as calculate_expected_value, so results match the scalar path exactly
+        next_multipliers = self.multiplier_table[mine_counts, np.clip(tiles_revealed + 1, 0, self.grid_size)]
+        current_values = bet_amounts * current_multipliers
+        expected_values = np.where(has_tiles & (safe_tiles_remaining > 0),
+                                   safe_probs * (bet_amounts * next_multipliers) - mine_probs * current_values, 0.0)
+        risk_levels = np.where(mine_probs <= 0.2, 0, np.where(mine_probs <= 0.5, 1, 2))
         
-        return optimal_point
\ No newline at end of file
+        analyses = []
+        for safe_prob, mine_prob, expected_value, current_value, risk_level in zip(
+                safe_probs.tolist(), mine_probs.tolist(), expected_values.tolist(),
+                current_values.tolist(), risk_levels.tolist()):
+            expected_value = round(expected_value, 4)
+            analyses.append(ProbabilityAnalysis(
+                safe_probability=safe_prob,
+                mine_probability=mine_prob,
+                expected_value=expected_value,
+                optimal_cash_out=expected_value < current_value or mine_prob > 0.6,
+                risk_level=RISK_LEVELS[risk_level]
+            ))
+        return analyses
+    
+    def generate_strategy_recommendations(self, mine_counts: np.ndarray, tiles_revealed: np.ndarray,
+                                          current_multipliers: np.ndarray, bet_amounts: np.ndarray,
+                                          objective: str = "risk_neutral", risk_aversion: float = 0.0,
+                                          wealth: float = DEFAULT_WEALTH,
+                                          analyses: Optional[List[ProbabilityAnalysis]] = None
+                                          ) -> List[StrategyRecommendation]:
+        """generate_strategy_recommendation over parallel arrays of game states"""
+        mine_counts = np.asarray(mine_counts, dtype=np.int64)
+        tiles_revealed = np.asarray(tiles_revealed, dtype=np.int64)
+        current_multipliers = np.asarray(current_multipliers, dtype=float)
+        bet_amounts = np.asarray(bet_amounts, dtype=float)
+        if analyses is None:
+            analyses = self.analyze_game_states(mine_counts, tiles_revealed, current_multipliers, bet_amounts)
+        policy = self.optimal_policy(objective, risk_aversion, wealth)
+        
+        # Gather every state's decision and values from the policy tables at once
+        in_play = (tiles_revealed >= 0) & (tiles_revealed < self.grid_size - mine_counts)
+        columns = np.clip(tiles_revealed, 0, self.grid_size)
+        should_continue = in_play & policy.continue_table[mine_counts, columns]
+        continue_values = policy.continue_values[mine_counts, columns]
+        stop_values = policy.stop_values[mine_counts, columns]
+        
+        recommendations = []
+        for index, analysis in enumerate(analyses):
+            certainty_equivalents = None
+            if in_play[index]:
+                certainty_equivalents = (policy.certainty_equivalent(float(continue_values[index])),
+                                         policy.certainty_equivalent(float(stop_values[index])))
+            action, confidence, reasoning = self._decide(objective, bool(should_continue[index]),
+                                                         certainty_equivalents)
+            recommendations.append(self._build_recommendation(
+                action, confidence, reasoning, analysis.risk_level, analysis.expected_value,
+                analysis.safe_probability, float(bet_amounts[index]), float(current_multipliers[index])))
+        return recommendations
+    
+    def calculate_optimal_stopping_point(self, mine_count: int, bet_amount: float = 1.0) -> int:
+        """Risk-neutral optimal stopping point from the backward-induction policy"""
+        # Risk-neutral decisions scale with the bet, so bet_amount does not change the answer
+        return self.optimal_policy().optimal_points.get(mine_count, 0)
\ No newline at end of file
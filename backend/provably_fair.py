@@ -2,14 +2,81 @@ import hashlib
 import hmac
 import secrets
 import json
-from typing import List, Tuple, Dict
+import struct
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from game_config import DEFAULT_GAME_CONFIG, GameConfig
+from hash_chain import CHECKPOINT_INTERVAL, HashChain
 from models import ProvablyFairVerification
 
+WORD_BYTES = 4  # Bytes of HMAC output consumed per mine
+SEED_POOL_SIZE = 256  # Committed server seeds kept ready for new games and seed pairs
+
 class ProvablyFairSystem:
     """Cryptographic provably fair system for Mines game verification"""
     
-    def __init__(self):
-        self.grid_size = 25
+    def __init__(self, config: GameConfig = DEFAULT_GAME_CONFIG, seed_pool_size: int = SEED_POOL_SIZE):
+        self.config = config
+        self.grid_size = config.grid_size
+        self.seed_pool_size = seed_pool_size
+        self._seed_pool: "deque[Tuple[str, str]]" = deque()  # (server_seed, server_seed_hash)
+        self._seed_pool_lock = threading.Lock()
+        self.seed_pool_misses = 0
+        self.hash_chain: Optional[HashChain] = None
+    
+    def refill_seed_pool(self) -> int:
+        """Pre-generate committed server seeds up to the pool size; returns seeds added"""
+        with self._seed_pool_lock:
+            missing = self.seed_pool_size - len(self._seed_pool)
+        # Hash outside the lock so games keep drawing seeds while the pool refills
+        seeds = []
+        for _ in range(max(missing, 0)):
+            server_seed = self.generate_server_seed()
+            seeds.append((server_seed, self.create_seed_hash(server_seed)))
+        with self._seed_pool_lock:
+            self._seed_pool.extend(seeds)
+        return len(seeds)
+    
+    def take_committed_seed(self) -> Tuple[str, str]:
+        """A pre-generated (server_seed, server_seed_hash) pair, generated inline only if the pool is empty"""
+        with self._seed_pool_lock:
+            if self._seed_pool:
+                return self._seed_pool.popleft()
+            self.seed_pool_misses += 1
+        server_seed = self.generate_server_seed()
+        return server_seed, self.create_seed_hash(server_seed)
+    
+    def seed_pool_stats(self) -> Dict[str, int]:
+        """Current pool fill and how often it ran dry"""
+        with self._seed_pool_lock:
+            return {
+                "available": len(self._seed_pool),
+                "capacity": self.seed_pool_size,
+                "misses": self.seed_pool_misses
+            }
+    
+    def generate_hash_chain(self, path: str, length: int,
+                            checkpoint_interval: int = CHECKPOINT_INTERVAL) -> HashChain:
+        """Commit to `length` future server seeds with one terminal hash and serve them from now on"""
+        self.hash_chain = HashChain.generate(path, length, checkpoint_interval)
+        return self.hash_chain
+    
+    def load_hash_chain(self, path: str) -> HashChain:
+        """Serve seeds from a previously generated chain file"""
+        self.hash_chain = HashChain.open(path)
+        return self.hash_chain
+    
+    def chain_game_setup(self, index: int, client_seed: str = None) -> Dict[str, Any]:
+        """Game setup on the index-th seed of the hash chain; its commitment is the seed served before it"""
+        if self.hash_chain is None:
+            raise ValueError("No hash chain is loaded")
+        return {
+            'server_seed': self.hash_chain.seed_at(index),
+            'server_seed_hash': self.hash_chain.commitment_at(index),
+            'client_seed': client_seed or self.generate_client_seed(),
+            'chain_index': index
+        }
     
     def generate_server_seed(self) -> str:
         """Generate cryptographically secure server seed"""
@@ -23,81 +90,58 @@ class ProvablyFairSystem:
         """Create SHA-256 hash of server seed for pre-commitment"""
         return hashlib.sha256(server_seed.encode()).hexdigest()
     
-    def generate_game_result(self, server_seed: str, client_seed: str, nonce: int, mine_count: int) -> List[int]:
-        """Generate mine positions using HMAC-SHA256"""
-        # Combine seeds and nonce
-        message = f"{client_seed}:{nonce}"
-        
-        # Generate HMAC
-        hmac_result = hmac.new(
-            server_seed.encode(),
-            message.encode(),
-            hashlib.sha256
-        ).hexdigest()
+    def hmac_words(self, server_seed: str, client_seed: str, nonce: int,
+                   keyed_hmac: Optional[hmac.HMAC] = None) -> Iterator[int]:
+        """Big-endian 32-bit words of the HMAC-SHA256 byte stream for one game"""
+        if keyed_hmac is None:
+            keyed_hmac = hmac.new(server_seed.encode(), digestmod=hashlib.sha256)
+        words_per_block = keyed_hmac.digest_size // WORD_BYTES
+        unpack = struct.Struct(f">{words_per_block}I").unpack
         
-        # Convert hex to bytes and use for random generation
-        random_bytes = bytes.fromhex(hmac_result)
-        
-        # Use Fisher-Yates shuffle algorithm with the random bytes
-        positions = list(range(self.grid_size))
+        message = f"{client_seed}:{nonce}"
+        words_used = 0
+        while True:
+            # Copying the keyed state skips re-deriving the HMAC key pads for every block
+            block = keyed_hmac.copy()
+            block.update(message.encode())
+            yield from unpack(block.digest())
+            words_used += words_per_block
+            # Refill blocks are labelled with the index of the first mine they place
+            message = f"{client_seed}:{nonce}:{words_used}"
+    
+    def generate_game_result(self, server_seed: str, client_seed: str, nonce: int, mine_count: int,
+                             keyed_hmac: Optional[hmac.HMAC] = None) -> List[int]:
+        """Generate mine positions using HMAC-SHA256"""
+        # Each mine takes one word modulo the tiles still free, which stay in ascending order
+        remaining = list(range(self.grid_size))
         mine_positions = []
-        
-        byte_index = 0
-        for i in range(mine_count):
-            if byte_index >= len(random_bytes):
-                # If we run out of bytes, generate more
-                message = f"{client_seed}:{nonce}:{i}"
-                hmac_result = hmac.new(
-                    server_seed.encode(),
-                    message.encode(),
-                    hashlib.sha256
-                ).hexdigest()
-                random_bytes = bytes.fromhex(hmac_result)
-                byte_index = 0
-            
-            # Use bytes to select position
-            available_positions = [pos for pos in positions if pos not in mine_positions]
-            if not available_positions:
-                break
-                
-            # Generate index from bytes
-            random_value = 0
-            bytes_needed = min(4, len(random_bytes) - byte_index)  # Use up to 4 bytes
-            for j in range(bytes_needed):
-                random_value = (random_value << 8) | random_bytes[byte_index + j]
-            byte_index += bytes_needed
-            
-            selected_index = random_value % len(available_positions)
-            mine_positions.append(available_positions[selected_index])
+        words = self.hmac_words(server_seed, client_seed, nonce, keyed_hmac)
+        for _ in range(min(mine_count, self.grid_size)):
+            mine_positions.append(remaining.pop(next(words) % len(remaining)))
         
         return sorted(mine_positions)
     
+    def generate_game_results(self, server_seed: str, client_seed: str, nonce_start: int, count: int,
+                              mine_count: int) -> List[List[int]]:
+        """Mine positions for every nonce in [nonce_start, nonce_start + count)"""
+        keyed_hmac = hmac.new(server_seed.encode(), digestmod=hashlib.sha256)
+        return [
+            self.generate_game_result(server_seed, client_seed, nonce, mine_count, keyed_hmac)
+            for nonce in range(nonce_start, nonce_start + count)
+        ]
+    
     def verify_game_result(self, verification: ProvablyFairVerification) -> ProvablyFairVerification:
         """Verify that a game result is provably fair"""
         try:
-            # Generate expected result
-            expected_positions = self.generate_game_result(
+            is_valid, expected_positions, verification_hash = self.verify_record(
                 verification.server_seed,
                 verification.client_seed,
                 verification.nonce,
-                len(verification.game_result)
+                verification.game_result
             )
             
-            # Create verification hash
-            verification_data = {
-                'server_seed': verification.server_seed,
-                'client_seed': verification.client_seed,
-                'nonce': verification.nonce,
-                'mine_positions': expected_positions
-            }
-            verification_hash = hashlib.sha256(
-                json.dumps(verification_data, sort_keys=True).encode()
-            ).hexdigest()
-            
-            # Check if results match
-            is_valid = sorted(verification.game_result) == sorted(expected_positions)
-            
             return ProvablyFairVerification(
+                profile=verification.profile,
                 server_seed=verification.server_seed,
                 client_seed=verification.client_seed,
                 nonce=verification.nonce,
@@ -108,6 +152,7 @@ class ProvablyFairSystem:
             
         except Exception as e:
             return ProvablyFairVerification(
+                profile=verification.profile,
                 server_seed=verification.server_seed,
                 client_seed=verification.client_seed,
                 nonce=verification.nonce,
@@ -116,14 +161,56 @@ class ProvablyFairSystem:
                 verification_hash=""
             )
     
+    def verify_record(self, server_seed: str, client_seed: str, nonce: int,
+                      game_result: List[int]) -> Tuple[bool, List[int], str]:
+        """Validity, expected mine positions and verification hash for one game"""
+        # Generate expected result
+        expected_positions = self.generate_game_result(server_seed, client_seed, nonce, len(game_result))
+        
+        # Create verification hash
+        verification_data = {
+            'server_seed': server_seed,
+            'client_seed': client_seed,
+            'nonce': nonce,
+            'mine_positions': expected_positions
+        }
+        verification_hash = hashlib.sha256(
+            json.dumps(verification_data, sort_keys=True).encode()
+        ).hexdigest()
+        
+        # Check if results match
+        return sorted(game_result) == expected_positions, expected_positions, verification_hash
+    
+    def verify_records(self, first_index: int, records: List[Union[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Verify a chunk of bulk records, given as parsed objects or raw NDJSON lines"""
+        results = []
+        for index, record in enumerate(records, first_index):
+            try:
+                if isinstance(record, str):
+                    record = json.loads(record)
+                nonce = record['nonce']
+                if not self.validate_fairness_parameters(record['server_seed'], record['client_seed'], nonce):
+                    raise ValueError("Invalid fairness parameters")
+                is_valid, expected_positions, verification_hash = self.verify_record(
+                    record['server_seed'], record['client_seed'], nonce, [int(position) for position in record['game_result']]
+                )
+                results.append({
+                    'index': index,
+                    'nonce': nonce,
+                    'is_valid': is_valid,
+                    'expected_result': expected_positions,
+                    'verification_hash': verification_hash
+                })
+            except (ValueError, TypeError, KeyError) as e:
+                results.append({'index': index, 'is_valid': False, 'error': f"Invalid record: {e}"})
+        return results
+    
     def create_game_setup(self, client_seed: str = None) -> Dict[str, str]:
         """Create initial game setup with seeds"""
-        server_seed = self.generate_server_seed()
+        server_seed, server_seed_hash = self.take_committed_seed()
         if not client_seed:
             client_seed = self.generate_client_seed()
         
-        server_seed_hash = self.create_seed_hash(server_seed)
-        
         return {
             'server_seed': server_seed,
             'server_seed_hash': server_seed_hash,
@@ -148,4 +235,13 @@ class ProvablyFairSystem:
             
             return True
         except (ValueError, TypeError):
-            return False
\ No newline at end of file
+            return False
+
+_chunk_systems: Dict[GameConfig, ProvablyFairSystem] = {}
+
+def verify_chunk(config: GameConfig, first_index: int, records: List[Union[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Process-pool entry point: verify one chunk of bulk records with a per-process system"""
+    system = _chunk_systems.get(config)
+    if system is None:
+        system = _chunk_systems[config] = ProvablyFairSystem(config)
+    return system.verify_records(first_index, records)
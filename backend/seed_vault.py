@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from models import SeedPair, SeedPairStatus, SeedRotation
+from provably_fair import ProvablyFairSystem
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_EXCLUDE = {"_id": 0, "server_seed": 0}
+# Pairs committed before the active game counter existed have no field, which Mongo matches as None
+NO_ACTIVE_GAMES = {"$in": [0, None]}
+
+class SeedPairInUse(Exception):
+    """Raised when a pair whose games are still in play would have to be revealed"""
+
+class SeedVault:
+    """Per-user seed pairs in Mongo: one active pair whose nonce advances with every game"""
+    
+    def __init__(self, collection, fairness: ProvablyFairSystem, refill_interval: float = 1.0,
+                 refill_threshold: float = 0.5):
+        self.collection = collection
+        self.fairness = fairness
+        self.refill_interval = refill_interval  # Seconds between pool checks
+        self.refill_threshold = refill_threshold  # Refill once the pool drops below this share of capacity
+        self._refill_task: Optional[asyncio.Task] = None
+    
+    async def ensure_indexes(self):
+        """Unique pair ids and commitments, and at most one active pair per user"""
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index("server_seed_hash", unique=True)
+        await self.collection.create_index("user_id", unique=True,
+                                           partialFilterExpression={"status": SeedPairStatus.ACTIVE.value})
+    
+    async def next_game(self, user_id: str, client_seed: Optional[str] = None) -> Dict[str, Any]:
+        """Seeds and nonce for the user's next game; a new client seed rotates the pair first"""
+        # The game holds the pair open until finish_game; while other games hold it, a new client
+        # seed cannot rotate it and raises SeedPairInUse rather than being silently ignored
+        if client_seed:
+            active = await self.collection.find_one({"user_id": user_id, "status": SeedPairStatus.ACTIVE.value},
+                                                    {"client_seed": 1})
+            if active is not None and active["client_seed"] != client_seed:
+                await self.rotate(user_id, client_seed)
+        
+        while True:
+            # The nonce increment is atomic, so concurrent games never share a nonce, and the same
+            # update holds the pair open, so no rotation can reveal it while this game is in play
+            pair_doc = await self.collection.find_one_and_update(
+                {"user_id": user_id, "status": SeedPairStatus.ACTIVE.value},
+                {"$inc": {"nonce": 1, "active_games": 1}},
+                projection={"_id": 0},
+                return_document=ReturnDocument.BEFORE
+            )
+            if pair_doc is not None:
+                return {
+                    "server_seed": pair_doc["server_seed"],
+                    "server_seed_hash": pair_doc["server_seed_hash"],
+                    "client_seed": pair_doc["client_seed"],
+                    "nonce": pair_doc["nonce"],
+                    "seed_pair_id": pair_doc["id"]
+                }
+            await self._create_active_pair(user_id, client_seed)
+    
+    async def rotate(self, user_id: str, client_seed: Optional[str] = None) -> SeedRotation:
+        """Reveal the user's active pair and commit to a fresh one; refused while the pair has active games"""
+        # Checking the counter and revealing in one update leaves no gap for a game to start in
+        revealed_doc = await self.collection.find_one_and_update(
+            {"user_id": user_id, "status": SeedPairStatus.ACTIVE.value, "active_games": NO_ACTIVE_GAMES},
+            {"$set": {"status": SeedPairStatus.REVEALED.value, "revealed_at": datetime.utcnow()}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if revealed_doc is None:
+            active = await self.collection.find_one({"user_id": user_id, "status": SeedPairStatus.ACTIVE.value},
+                                                    {"id": 1})
+            if active is not None:
+                raise SeedPairInUse(f"Seed pair {active['id']} has active games")
+        active = await self._create_active_pair(user_id, client_seed)
+        return SeedRotation(revealed=SeedPair(**revealed_doc) if revealed_doc else None, active=active)
+    
+    async def finish_game(self, pair_id: str):
+        """Release the hold a game took on its pair in next_game, once the game ends or was never stored"""
+        await self.collection.update_one({"id": pair_id, "active_games": {"$gt": 0}}, {"$inc": {"active_games": -1}})
+    
+    async def get_active(self, user_id: str) -> Optional[SeedPair]:
+        """The user's current commitment, without its server seed"""
+        pair_doc = await self.collection.find_one({"user_id": user_id, "status": SeedPairStatus.ACTIVE.value},
+                                                  PUBLIC_EXCLUDE)
+        return SeedPair(**pair_doc) if pair_doc else None
+    
+    async def get_pair(self, pair_id: str) -> Optional[SeedPair]:
+        """A pair by id; the server seed is only included once the pair is revealed"""
+        pair_doc = await self.collection.find_one({"id": pair_id}, {"_id": 0})
+        if pair_doc is None:
+            return None
+        if pair_doc["status"] != SeedPairStatus.REVEALED.value:
+            pair_doc.pop("server_seed", None)
+        return SeedPair(**pair_doc)
+    
+    def start(self):
+        """Fill the server seed pool and keep it topped up in the background"""
+        if self._refill_task is None:
+            self._refill_task = asyncio.create_task(self._refill_loop())
+    
+    async def stop(self):
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+    
+    async def _create_active_pair(self, user_id: str, client_seed: Optional[str]) -> SeedPair:
+        server_seed, server_seed_hash = self.fairness.take_committed_seed()
+        pair = SeedPair(user_id=user_id, server_seed=server_seed, server_seed_hash=server_seed_hash,
+                        client_seed=client_seed or self.fairness.generate_client_seed())
+        try:
+            await self.collection.insert_one(pair.dict())
+        except DuplicateKeyError:
+            # Another request committed the user's active pair first; use that one
+            pair_doc = await self.collection.find_one({"user_id": user_id, "status": SeedPairStatus.ACTIVE.value},
+                                                      PUBLIC_EXCLUDE)
+            if pair_doc is None:
+                raise
+            return SeedPair(**pair_doc)
+        return pair.copy(update={"server_seed": None})
+    
+    async def _refill_loop(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            try:
+                stats = self.fairness.seed_pool_stats()
+                if stats["available"] < stats["capacity"] * self.refill_threshold:
+                    await loop.run_in_executor(None, self.fairness.refill_seed_pool)
+            except Exception as e:
+                logger.warning(f"Seed pool refill failed: {str(e)}")
+            await asyncio.sleep(self.refill_interval)
@@ -2,20 +2,36 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 from dotenv import load_dotenv
 from pathlib import Path
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, NamedTuple, Union
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import asyncio
+import json
+import multiprocessing
+import time
+import uuid
 
 # Import our custom modules
 from models import *
-from probability_engine import MinesProbabilityEngine
-from monte_carlo_engine import MonteCarloSimulationEngine
-from provably_fair import ProvablyFairSystem
+from game_config import DEFAULT_GAME_CONFIG, GAME_PROFILES, get_game_config, load_game_profiles
+from probability_engine import MinesProbabilityEngine, DEFAULT_WEALTH
+from optimal_stopping import OBJECTIVES
+from monte_carlo_engine import MonteCarloSimulationEngine, SimulationCancelled
+from provably_fair import ProvablyFairSystem, verify_chunk
+from hash_chain import verify_chain_segment
+from fairness_audit import FairnessAudit, audit_nonce_range
+from simulation_jobs import SimulationJobManager
+from simulation_cache import SimulationCache
+from seed_vault import SeedPairInUse, SeedVault
+from single_flight import SingleFlight
 from advanced_analytics import UserBehaviorAnalytics, EnsemblePredictionSystem, AnomalyDetector
 
 # Load environment variables
@@ -29,11 +45,42 @@ db = client[os.environ['DB_NAME']]
 
 # Initialize engines
 prob_engine = MinesProbabilityEngine()
-monte_carlo_engine = MonteCarloSimulationEngine()
+monte_carlo_engine = MonteCarloSimulationEngine(
+    max_workers=int(os.environ.get('SIMULATION_WORKERS', os.cpu_count() or 1))
+)
 provably_fair_system = ProvablyFairSystem()
 behavior_analytics = UserBehaviorAnalytics()
 anomaly_detector = AnomalyDetector()
 ensemble_system = EnsemblePredictionSystem(prob_engine, monte_carlo_engine, behavior_analytics)
+load_game_profiles(os.environ.get('GAME_PROFILES', ''))  # JSON list of extra casino variants
+
+class GameEngines(NamedTuple):
+    prob_engine: MinesProbabilityEngine
+    monte_carlo_engine: MonteCarloSimulationEngine
+    provably_fair_system: ProvablyFairSystem
+    ensemble_system: EnsemblePredictionSystem
+
+profile_engines: Dict[str, GameEngines] = {
+    DEFAULT_GAME_CONFIG.name: GameEngines(prob_engine, monte_carlo_engine, provably_fair_system, ensemble_system)
+}
+job_manager = SimulationJobManager(
+    db,
+    max_concurrent_jobs=int(os.environ.get('SIMULATION_JOB_CONCURRENCY', 2))
+)
+simulation_cache = SimulationCache(
+    db.simulation_cache,
+    max_entries=int(os.environ.get('SIMULATION_CACHE_SIZE', 256)),
+    ttl_seconds=float(os.environ.get('SIMULATION_CACHE_TTL', 3600))
+)
+simulation_flights = SingleFlight()
+# Seeds do not depend on the profile, so every game draws from the default system's pool
+seed_vault = SeedVault(db.seed_pairs, provably_fair_system)
+VERIFICATION_WORKERS = int(os.environ.get('VERIFICATION_WORKERS', os.cpu_count() or 1))
+VERIFICATION_CHUNK_SIZE = 2000  # Records per process-pool task
+verification_executor: Optional[ProcessPoolExecutor] = None
+HASH_CHAIN_DIR = Path(os.environ.get('HASH_CHAIN_DIR', ROOT_DIR / 'hash_chains'))
+HASH_CHAIN_SEGMENT_SIZE = 250000  # Seeds per process-pool verification task
+STORED_AUDIT_BATCH_SIZE = 10000  # Game documents read per round trip during a fairness audit
 
 # Create the main app
 app = FastAPI(
@@ -63,56 +110,112 @@ logger = logging.getLogger(__name__)
 
 # === GAME SESSION ENDPOINTS ===
 
-@api_router.post("/game/create", response_model=GameSession)
+def get_engines(profile: str) -> GameEngines:
+    """Engines for a game profile, built on first use; tables are cached per profile"""
+    engines = profile_engines.get(profile)
+    if engines is None:
+        try:
+            config = get_game_config(profile)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # Variants share the default engine's process pool
+        variant = monte_carlo_engine.with_config(config)
+        engines = profile_engines[profile] = GameEngines(
+            variant.prob_engine,
+            variant,
+            ProvablyFairSystem(config),
+            EnsemblePredictionSystem(variant.prob_engine, variant, behavior_analytics)
+        )
+    return engines
+
+def conceal_server_seed(game_session: GameSessionView) -> GameSessionView:
+    """Seed pair games share the server seed with later nonces, so it stays secret until the pair rotates"""
+    if game_session.seed_pair_id:
+        game_session.server_seed = None
+    return game_session
+
+async def save_game_move(game_session: GameSession):
+    """Store a move on an active game and release its seed pair once the game ends"""
+    # Only a still-active game takes the write, so concurrent moves cannot end a game twice
+    update = await db.game_sessions.replace_one({"id": game_session.id, "status": GameStatus.ACTIVE.value},
+                                                game_session.dict())
+    if update.matched_count == 0:
+        raise HTTPException(status_code=400, detail="Game is not active")
+    if game_session.status != GameStatus.ACTIVE and game_session.seed_pair_id:
+        await seed_vault.finish_game(game_session.seed_pair_id)
+
+async def claim_chain_seed(client_seed: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Setup on the next unserved seed of the active hash chain; None without a chain or once it runs out"""
+    chain = provably_fair_system.hash_chain
+    if chain is None:
+        return None
+    # The atomic increment hands every seed to exactly one game, in chain order
+    chain_doc = await db.hash_chains.find_one_and_update(
+        {"terminal_hash": chain.terminal_hash, "next_index": {"$lt": chain.length}},
+        {"$inc": {"next_index": 1}},
+        projection={"_id": 0, "next_index": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if chain_doc is None:
+        return None
+    return provably_fair_system.chain_game_setup(chain_doc["next_index"], client_seed)
+
+@api_router.post("/game/create", response_model=GameSessionView)
 async def create_game_session(game_data: GameSessionCreate):
     """Create a new game session with provably fair setup"""
+    held_pair_id = None
     try:
-        # Setup provably fair system
-        fair_setup = provably_fair_system.create_game_setup(game_data.client_seed)
+        engines = get_engines(game_data.profile)
+        
+        # Users play on their active seed pair; anonymous games take the next hash chain seed,
+        # or a one-off pooled seed without a chain, at nonce 0
+        if game_data.user_id:
+            fair_setup = await seed_vault.next_game(game_data.user_id, game_data.client_seed)
+            held_pair_id = fair_setup['seed_pair_id']
+        else:
+            fair_setup = (await claim_chain_seed(game_data.client_seed)
+                          or provably_fair_system.create_game_setup(game_data.client_seed))
+            fair_setup['nonce'] = 0
         
         # Generate mine positions
-        mine_positions = provably_fair_system.generate_game_result(
+        mine_positions = engines.provably_fair_system.generate_game_result(
             fair_setup['server_seed'],
             fair_setup['client_seed'],
-            0,  # nonce starts at 0
+            fair_setup['nonce'],
             game_data.mine_count
         )
         
-        # Create tiles
-        tiles = []
-        for i in range(25):
-            tile = Tile(
-                position=i,
-                is_mine=(i in mine_positions)
-            )
-            tiles.append(tile)
-        
         # Create game session
         game_session = GameSession(
+            profile=game_data.profile,
+            user_id=game_data.user_id,
             mine_count=game_data.mine_count,
             bet_amount=game_data.bet_amount,
-            tiles=tiles,
+            mine_mask=positions_mask(mine_positions),
             server_seed=fair_setup['server_seed'],
             client_seed=fair_setup['client_seed'],
-            nonce=0
+            nonce=fair_setup['nonce'],
+            seed_pair_id=fair_setup.get('seed_pair_id'),
+            chain_index=fair_setup.get('chain_index')
         )
         
         # Save to database
         await db.game_sessions.insert_one(game_session.dict())
+        held_pair_id = None
         
         # Return session without revealing mine positions
-        safe_session = game_session.copy()
-        for tile in safe_session.tiles:
-            if tile.status == TileStatus.HIDDEN:
-                tile.is_mine = False  # Hide mine information
-        
-        return safe_session
+        return conceal_server_seed(game_session.to_view())
         
+    except SeedPairInUse:
+        raise HTTPException(status_code=409, detail="Finish active games before changing the client seed")
     except Exception as e:
         logger.error(f"Error creating game session: {str(e)}")
+        if held_pair_id is not None:
+            # The game was never stored, so it must not keep the pair from rotating
+            await seed_vault.finish_game(held_pair_id)
         raise HTTPException(status_code=500, detail="Failed to create game session")
 
-@api_router.get("/game/{game_id}", response_model=GameSession)
+@api_router.get("/game/{game_id}", response_model=GameSessionView)
 async def get_game_session(game_id: str):
     """Get game session by ID"""
     try:
@@ -120,15 +223,8 @@ async def get_game_session(game_id: str):
         if not game_doc:
             raise HTTPException(status_code=404, detail="Game session not found")
         
-        game_session = GameSession(**game_doc)
-        
-        # Hide mine positions for active games
-        if game_session.status == GameStatus.ACTIVE:
-            for tile in game_session.tiles:
-                if tile.status == TileStatus.HIDDEN:
-                    tile.is_mine = False
-        
-        return game_session
+        # Mine positions stay hidden for active games
+        return conceal_server_seed(GameSession(**game_doc).to_view())
         
     except HTTPException:
         raise
@@ -136,7 +232,7 @@ async def get_game_session(game_id: str):
         logger.error(f"Error getting game session: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get game session")
 
-@api_router.post("/game/{game_id}/reveal", response_model=GameSession)
+@api_router.post("/game/{game_id}/reveal", response_model=GameSessionView)
 async def reveal_tiles(game_id: str, update_data: GameSessionUpdate):
     """Reveal tiles in a game session"""
     try:
@@ -149,43 +245,44 @@ async def reveal_tiles(game_id: str, update_data: GameSessionUpdate):
         if game_session.status != GameStatus.ACTIVE:
             raise HTTPException(status_code=400, detail="Game is not active")
         
+        engine = get_engines(game_session.profile).prob_engine
+        
         # Reveal tiles
         hit_mine = False
         for position in update_data.revealed_positions:
-            if position < 0 or position >= 25:
+            if position < 0 or position >= engine.grid_size:
                 raise HTTPException(status_code=400, detail="Invalid tile position")
             
-            tile = game_session.tiles[position]
-            if tile.status != TileStatus.HIDDEN:
+            bit = 1 << position
+            if game_session.revealed_mask & bit:
                 continue  # Skip already revealed tiles
             
-            if tile.is_mine:
-                tile.status = TileStatus.REVEALED_MINE
+            game_session.revealed_mask |= bit
+            if game_session.mine_mask & bit:
                 game_session.status = GameStatus.LOST
                 hit_mine = True
                 break
             else:
-                tile.status = TileStatus.REVEALED_SAFE
                 game_session.tiles_revealed += 1
         
         # Update multiplier
         if not hit_mine:
-            game_session.current_multiplier = prob_engine.calculate_multiplier(
+            game_session.current_multiplier = engine.calculate_multiplier(
                 game_session.mine_count, 
                 game_session.tiles_revealed
             )
         
         # Check if all safe tiles revealed
-        safe_tiles_total = 25 - game_session.mine_count
+        safe_tiles_total = engine.grid_size - game_session.mine_count
         if game_session.tiles_revealed >= safe_tiles_total:
             game_session.status = GameStatus.COMPLETED
             game_session.final_multiplier = game_session.current_multiplier
             game_session.cash_out_amount = game_session.bet_amount * game_session.current_multiplier
         
         # Update in database
-        await db.game_sessions.replace_one({"id": game_id}, game_session.dict())
+        await save_game_move(game_session)
         
-        return game_session
+        return conceal_server_seed(game_session.to_view())
         
     except HTTPException:
         raise
@@ -193,7 +290,7 @@ async def reveal_tiles(game_id: str, update_data: GameSessionUpdate):
         logger.error(f"Error revealing tiles: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to reveal tiles")
 
-@api_router.post("/game/{game_id}/cashout", response_model=GameSession)
+@api_router.post("/game/{game_id}/cashout", response_model=GameSessionView)
 async def cash_out_game(game_id: str):
     """Cash out from current game session"""
     try:
@@ -212,9 +309,9 @@ async def cash_out_game(game_id: str):
         game_session.status = GameStatus.COMPLETED
         
         # Update in database
-        await db.game_sessions.replace_one({"id": game_id}, game_session.dict())
+        await save_game_move(game_session)
         
-        return game_session
+        return conceal_server_seed(game_session.to_view())
         
     except HTTPException:
         raise
@@ -233,7 +330,7 @@ async def get_probability_analysis(game_id: str):
             raise HTTPException(status_code=404, detail="Game session not found")
         
         game_session = GameSession(**game_doc)
-        analysis = prob_engine.analyze_game_state(game_session)
+        analysis = get_engines(game_session.profile).prob_engine.analyze_game_state(game_session)
         
         return analysis
         
@@ -243,8 +340,20 @@ async def get_probability_analysis(game_id: str):
         logger.error(f"Error analyzing probability: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to analyze probability")
 
+def get_optimal_policy(objective: str, risk_aversion: float, wealth: float,
+                       profile: str = DEFAULT_GAME_CONFIG.name):
+    """Solved stopping policy for the objective, rejecting parameters the solver cannot handle"""
+    if objective not in OBJECTIVES:
+        raise HTTPException(status_code=400, detail="Invalid objective")
+    engine = get_engines(profile).prob_engine
+    try:
+        return engine.optimal_policy(objective, risk_aversion, wealth)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @api_router.get("/analysis/strategy/{game_id}", response_model=StrategyRecommendation)
-async def get_strategy_recommendation(game_id: str):
+async def get_strategy_recommendation(game_id: str, objective: str = "risk_neutral", risk_aversion: float = 0.0,
+                                      wealth: float = DEFAULT_WEALTH):
     """Get AI-powered strategy recommendation"""
     try:
         game_doc = await db.game_sessions.find_one({"id": game_id})
@@ -252,7 +361,9 @@ async def get_strategy_recommendation(game_id: str):
             raise HTTPException(status_code=404, detail="Game session not found")
         
         game_session = GameSession(**game_doc)
-        recommendation = prob_engine.generate_strategy_recommendation(game_session)
+        get_optimal_policy(objective, risk_aversion, wealth, game_session.profile)
+        engine = get_engines(game_session.profile).prob_engine
+        recommendation = engine.generate_strategy_recommendation(game_session, objective, risk_aversion, wealth)
         
         return recommendation
         
@@ -262,50 +373,321 @@ async def get_strategy_recommendation(game_id: str):
         logger.error(f"Error generating strategy: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to generate strategy")
 
+@api_router.get("/analysis/cache/stats")
+async def get_recommendation_cache_stats():
+    """Hit/miss metrics for the strategy recommendation memo of each loaded profile"""
+    return {profile: engines.prob_engine.recommendation_cache_stats() for profile, engines in profile_engines.items()}
+
+@api_router.post("/analysis/batch", response_model=BatchAnalysisResult)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """Probability analysis and strategy recommendations for many games or raw states at once"""
+    try:
+        # One round trip for every game, fetching only the fields the analysis reads
+        game_ids = list(dict.fromkeys(request.game_ids))
+        docs = {}
+        if game_ids:
+            cursor = db.game_sessions.find(
+                {"id": {"$in": game_ids}},
+                {"_id": 0, "id": 1, "profile": 1, "mine_count": 1, "tiles_revealed": 1,
+                 "current_multiplier": 1, "bet_amount": 1}
+            )
+            docs = {doc["id"]: doc for doc in await cursor.to_list(len(game_ids))}
+        
+        entries = []  # (game_id, profile, state)
+        for game_id in game_ids:
+            doc = docs.get(game_id)
+            if doc is not None:
+                state = GameStateInput(mine_count=doc["mine_count"], tiles_revealed=doc.get("tiles_revealed", 0),
+                                       current_multiplier=doc.get("current_multiplier", 1.0),
+                                       bet_amount=doc["bet_amount"])
+                entries.append((game_id, doc.get("profile", DEFAULT_GAME_CONFIG.name), state))
+        for state in request.states:
+            if state.current_multiplier is None:
+                engine = get_engines(request.profile).prob_engine
+                state = state.copy(update={
+                    "current_multiplier": engine.calculate_multiplier(state.mine_count, state.tiles_revealed)
+                })
+            entries.append((None, request.profile, state))
+        
+        # Games from different variants are analyzed against their own profile's tables
+        by_profile: Dict[str, List[int]] = {}
+        for index, (_, profile, _) in enumerate(entries):
+            by_profile.setdefault(profile, []).append(index)
+        
+        items: List[Optional[BatchAnalysisItem]] = [None] * len(entries)
+        for profile, indices in by_profile.items():
+            get_optimal_policy(request.objective, request.risk_aversion, request.wealth, profile)
+            engine = get_engines(profile).prob_engine
+            states = [entries[index][2] for index in indices]
+            columns = (
+                [state.mine_count for state in states],
+                [state.tiles_revealed for state in states],
+                [state.current_multiplier for state in states],
+                [state.bet_amount for state in states]
+            )
+            analyses = engine.analyze_game_states(*columns)
+            recommendations = engine.generate_strategy_recommendations(
+                *columns, request.objective, request.risk_aversion, request.wealth, analyses=analyses
+            )
+            for index, state, analysis, recommendation in zip(indices, states, analyses, recommendations):
+                items[index] = BatchAnalysisItem(game_id=entries[index][0], profile=profile, state=state,
+                                                 probability=analysis, recommendation=recommendation)
+        
+        return BatchAnalysisResult(items=items, missing_game_ids=[game_id for game_id in game_ids if game_id not in docs])
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error analyzing batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to analyze batch")
+
 # === MONTE CARLO SIMULATION ENDPOINTS ===
 
 @api_router.post("/simulation/monte-carlo", response_model=MonteCarloResult)
 async def run_monte_carlo_simulation(request: MonteCarloRequest):
     """Run Monte Carlo simulation for strategy optimization"""
     try:
-        # Run simulation in background to avoid blocking
+        cache_params = request.dict()
+        cached = await simulation_cache.get("monte_carlo", cache_params)
+        if cached is not None:
+            return MonteCarloResult(**cached)
+        
+        async def simulate() -> MonteCarloResult:
+            # Run simulation in background to avoid blocking
+            result = await asyncio.get_event_loop().run_in_executor(
+                None, 
+                get_engines(request.profile).monte_carlo_engine.run_monte_carlo_simulation, 
+                request
+            )
+            
+            # Save result to database
+            await db.monte_carlo_results.insert_one(result.dict())
+            await simulation_cache.set("monte_carlo", cache_params, result.dict())
+            return result
+        
+        # Identical concurrent requests share one run
+        return await simulation_flights.do(simulation_cache.make_key("monte_carlo", cache_params), simulate)
+        
+    except Exception as e:
+        logger.error(f"Error running Monte Carlo simulation: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to run simulation")
+
+def validate_risk_analysis_params(mine_count: int, iterations: int, engine: str, seed: Optional[int],
+                                  variance_reduction: str = "none", profile: str = DEFAULT_GAME_CONFIG.name):
+    """Reject risk-analysis parameters the engines cannot handle"""
+    config = get_engines(profile).prob_engine.config
+    if mine_count < 1 or mine_count > config.max_mines:
+        raise HTTPException(status_code=400, detail="Invalid mine count")
+    if engine not in ("vectorized", "legacy", "exact"):
+        raise HTTPException(status_code=400, detail="Invalid simulation engine")
+    if seed is not None and seed < 0:
+        raise HTTPException(status_code=400, detail="Invalid seed")
+    if iterations < 1 or iterations > (100000 if engine == "legacy" else 100_000_000):
+        raise HTTPException(status_code=400, detail="Invalid iteration count")
+    if variance_reduction not in ("none", "importance_sampling", "antithetic", "control_variate"):
+        raise HTTPException(status_code=400, detail="Invalid variance reduction")
+    if variance_reduction != "none" and engine != "vectorized":
+        raise HTTPException(status_code=400, detail="Variance reduction requires the vectorized engine")
+
+@api_router.get("/simulation/risk-analysis/{mine_count}")
+async def get_risk_analysis(mine_count: int, iterations: int = 10000, engine: str = "vectorized",
+                            single_pass: bool = False, seed: Optional[int] = None,
+                            variance_reduction: str = "none", profile: str = DEFAULT_GAME_CONFIG.name):
+    """Get comprehensive risk-reward analysis"""
+    try:
+        validate_risk_analysis_params(mine_count, iterations, engine, seed, variance_reduction, profile)
+        
+        cache_params = {"profile": profile, "mine_count": mine_count, "iterations": iterations, "engine": engine,
+                        "single_pass": single_pass, "seed": seed, "variance_reduction": variance_reduction}
+        cached = await simulation_cache.get("risk_analysis", cache_params)
+        if cached is not None:
+            return cached
+        
+        async def analyze() -> Dict[str, Any]:
+            # Run analysis in background
+            analysis = await asyncio.get_event_loop().run_in_executor(
+                None,
+                get_engines(profile).monte_carlo_engine.analyze_risk_reward_profile,
+                mine_count,
+                iterations,
+                engine,
+                single_pass,
+                seed,
+                variance_reduction
+            )
+            
+            # Mongo documents need string keys
+            response = {"profile": profile, "mine_count": mine_count,
+                        "analysis": {str(point): metrics for point, metrics in analysis.items()}}
+            await simulation_cache.set("risk_analysis", cache_params, response)
+            return response
+        
+        # Identical concurrent requests share one run
+        return await simulation_flights.do(simulation_cache.make_key("risk_analysis", cache_params), analyze)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error running risk analysis: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to run risk analysis")
+
+@api_router.post("/simulation/bankroll", response_model=BankrollSimulationResult)
+async def run_bankroll_simulation(request: BankrollSimulationRequest):
+    """Simulate many bankroll paths and report ruin statistics"""
+    try:
         result = await asyncio.get_event_loop().run_in_executor(
-            None, 
-            monte_carlo_engine.run_monte_carlo_simulation, 
+            None,
+            get_engines(request.profile).monte_carlo_engine.simulate_bankroll_paths,
             request
         )
         
         # Save result to database
-        await db.monte_carlo_results.insert_one(result.dict())
+        await db.bankroll_simulations.insert_one(result.dict())
         
         return result
         
     except Exception as e:
-        logger.error(f"Error running Monte Carlo simulation: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to run simulation")
+        logger.error(f"Error running bankroll simulation: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to run bankroll simulation")
 
-@api_router.get("/simulation/risk-analysis/{mine_count}")
-async def get_risk_analysis(mine_count: int, iterations: int = 10000):
-    """Get comprehensive risk-reward analysis"""
+@api_router.post("/simulation/strategies", response_model=StrategyComparisonResult)
+async def compare_strategies(request: StrategyComparisonRequest):
+    """Compare strategy policies head-to-head on common random numbers"""
     try:
-        if mine_count < 1 or mine_count > 24:
-            raise HTTPException(status_code=400, detail="Invalid mine count")
-        
-        # Run analysis in background
-        analysis = await asyncio.get_event_loop().run_in_executor(
+        result = await asyncio.get_event_loop().run_in_executor(
             None,
-            monte_carlo_engine.analyze_risk_reward_profile,
-            mine_count,
-            iterations
+            get_engines(request.profile).monte_carlo_engine.compare_strategies,
+            request
         )
         
-        return {"mine_count": mine_count, "analysis": analysis}
+        # Save result to database
+        await db.strategy_comparisons.insert_one(result.dict())
+        
+        return result
+        
+    except Exception as e:
+        logger.error(f"Error comparing strategies: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to compare strategies")
+
+@api_router.post("/simulation/exact-distribution", response_model=PayoutDistributionResult)
+async def get_exact_payout_distribution(request: PayoutDistributionRequest):
+    """Exact payout distribution of a cash-out policy, computed without sampling"""
+    try:
+        return get_engines(request.profile).monte_carlo_engine.exact_payout_distribution(request)
+        
+    except Exception as e:
+        logger.error(f"Error computing payout distribution: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to compute payout distribution")
+
+@api_router.get("/simulation/cache/stats")
+async def get_simulation_cache_stats():
+    """Hit/miss metrics for the simulation result cache and request coalescing"""
+    stats = simulation_cache.stats()
+    stats["single_flight"] = simulation_flights.stats()
+    return stats
+
+@api_router.post("/simulation/cache/invalidate")
+async def invalidate_simulation_cache(namespace: Optional[str] = None):
+    """Drop cached simulation results, e.g. after a multiplier formula change"""
+    try:
+        if namespace is not None and namespace not in ("monte_carlo", "risk_analysis"):
+            raise HTTPException(status_code=400, detail="Invalid cache namespace")
+        removed = await simulation_cache.invalidate(namespace)
+        return {"invalidated": removed, "namespace": namespace}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error running risk analysis: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to run risk analysis")
+        logger.error(f"Error invalidating simulation cache: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to invalidate simulation cache")
+
+# === SIMULATION JOB ENDPOINTS ===
+
+@api_router.post("/simulation/jobs/monte-carlo", response_model=SimulationJob, status_code=202)
+async def submit_monte_carlo_job(request: MonteCarloRequest):
+    """Queue a Monte Carlo simulation and return its job handle"""
+    async def save_result(result: MonteCarloResult):
+        await db.monte_carlo_results.insert_one(result.dict())
+    
+    engine = get_engines(request.profile).monte_carlo_engine
+    try:
+        return await job_manager.submit(
+            "monte_carlo",
+            request.dict(),
+            lambda progress, cancel_event: engine.run_monte_carlo_simulation(request, progress, cancel_event),
+            lambda result: result.dict(),
+            on_result=save_result
+        )
+        
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+    except Exception as e:
+        logger.error(f"Error submitting Monte Carlo job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to submit simulation job")
+
+@api_router.post("/simulation/jobs/risk-analysis/{mine_count}", response_model=SimulationJob, status_code=202)
+async def submit_risk_analysis_job(mine_count: int, iterations: int = 10000, engine: str = "vectorized",
+                                   single_pass: bool = False, seed: Optional[int] = None,
+                                   variance_reduction: str = "none", profile: str = DEFAULT_GAME_CONFIG.name):
+    """Queue a risk-reward analysis and return its job handle"""
+    validate_risk_analysis_params(mine_count, iterations, engine, seed, variance_reduction, profile)
+    simulation_engine = get_engines(profile).monte_carlo_engine
+    
+    def run(progress, cancel_event):
+        return simulation_engine.analyze_risk_reward_profile(
+            mine_count, iterations, engine, single_pass, seed, variance_reduction, progress, cancel_event
+        )
+    
+    def serialize(analysis: Dict[int, Dict[str, float]]) -> Dict[str, Any]:
+        # Mongo documents need string keys
+        return {"profile": profile, "mine_count": mine_count,
+                "analysis": {str(point): metrics for point, metrics in analysis.items()}}
+    
+    try:
+        params = {"profile": profile, "mine_count": mine_count, "iterations": iterations, "engine": engine,
+                  "single_pass": single_pass, "seed": seed, "variance_reduction": variance_reduction}
+        return await job_manager.submit("risk_analysis", params, run, serialize)
+        
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+    except Exception as e:
+        logger.error(f"Error submitting risk analysis job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to submit simulation job")
+
+@api_router.get("/simulation/jobs/{job_id}", response_model=SimulationJob)
+async def get_simulation_job(job_id: str):
+    """Get the status, progress and result of a simulation job"""
+    job = await job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Simulation job not found")
+    return job
+
+@api_router.delete("/simulation/jobs/{job_id}", response_model=SimulationJob)
+async def cancel_simulation_job(job_id: str):
+    """Cancel a queued or running simulation job"""
+    job = await job_manager.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Simulation job not found")
+    return job
+
+@api_router.get("/simulation/jobs/{job_id}/events")
+async def stream_simulation_job(job_id: str):
+    """Stream job progress and partial results as server-sent events"""
+    if not await job_manager.get(job_id):
+        raise HTTPException(status_code=404, detail="Simulation job not found")
+    
+    async def event_stream():
+        async for event in job_manager.stream(job_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(event, default=str)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # === PROVABLY FAIR ENDPOINTS ===
 
@@ -313,13 +695,143 @@ async def get_risk_analysis(mine_count: int, iterations: int = 10000):
 async def verify_provably_fair(verification: ProvablyFairVerification):
     """Verify provably fair game result"""
     try:
-        result = provably_fair_system.verify_game_result(verification)
+        result = await asyncio.get_event_loop().run_in_executor(
+            None,
+            get_engines(verification.profile).provably_fair_system.verify_game_result,
+            verification
+        )
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error verifying provably fair: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to verify provably fair")
 
+def get_verification_executor() -> ProcessPoolExecutor:
+    """Process pool for bulk verification, started on first use"""
+    global verification_executor
+    if verification_executor is None:
+        # Spawned workers avoid forking a process that already runs threads
+        verification_executor = ProcessPoolExecutor(
+            max_workers=VERIFICATION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return verification_executor
+
+async def read_ndjson_lines(request: Request) -> AsyncIterator[str]:
+    """Non-empty lines of an NDJSON request body, read as it arrives"""
+    buffer = b""
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line.decode(errors="replace")
+    if buffer.strip():
+        yield buffer.decode(errors="replace")
+
+async def iterate_records(records: List[Any]) -> AsyncIterator[Any]:
+    """Async view of an already parsed batch"""
+    for record in records:
+        yield record
+
+async def stream_bulk_verification(config, records: AsyncIterator[Union[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+    """Verify records in chunks on the process pool and yield NDJSON results in input order"""
+    loop = asyncio.get_event_loop()
+    executor = get_verification_executor()
+    in_flight = deque()
+    summary = {"total": 0, "valid": 0, "invalid": 0, "errors": 0}
+    started = time.monotonic()
+    
+    def collect(results: List[Dict[str, Any]]) -> str:
+        for result in results:
+            summary["total"] += 1
+            if "error" in result:
+                summary["errors"] += 1
+            elif result["is_valid"]:
+                summary["valid"] += 1
+            else:
+                summary["invalid"] += 1
+        return "".join(json.dumps(result) + "\n" for result in results)
+    
+    try:
+        chunk = []
+        next_index = 0
+        async for record in records:
+            chunk.append(record)
+            if len(chunk) == VERIFICATION_CHUNK_SIZE:
+                in_flight.append(loop.run_in_executor(executor, verify_chunk, config, next_index, chunk))
+                next_index += len(chunk)
+                chunk = []
+                # Bounded look-ahead keeps memory flat however large the upload is
+                while len(in_flight) > 2 * VERIFICATION_WORKERS:
+                    yield collect(await in_flight.popleft())
+        if chunk:
+            in_flight.append(loop.run_in_executor(executor, verify_chunk, config, next_index, chunk))
+        while in_flight:
+            yield collect(await in_flight.popleft())
+        
+        elapsed = time.monotonic() - started
+        summary["elapsed_seconds"] = elapsed
+        summary["verifications_per_minute"] = summary["total"] * 60 / elapsed if elapsed > 0 else 0.0
+        yield json.dumps({"summary": summary}) + "\n"
+    finally:
+        # A client that disconnects mid-stream should not leave queued chunks behind
+        for future in in_flight:
+            future.cancel()
+
+@api_router.post("/provably-fair/verify/bulk")
+async def verify_provably_fair_bulk(request: Request, profile: str = DEFAULT_GAME_CONFIG.name):
+    """Verify many games on a process pool, streaming per-item NDJSON results and a summary"""
+    config = get_engines(profile).provably_fair_system.config
+    if "ndjson" in request.headers.get("content-type", ""):
+        records = read_ndjson_lines(request)
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        verifications = body.get("verifications") if isinstance(body, dict) else body
+        if not isinstance(verifications, list):
+            raise HTTPException(status_code=400, detail="Expected a list of verifications")
+        records = iterate_records(verifications)
+    
+    return StreamingResponse(stream_bulk_verification(config, records), media_type="application/x-ndjson")
+
+@api_router.post("/provably-fair/layouts", response_model=LayoutBatchResult)
+async def generate_layouts(request: LayoutBatchRequest):
+    """Generate mine layouts for a whole nonce range, for creation bursts and audits"""
+    try:
+        fairness = get_engines(request.profile).provably_fair_system
+        if not fairness.validate_fairness_parameters(request.server_seed, request.client_seed, request.nonce_start):
+            raise HTTPException(status_code=400, detail="Invalid fairness parameters")
+        
+        layouts = await asyncio.get_event_loop().run_in_executor(
+            None,
+            fairness.generate_game_results,
+            request.server_seed,
+            request.client_seed,
+            request.nonce_start,
+            request.count,
+            request.mine_count
+        )
+        
+        return LayoutBatchResult(
+            profile=request.profile,
+            server_seed_hash=fairness.create_seed_hash(request.server_seed),
+            client_seed=request.client_seed,
+            mine_count=request.mine_count,
+            nonce_start=request.nonce_start,
+            layouts=layouts
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating layouts: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to generate layouts")
+
 @api_router.get("/provably-fair/generate-seeds")
 async def generate_seeds(client_seed: Optional[str] = None):
     """Generate new provably fair seeds"""
@@ -334,8 +846,218 @@ async def generate_seeds(client_seed: Optional[str] = None):
         logger.error(f"Error generating seeds: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to generate seeds")
 
+@api_router.get("/provably-fair/seeds/{user_id}", response_model=SeedPair)
+async def get_active_seed_pair(user_id: str):
+    """The user's committed server seed hash, client seed and next nonce"""
+    try:
+        pair = await seed_vault.get_active(user_id)
+        if pair is None:
+            raise HTTPException(status_code=404, detail="No active seed pair")
+        return pair
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting seed pair: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get seed pair")
+
+@api_router.post("/provably-fair/seeds/{user_id}/rotate", response_model=SeedRotation)
+async def rotate_seed_pair(user_id: str, client_seed: Optional[str] = None):
+    """Reveal the active server seed, which verifies every nonce played on it, and commit to a new one"""
+    try:
+        return await seed_vault.rotate(user_id, client_seed)
+        
+    except SeedPairInUse:
+        raise HTTPException(status_code=409, detail="Finish active games before rotating the seed pair")
+    except Exception as e:
+        logger.error(f"Error rotating seed pair: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to rotate seed pair")
+
+@api_router.get("/provably-fair/seed-pairs/{pair_id}", response_model=SeedPair)
+async def get_seed_pair(pair_id: str):
+    """A seed pair by id; the server seed is shown once it has been revealed"""
+    try:
+        pair = await seed_vault.get_pair(pair_id)
+        if pair is None:
+            raise HTTPException(status_code=404, detail="Seed pair not found")
+        return pair
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting seed pair: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get seed pair")
+
+@api_router.post("/provably-fair/chain", response_model=HashChainInfo)
+async def create_hash_chain(request: HashChainRequest):
+    """Generate a hash chain of future server seeds and serve new anonymous games from it"""
+    try:
+        HASH_CHAIN_DIR.mkdir(parents=True, exist_ok=True)
+        chain = await asyncio.get_event_loop().run_in_executor(
+            None,
+            provably_fair_system.generate_hash_chain,
+            str(HASH_CHAIN_DIR / f"{uuid.uuid4()}.chain"),
+            request.length,
+            request.checkpoint_interval
+        )
+        
+        info = HashChainInfo(**chain.describe())
+        await db.hash_chains.update_many({"active": True}, {"$set": {"active": False}})
+        await db.hash_chains.insert_one({**info.dict(), "path": chain.path, "active": True})
+        return info
+        
+    except Exception as e:
+        logger.error(f"Error creating hash chain: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to create hash chain")
+
+@api_router.get("/provably-fair/chain", response_model=HashChainInfo)
+async def get_hash_chain():
+    """Terminal hash of the active chain and how many of its seeds have been served"""
+    chain = provably_fair_system.hash_chain
+    if chain is None:
+        raise HTTPException(status_code=404, detail="No hash chain is active")
+    chain_doc = await db.hash_chains.find_one({"terminal_hash": chain.terminal_hash}, {"_id": 0, "path": 0, "active": 0})
+    if chain_doc is None:
+        raise HTTPException(status_code=404, detail="No hash chain is active")
+    return HashChainInfo(**chain_doc)
+
+@api_router.post("/provably-fair/chain/verify", response_model=HashChainVerification)
+async def verify_hash_chain(request: HashChainVerificationRequest):
+    """Check every link of the active chain, or a segment of it, in parallel linear passes"""
+    chain = provably_fair_system.hash_chain
+    if chain is None:
+        raise HTTPException(status_code=404, detail="No hash chain is active")
+    
+    try:
+        loop = asyncio.get_event_loop()
+        executor = get_verification_executor()
+        stop = chain.length if request.stop is None else min(request.stop, chain.length)
+        started = time.monotonic()
+        # Segments start from the stored digest before them, so each one is verified independently
+        results = await asyncio.gather(*[
+            loop.run_in_executor(executor, verify_chain_segment, chain.path, segment_start, segment_stop)
+            for segment_start, segment_stop in chain.segments(HASH_CHAIN_SEGMENT_SIZE, request.start, stop)
+        ])
+        failures = [index for index in results if index is not None]
+        
+        return HashChainVerification(
+            terminal_hash=chain.terminal_hash,
+            start=request.start,
+            stop=stop,
+            is_valid=not failures,
+            first_invalid_index=min(failures) if failures else None,
+            elapsed_seconds=time.monotonic() - started
+        )
+        
+    except Exception as e:
+        logger.error(f"Error verifying hash chain: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to verify hash chain")
+
+async def save_fairness_audit(result: FairnessAuditResult):
+    await db.fairness_audits.insert_one(result.dict())
+
+@api_router.post("/provably-fair/audit", response_model=SimulationJob, status_code=202)
+async def submit_fairness_audit(request: FairnessAuditRequest):
+    """Queue a statistical audit of mine placement over a generated nonce range"""
+    fairness = get_engines(request.profile).provably_fair_system
+    server_seed = request.server_seed or fairness.generate_server_seed()
+    if not fairness.validate_fairness_parameters(server_seed, request.client_seed, request.nonce_start):
+        raise HTTPException(status_code=400, detail="Invalid fairness parameters")
+    
+    def run(progress, cancel_event):
+        return audit_nonce_range(fairness.config, server_seed, request.client_seed, request.nonce_start,
+                                 request.games_per_mine_count, request.mine_counts, get_verification_executor(),
+                                 progress=progress, cancel_event=cancel_event).result()
+    
+    try:
+        params = request.dict(exclude={"server_seed"})
+        params["server_seed_hash"] = fairness.create_seed_hash(server_seed)
+        return await job_manager.submit("fairness_audit", params, run, lambda result: result.dict(),
+                                        on_result=save_fairness_audit)
+                                        
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+    except Exception as e:
+        logger.error(f"Error submitting fairness audit: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to submit fairness audit")
+
+def stored_mine_positions(game_doc: Dict[str, Any]) -> List[int]:
+    if "mine_mask" in game_doc:
+        return mask_positions(game_doc["mine_mask"])
+    # Not yet migrated from tile lists
+    return [tile["position"] for tile in game_doc.get("tiles", []) if tile["is_mine"]]
+
+@api_router.post("/provably-fair/audit/stored-games", response_model=SimulationJob, status_code=202)
+async def submit_stored_games_audit(request: StoredGamesAuditRequest):
+    """Queue a statistical audit of the mine layouts of stored games"""
+    config = get_engines(request.profile).provably_fair_system.config
+    # Games stored before profiles existed have no profile field and belong to the default one
+    profiles = [request.profile, None] if request.profile == DEFAULT_GAME_CONFIG.name else [request.profile]
+    query: Dict[str, Any] = {"profile": {"$in": profiles}}
+    if request.mine_counts:
+        query["mine_count"] = {"$in": request.mine_counts}
+    loop = asyncio.get_running_loop()
+    
+    def run(progress, cancel_event):
+        projection = {"_id": 0, "mine_count": 1, "mine_mask": 1, "tiles.position": 1, "tiles.is_mine": 1}
+        cursor = db.game_sessions.find(query, projection).sort("created_at", -1)
+        if request.limit:
+            cursor = cursor.limit(request.limit)
+        count_options = {"limit": request.limit} if request.limit else {}
+        total = asyncio.run_coroutine_threadsafe(db.game_sessions.count_documents(query, **count_options), loop).result()
+        audit = FairnessAudit(config, source="stored_games")
+        while True:
+            if cancel_event.is_set():
+                raise SimulationCancelled()
+            # Documents are read on the event loop one batch at a time, so memory stays flat
+            game_docs = asyncio.run_coroutine_threadsafe(cursor.to_list(length=STORED_AUDIT_BATCH_SIZE), loop).result()
+            if not game_docs:
+                break
+            layouts = ((game_doc["mine_count"], stored_mine_positions(game_doc)) for game_doc in game_docs)
+            audit.add_games(
+                (mine_count, positions) for mine_count, positions in layouts
+                if len(positions) == mine_count and positions[-1] < config.grid_size
+            )
+            progress(min(audit.games / total, 1.0) if total else 1.0, audit.result())
+        return audit.result()
+    
+    try:
+        return await job_manager.submit("fairness_audit", request.dict(), run, lambda result: result.dict(),
+                                        on_result=save_fairness_audit)
+                                        
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+    except Exception as e:
+        logger.error(f"Error submitting stored games audit: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to submit fairness audit")
+
+@api_router.get("/provably-fair/audit/{audit_id}", response_model=FairnessAuditResult)
+async def get_fairness_audit(audit_id: str):
+    """A completed fairness audit"""
+    try:
+        audit_doc = await db.fairness_audits.find_one({"id": audit_id}, {"_id": 0})
+        if not audit_doc:
+            raise HTTPException(status_code=404, detail="Fairness audit not found")
+        return FairnessAuditResult(**audit_doc)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting fairness audit: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get fairness audit")
+
+@api_router.get("/provably-fair/seed-pool/stats")
+async def get_seed_pool_stats():
+    """Fill level of the pre-generated server seed pool"""
+    return provably_fair_system.seed_pool_stats()
+
 # === STATISTICS ENDPOINTS ===
 
+@api_router.get("/stats/profiles")
+async def get_game_profiles():
+    """List the configured game profiles"""
+    return {"profiles": [config.describe() for config in GAME_PROFILES.values()]}
+
 @api_router.get("/stats/user/{user_id}", response_model=UserStatistics)
 async def get_user_statistics(user_id: str):
     """Get user statistics and performance metrics"""
@@ -356,16 +1078,24 @@ async def get_user_statistics(user_id: str):
         raise HTTPException(status_code=500, detail="Failed to get user statistics")
 
 @api_router.get("/stats/optimal-points")
-async def get_optimal_stopping_points():
+async def get_optimal_stopping_points(objective: str = "risk_neutral", risk_aversion: float = 0.0,
+                                      wealth: float = DEFAULT_WEALTH, profile: str = DEFAULT_GAME_CONFIG.name):
     """Get optimal stopping points for different mine counts"""
     try:
-        results = {}
-        for mine_count in range(1, 25):
-            optimal_point = prob_engine.calculate_optimal_stopping_point(mine_count)
-            results[mine_count] = optimal_point
+        # Solved once per objective and profile and served from memory afterwards
+        policy = get_optimal_policy(objective, risk_aversion, wealth, profile)
         
-        return {"optimal_stopping_points": results}
+        return {
+            "profile": profile,
+            "objective": policy.objective,
+            "risk_aversion": policy.risk_aversion,
+            "wealth": policy.wealth,
+            "optimal_stopping_points": policy.optimal_points,
+            "summary": policy.summary()
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error calculating optimal points: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to calculate optimal points")
@@ -407,7 +1137,9 @@ async def get_ensemble_prediction(game_id: str, user_id: Optional[str] = None):
             user_history = [GameSession(**game) for game in user_games]
         
         # Get ensemble prediction
-        ensemble_result = ensemble_system.get_ensemble_prediction(game_session, user_history)
+        ensemble_result = get_engines(game_session.profile).ensemble_system.get_ensemble_prediction(
+            game_session, user_history
+        )
         
         return ensemble_result
         
@@ -520,10 +1252,49 @@ async def health_check():
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.on_event("startup")
+async def create_simulation_cache_indexes():
+    try:
+        await simulation_cache.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not create simulation cache indexes: {str(e)}")
+
+@app.on_event("startup")
+async def start_seed_vault():
+    try:
+        await seed_vault.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not create seed pair indexes: {str(e)}")
+    seed_vault.start()
+
+@app.on_event("startup")
+async def load_active_hash_chain():
+    try:
+        chain_doc = await db.hash_chains.find_one({"active": True})
+        if chain_doc is not None:
+            provably_fair_system.load_hash_chain(chain_doc["path"])
+    except Exception as e:
+        logger.warning(f"Could not load the active hash chain: {str(e)}")
+
+@app.on_event("shutdown")
+async def stop_seed_vault():
+    await seed_vault.stop()
+
+@app.on_event("shutdown")
+async def drain_simulation_jobs():
+    # Runs before the database client closes so final job states are persisted
+    await job_manager.shutdown(timeout=float(os.environ.get('JOB_DRAIN_SECONDS', 30)))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
 
+@app.on_event("shutdown")
+async def shutdown_simulation_workers():
+    monte_carlo_engine.shutdown()
+    if verification_executor is not None:
+        verification_executor.shutdown(wait=True, cancel_futures=True)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
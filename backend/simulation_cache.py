@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from probability_engine import MinesProbabilityEngine
+
+logger = logging.getLogger(__name__)
+
+class SimulationCache:
+    """Two-tier result cache: an in-process LRU in front of a Mongo collection with a TTL index"""
+    
+    def __init__(self, collection=None, max_entries: int = 256, ttl_seconds: float = 3600.0,
+                 version: str = MinesProbabilityEngine.MULTIPLIER_VERSION,
+                 clock: Callable[[], float] = time.monotonic):
+        self.collection = collection  # None keeps the cache in memory only
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[str, float, Dict[str, Any]]]" = OrderedDict()
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def make_key(self, namespace: str, params: Dict[str, Any]) -> str:
+        """Stable hash of the normalized request and the multiplier formula version"""
+        payload = json.dumps({"namespace": namespace, "version": self.version, "params": params},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    async def ensure_indexes(self):
+        """Create the unique key index and let Mongo expire documents at `expires_at`"""
+        if self.collection is None:
+            return
+        await self.collection.create_index("key", unique=True)
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+    
+    async def get(self, namespace: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached value for the request, or None on a miss"""
+        key = self.make_key(namespace, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            _, expires_at, value = entry
+            if expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._entries[key]
+        
+        if self.collection is not None:
+            try:
+                doc = await self.collection.find_one({"key": key, "expires_at": {"$gt": datetime.utcnow()}})
+            except Exception as e:
+                logger.warning(f"Simulation cache lookup failed: {str(e)}")
+                doc = None
+            if doc is not None:
+                remaining = (doc["expires_at"] - datetime.utcnow()).total_seconds()
+                self._remember(key, namespace, doc["value"], remaining)
+                self.mongo_hits += 1
+                return doc["value"]
+        
+        self.misses += 1
+        return None
+    
+    async def set(self, namespace: str, params: Dict[str, Any], value: Dict[str, Any]):
+        """Store a JSON-ready result (string keys only) in both tiers"""
+        key = self.make_key(namespace, params)
+        self._remember(key, namespace, value, self.ttl_seconds)
+        
+        if self.collection is not None:
+            doc = {
+                "key": key,
+                "namespace": namespace,
+                "version": self.version,
+                "value": value,
+                "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+            }
+            try:
+                await self.collection.replace_one({"key": key}, doc, upsert=True)
+            except Exception as e:
+                logger.warning(f"Simulation cache write failed: {str(e)}")
+    
+    async def invalidate(self, namespace: Optional[str] = None) -> int:
+        """Drop cached results, e.g. after the multiplier formula changes; returns entries removed"""
+        if namespace is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            keys = [key for key, entry in self._entries.items() if entry[0] == namespace]
+            for key in keys:
+                del self._entries[key]
+            removed = len(keys)
+        
+        if self.collection is not None:
+            query = {} if namespace is None else {"namespace": namespace}
+            result = await self.collection.delete_many(query)
+            removed = max(removed, result.deleted_count)
+        return removed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current memory usage"""
+        lookups = self.memory_hits + self.mongo_hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "memory_hits": self.memory_hits,
+            "mongo_hits": self.mongo_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.memory_hits + self.mongo_hits) / lookups if lookups else 0.0
+        }
+    
+    def _remember(self, key: str, namespace: str, value: Dict[str, Any], ttl_seconds: float):
+        self._entries[key] = (namespace, self.clock() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from models import JobStatus, SimulationJob
+from monte_carlo_engine import ProgressCallback, SimulationCancelled
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+class SimulationJobManager:
+    """Background simulation jobs with Mongo persistence, cancellation and progress streaming"""
+    
+    def __init__(self, db, max_concurrent_jobs: int = 2, persist_interval: float = 1.0,
+                 heartbeat_interval: float = 15.0):
+        self.collection = db.simulation_jobs
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.persist_interval = persist_interval  # Seconds between progress writes to Mongo
+        self.heartbeat_interval = heartbeat_interval
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, SimulationJob] = {}  # In-flight jobs only
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._last_persisted: Dict[str, float] = {}
+        self._accepting = True
+    
+    async def submit(self, kind: str, params: Dict[str, Any],
+                     run: Callable[[ProgressCallback, threading.Event], Any],
+                     serialize: Callable[[Any], Dict[str, Any]],
+                     on_result: Optional[Callable[[Any], Awaitable[None]]] = None) -> SimulationJob:
+        """Queue a blocking simulation; `run` receives a progress callback and a cancel event"""
+        if not self._accepting:
+            raise RuntimeError("Simulation job manager is shutting down")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_jobs)
+        
+        job = SimulationJob(kind=kind, params=params)
+        await self.collection.insert_one(job.dict())
+        
+        self._jobs[job.id] = job
+        self._cancel_events[job.id] = threading.Event()
+        self._tasks[job.id] = asyncio.create_task(self._run(job, run, serialize, on_result))
+        return job
+    
+    async def get(self, job_id: str) -> Optional[SimulationJob]:
+        """Current state of a job, from memory while in flight and from Mongo afterwards"""
+        if job_id in self._jobs:
+            return self._jobs[job_id]
+        job_doc = await self.collection.find_one({"id": job_id})
+        return SimulationJob(**job_doc) if job_doc else None
+    
+    async def cancel(self, job_id: str) -> Optional[SimulationJob]:
+        """Request cancellation; finished jobs are returned unchanged"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return await self.get(job_id)
+        
+        self._cancel_events[job_id].set()
+        if job.status == JobStatus.QUEUED:
+            # Never started, so nothing needs to drain
+            self._tasks[job_id].cancel()
+            await self._finish(job, JobStatus.CANCELLED)
+        return job
+    
+    async def stream(self, job_id: str) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield job snapshots until the job ends; None marks an idle heartbeat"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = await self.get(job_id)
+            if job is not None:
+                yield job.dict()
+            return
+        
+        # Subscribe before the first snapshot so no update is missed
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        try:
+            snapshot = job.dict()
+            yield snapshot
+            if snapshot['status'] in TERMINAL_STATUSES:
+                return
+            # The live status turns terminal before its event is dequeued, so only the queue ends the stream
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event['status'] in TERMINAL_STATUSES:
+                    break
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if queue in subscribers:
+                subscribers.remove(queue)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+    
+    async def shutdown(self, timeout: float = 30.0):
+        """Stop accepting jobs, drop queued ones and let running jobs finish within the timeout"""
+        self._accepting = False
+        for job_id, job in list(self._jobs.items()):
+            if job.status == JobStatus.QUEUED:
+                await self.cancel(job_id)
+        
+        running = list(self._tasks.values())
+        if not running:
+            return
+        _, pending = await asyncio.wait(running, timeout=timeout)
+        if pending:
+            logger.warning(f"Cancelling {len(pending)} simulation jobs still running at shutdown")
+            for event in self._cancel_events.values():
+                event.set()
+            # Simulations check their cancel event between shards
+            await asyncio.wait(pending, timeout=timeout)
+    
+    async def _run(self, job: SimulationJob, run: Callable[[ProgressCallback, threading.Event], Any],
+                   serialize: Callable[[Any], Dict[str, Any]],
+                   on_result: Optional[Callable[[Any], Awaitable[None]]]):
+        async with self._semaphore:
+            cancel_event = self._cancel_events[job.id]
+            if cancel_event.is_set():
+                await self._finish(job, JobStatus.CANCELLED)
+                return
+            
+            job.status = JobStatus.RUNNING
+            job.updated_at = datetime.utcnow()
+            await self.collection.update_one({"id": job.id}, {"$set": {"status": job.status, "updated_at": job.updated_at}})
+            self._publish(job)
+            
+            loop = asyncio.get_running_loop()
+            
+            def progress(fraction: float, partial: Any):
+                # Called from the worker thread: serialize there, update state on the loop
+                payload = serialize(partial) if partial is not None else None
+                loop.call_soon_threadsafe(self._on_progress, job, fraction, payload)
+            
+            try:
+                result = await loop.run_in_executor(None, run, progress, cancel_event)
+            except SimulationCancelled:
+                await self._finish(job, JobStatus.CANCELLED)
+            except Exception as e:
+                logger.error(f"Simulation job {job.id} failed: {str(e)}")
+                await self._finish(job, JobStatus.FAILED, error=str(e))
+            else:
+                # Storing the result can fail too; the job must still reach a terminal state
+                try:
+                    if on_result is not None:
+                        await on_result(result)
+                    payload = serialize(result)
+                except Exception as e:
+                    logger.error(f"Simulation job {job.id} failed to store its result: {str(e)}")
+                    await self._finish(job, JobStatus.FAILED, error=str(e))
+                else:
+                    await self._finish(job, JobStatus.COMPLETED, result=payload)
+    
+    def _on_progress(self, job: SimulationJob, fraction: float, partial: Optional[Dict[str, Any]]):
+        if job.status != JobStatus.RUNNING:
+            return
+        job.progress = min(max(fraction, 0.0), 1.0)
+        if partial is not None:
+            job.partial_result = partial
+        job.updated_at = datetime.utcnow()
+        self._publish(job)
+        
+        now = time.monotonic()
+        if now - self._last_persisted.get(job.id, 0.0) >= self.persist_interval:
+            self._last_persisted[job.id] = now
+            # Only running jobs take progress writes, so a late write cannot undo the final state
+            asyncio.ensure_future(self.collection.update_one(
+                {"id": job.id, "status": JobStatus.RUNNING},
+                {"$set": {"progress": job.progress, "partial_result": job.partial_result,
+                          "updated_at": job.updated_at}}
+            ))
+    
+    async def _finish(self, job: SimulationJob, status: JobStatus, result: Optional[Dict[str, Any]] = None,
+                      error: Optional[str] = None):
+        job.status = status
+        job.result = result
+        job.error = error
+        if status == JobStatus.COMPLETED:
+            job.progress = 1.0
+        job.updated_at = datetime.utcnow()
+        await self.collection.replace_one({"id": job.id}, job.dict())
+        self._publish(job)
+        
+        self._jobs.pop(job.id, None)
+        self._tasks.pop(job.id, None)
+        self._cancel_events.pop(job.id, None)
+        self._last_persisted.pop(job.id, None)
+    
+    def _publish(self, job: SimulationJob):
+        event = job.dict()
+        for queue in self._subscribers.get(job.id, []):
+            queue.put_nowait(event)
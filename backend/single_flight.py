@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """Coalesce concurrent identical requests onto one in-flight computation"""
+    
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+    
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the running computation for `key`, starting it if none is in flight"""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        
+        # Shielded so one caller disconnecting does not cancel the work for the others
+        return await asyncio.shield(task)
+    
+    def stats(self) -> Dict[str, int]:
+        """Computation and coalescing counters"""
+        return {
+            "in_flight": len(self._in_flight),
+            "executions": self.executions,
+            "coalesced_requests": self.coalesced
+        }
+    
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even if every caller went away
@@ -0,0 +1,82 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Optional
+from models import GameSession, StrategyPolicySpec
+from probability_engine import MinesProbabilityEngine
+
+class StrategyPolicy(ABC):
+    """A per-game stopping rule, compiled to a lookup table, plus optional session limits"""
+    
+    def __init__(self, name: str, stop_loss: Optional[float] = None, take_profit: Optional[float] = None):
+        self.name = name
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+    
+    @abstractmethod
+    def should_continue(self, prob_engine: MinesProbabilityEngine, mine_count: int, tiles_revealed: int,
+                        multiplier: float) -> bool:
+        """Whether to reveal another tile from this state"""
+    
+    def compile(self, prob_engine: MinesProbabilityEngine) -> np.ndarray:
+        """Continue/stop decisions for every (mine_count, tiles_revealed) state"""
+        grid_size = prob_engine.grid_size
+        table = np.zeros((grid_size, grid_size + 1), dtype=bool)
+        for mine_count in range(1, grid_size):
+            table[mine_count] = self.compile_row(prob_engine, mine_count)
+        return table
+    
+    def compile_row(self, prob_engine: MinesProbabilityEngine, mine_count: int) -> np.ndarray:
+        """Continue/stop decisions for every tiles_revealed state at one mine count"""
+        row = np.zeros(prob_engine.grid_size + 1, dtype=bool)
+        # Once every safe tile is revealed the game has to stop
+        for tiles_revealed in range(prob_engine.grid_size - mine_count):
+            multiplier = prob_engine.calculate_multiplier(mine_count, tiles_revealed)
+            row[tiles_revealed] = self.should_continue(prob_engine, mine_count, tiles_revealed, multiplier)
+        return row
+    
+    @staticmethod
+    def cash_out_point(table: np.ndarray, mine_count: int) -> int:
+        """Tiles a surviving game reveals before the compiled policy stops"""
+        # Every surviving game passes through the same states, so the first stop decides it
+        return int(np.flatnonzero(~table[mine_count])[0])
+
+class FixedCashOutPolicy(StrategyPolicy):
+    """Reveal a fixed number of tiles, then cash out"""
+    
+    def __init__(self, cash_out_point: int, name: Optional[str] = None, **limits):
+        super().__init__(name or f"fixed_{cash_out_point}", **limits)
+        self.target_point = cash_out_point
+    
+    def should_continue(self, prob_engine, mine_count, tiles_revealed, multiplier):
+        return tiles_revealed < self.target_point
+
+class TargetMultiplierPolicy(StrategyPolicy):
+    """Keep revealing until the multiplier reaches a target"""
+    
+    def __init__(self, target_multiplier: float, name: Optional[str] = None, **limits):
+        super().__init__(name or f"target_{target_multiplier:g}x", **limits)
+        self.target_multiplier = target_multiplier
+    
+    def should_continue(self, prob_engine, mine_count, tiles_revealed, multiplier):
+        return multiplier < self.target_multiplier
+
+class RecommendationPolicy(StrategyPolicy):
+    """Follow generate_strategy_recommendation at every step"""
+    
+    def __init__(self, name: Optional[str] = None, **limits):
+        super().__init__(name or "recommendation", **limits)
+    
+    def should_continue(self, prob_engine, mine_count, tiles_revealed, multiplier):
+        # Recommendations scale with the bet, so a unit bet stands for every stake
+        game_session = GameSession(mine_count=mine_count, bet_amount=1.0, current_multiplier=multiplier,
+                                   tiles_revealed=tiles_revealed)
+        return prob_engine.generate_strategy_recommendation(game_session).action == "continue"
+
+def build_policy(spec: StrategyPolicySpec) -> StrategyPolicy:
+    """Instantiate the policy described by an API spec"""
+    limits = {"stop_loss": spec.stop_loss, "take_profit": spec.take_profit}
+    if spec.type == "fixed":
+        return FixedCashOutPolicy(spec.cash_out_point, name=spec.name, **limits)
+    if spec.type == "target_multiplier":
+        return TargetMultiplierPolicy(spec.target_multiplier, name=spec.name, **limits)
+    return RecommendationPolicy(name=spec.name, **limits)
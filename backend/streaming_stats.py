@@ -0,0 +1,66 @@
+import math
+import numpy as np
+from typing import Optional
+
+class RunningStats:
+    """Constant-memory running statistics using Welford's online algorithm"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+    
+    def update(self, value: float):
+        """Add a single observation"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self._update_extremes(value, value)
+    
+    def update_constant(self, value: float, count: int):
+        """Add `count` identical observations in O(1)"""
+        if count <= 0:
+            return
+        self._merge_moments(count, float(value), 0.0)
+        self._update_extremes(value, value)
+    
+    def update_batch(self, values: np.ndarray):
+        """Add a block of observations"""
+        if len(values) == 0:
+            return
+        block_mean = float(np.mean(values))
+        block_m2 = float(np.sum((values - block_mean) ** 2))
+        self._merge_moments(len(values), block_mean, block_m2)
+        self._update_extremes(float(np.min(values)), float(np.max(values)))
+    
+    def merge(self, other: "RunningStats"):
+        """Combine with statistics accumulated elsewhere, e.g. another shard"""
+        if other.count == 0:
+            return
+        self._merge_moments(other.count, other.mean, other.m2)
+        self._update_extremes(other.minimum, other.maximum)
+    
+    def _merge_moments(self, count: int, mean: float, m2: float):
+        # Chan et al. pairwise update of count, mean and M2
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+    
+    def _update_extremes(self, low: float, high: float):
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+    
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 with fewer than two observations)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation"""
+        return math.sqrt(max(self.variance, 0.0))
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -15,15 +15,49 @@ const MonteCarloSimulator = () => {
   const [loading, setLoading] = useState(false);
   const [simulationHistory, setSimulationHistory] = useState([]);
 
+  const [progress, setProgress] = useState(null);
+  const eventSourceRef = useRef(null);
+
+  useEffect(() => {
+    // Stop listening for job events when the simulator unmounts
+    return () => eventSourceRef.current && eventSourceRef.current.close();
+  }, []);
+
   const runSimulation = async () => {
     setLoading(true);
+    setProgress(0);
     try {
-      const response = await axios.post(`${API}/simulation/monte-carlo`, simulation);
-      setResults(response.data);
-      setSimulationHistory(prev => [response.data, ...prev.slice(0, 4)]); // Keep last 5 results
+      const { data: job } = await axios.post(`${API}/simulation/jobs/monte-carlo`, simulation);
+      const source = new EventSource(`${API}/simulation/jobs/${job.id}/events`);
+      eventSourceRef.current = source;
+
+      source.onmessage = (event) => {
+        const update = JSON.parse(event.data);
+        setProgress(update.progress);
+        if (update.partial_result && update.status === 'running') {
+          setResults(update.partial_result); // Live convergence while the job runs
+        }
+        if (['completed', 'failed', 'cancelled'].includes(update.status)) {
+          source.close();
+          if (update.status === 'completed') {
+            setResults(update.result);
+            setSimulationHistory(prev => [update.result, ...prev.slice(0, 4)]); // Keep last 5 results
+          } else if (update.error) {
+            console.error('Simulation job failed:', update.error);
+          }
+          setProgress(null);
+          setLoading(false);
+        }
+      };
+      source.onerror = () => {
+        console.error('Lost connection to simulation job', job.id);
+        source.close();
+        setProgress(null);
+        setLoading(false);
+      };
     } catch (error) {
       console.error('Error running simulation:', error);
-    } finally {
+      setProgress(null);
       setLoading(false);
     }
   };
@@ -106,6 +140,7 @@ const MonteCarloSimulator = () => {
               <option value={10000}>10,000</option>
               <option value={25000}>25,000</option>
               <option value={50000}>50,000</option>
+              <option value={1000000}>1,000,000</option>
             </select>
           </div>
 
@@ -140,6 +175,20 @@ const MonteCarloSimulator = () => {
             </button>
           </div>
         </div>
+        {progress !== null && (
+          <div className="mt-6">
+            <div className="flex justify-between text-sm text-gray-400 mb-1">
+              <span>Simulating...</span>
+              <span>{formatPercent(progress)}</span>
+            </div>
+            <div className="w-full bg-gray-700 rounded-full h-2">
+              <div
+                className="bg-yellow-500 h-2 rounded-full transition-all"
+                style={{ width: `${(progress * 100).toFixed(1)}%` }}
+              />
+            </div>
+          </div>
+        )}
       </div>
 
       {/* Results Display */}
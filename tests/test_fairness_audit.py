@@ -0,0 +1,64 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import numpy as np
+
+from fairness_audit import FairnessAudit, audit_nonce_range, chi_square_sf, kolmogorov_sf, modulo_bias
+from game_config import DEFAULT_GAME_CONFIG
+
+
+class FairnessAuditTest(unittest.TestCase):
+    """Unit tests for the streaming mine placement audit"""
+
+    def test_tail_probabilities_match_reference_values(self):
+        """Chi-square and Kolmogorov tails agree with tabulated values"""
+        self.assertAlmostEqual(chi_square_sf(3.841459, 1), 0.05, places=6)
+        self.assertAlmostEqual(chi_square_sf(10.0, 5), 0.0752352461465, places=10)
+        self.assertAlmostEqual(chi_square_sf(0.5, 2), math.exp(-0.25), places=12)
+        self.assertEqual(chi_square_sf(0.0, 3), 1.0)
+        self.assertAlmostEqual(kolmogorov_sf(1.358 / math.sqrt(10000), 10000), 0.05, delta=0.002)
+        self.assertEqual(kolmogorov_sf(0.0, 100), 1.0)
+
+    def test_modulo_bias_is_exact(self):
+        """Only draws over tile counts that do not divide 2**32 are biased"""
+        bias = modulo_bias(25, 1)
+        self.assertEqual(2 ** 32 % 25, 21)
+        self.assertEqual(bias.max_relative_bias, 4 / 2 ** 32)
+        self.assertAlmostEqual(bias.total_variation_bound, 21 * 4 / (25 * 2 ** 32))
+        self.assertIsNone(modulo_bias(16, 1).games_to_detect)
+
+    def test_generated_layouts_pass_and_skewed_layouts_fail(self):
+        """HMAC layouts look uniform while a tile that is always mined is flagged"""
+        audit = audit_nonce_range(DEFAULT_GAME_CONFIG, "ab" * 32, "audit", 0, 20000, [1, 3], chunk_size=6000)
+        result = audit.result()
+        self.assertEqual(result.games, 40000)
+        self.assertEqual(sorted(result.mine_counts), ["1", "3"])
+        self.assertIsNone(result.mine_counts["1"].pair_chi_square)
+        three = result.mine_counts["3"]
+        self.assertEqual(three.position_chi_square.degrees_of_freedom, 24)
+        self.assertEqual(three.pair_chi_square.degrees_of_freedom, 275)
+        for test in (three.position_chi_square, three.pair_chi_square, three.min_position_ks):
+            self.assertGreater(test.p_value, 1e-4)
+
+        rng = np.random.default_rng(7)
+        skewed = FairnessAudit(DEFAULT_GAME_CONFIG)
+        layouts = [[0, *sorted(rng.choice(np.arange(1, 25), 2, replace=False))] for _ in range(5000)]
+        skewed.add_games((3, layout) for layout in layouts)
+        report = skewed.result().mine_counts["3"]
+        self.assertLess(report.position_chi_square.p_value, 1e-12)
+        self.assertLess(report.min_position_ks.p_value, 1e-12)
+
+    def test_merged_audits_match_a_single_pass(self):
+        """Counters from separate chunks add up to the same report"""
+        whole = audit_nonce_range(DEFAULT_GAME_CONFIG, "cd" * 32, "audit", 100, 3000, [5])
+        parts = audit_nonce_range(DEFAULT_GAME_CONFIG, "cd" * 32, "audit", 100, 3000, [5], chunk_size=700)
+        self.assertEqual(whole.result().dict(exclude={"id", "created_at"}),
+                         parts.result().dict(exclude={"id", "created_at"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
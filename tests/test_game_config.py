@@ -0,0 +1,64 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from game_config import DEFAULT_GAME_CONFIG, GameConfig, get_game_config, register_game_config
+from models import MonteCarloRequest
+from monte_carlo_engine import MonteCarloSimulationEngine
+from probability_engine import MinesProbabilityEngine
+from provably_fair import ProvablyFairSystem
+
+
+class GameConfigTest(unittest.TestCase):
+    """Unit tests for game profiles and per-profile tables"""
+
+    def setUp(self):
+        self.large = register_game_config(GameConfig(name="test_6x6", rows=6, columns=6, house_edge_factor=0.99))
+
+    def test_engines_follow_the_profile(self):
+        """Board size and house edge come from the profile"""
+        engine = MinesProbabilityEngine(self.large)
+        self.assertEqual(engine.grid_size, 36)
+        self.assertEqual(engine.calculate_multiplier(1, 1), round(36 / 35 * 0.99, 4))
+        self.assertEqual(engine.calculate_multiplier(35, 1), round(36 * 0.99, 4))
+        self.assertAlmostEqual(engine.calculate_survival_probability(4, 2), 32 / 36 * 31 / 35)
+        self.assertEqual(len(ProvablyFairSystem(self.large).generate_game_result("a" * 64, "seed", 0, 30)), 30)
+
+        default = MinesProbabilityEngine()
+        self.assertEqual(default.calculate_multiplier(1, 1), round(25 / 24 * 0.95, 4))
+
+    def test_tables_are_shared_per_profile(self):
+        """Engines for the same profile reuse one set of tables"""
+        first, second = MinesProbabilityEngine(self.large), MinesProbabilityEngine(get_game_config("test_6x6"))
+        self.assertIs(first.multiplier_table, second.multiplier_table)
+        self.assertIsNot(first.multiplier_table, MinesProbabilityEngine().multiplier_table)
+
+    def test_requests_are_validated_against_the_profile(self):
+        """Mine counts are bounded by the selected board"""
+        MonteCarloRequest(profile="test_6x6", mine_count=30)
+        with self.assertRaises(ValueError):
+            MonteCarloRequest(mine_count=30)
+        with self.assertRaises(ValueError):
+            MonteCarloRequest(profile="unknown", mine_count=3)
+        with self.assertRaises(ValueError):
+            register_game_config(GameConfig(name=DEFAULT_GAME_CONFIG.name, house_edge_factor=0.97))
+        with self.assertRaises(ValueError):
+            GameConfig(name="too_large", rows=8, columns=8)
+
+    def test_simulation_engines_are_reused_per_profile(self):
+        """Variant engines are built once and simulate their own board"""
+        engine = MonteCarloSimulationEngine(batch_size=4096)
+        variant = engine.with_config(self.large)
+        self.assertIs(engine.with_config(self.large), variant)
+        self.assertIs(engine.with_config(DEFAULT_GAME_CONFIG), engine)
+
+        request = MonteCarloRequest(profile="test_6x6", mine_count=30, iterations=20000, cash_out_points=[2], seed=4)
+        result = variant.run_monte_carlo_simulation(request)
+        self.assertEqual(result.profile, "test_6x6")
+        self.assertAlmostEqual(result.success_rate, 6 / 36 * 5 / 35, delta=0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
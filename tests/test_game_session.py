@@ -0,0 +1,48 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from models import GameSession, GameStatus, TileStatus, mask_positions, positions_mask
+
+
+class GameSessionTest(unittest.TestCase):
+    """Unit tests for the bitmask game state"""
+
+    def test_masks_round_trip_positions(self):
+        """Masks and ascending position lists convert both ways"""
+        self.assertEqual(positions_mask([0, 3, 24]), (1 << 0) | (1 << 3) | (1 << 24))
+        self.assertEqual(mask_positions(positions_mask([24, 3, 0])), [0, 3, 24])
+        self.assertEqual(mask_positions(0), [])
+
+    def test_legacy_tile_lists_are_converted(self):
+        """Documents stored with tile lists load as masks and lose the list"""
+        tiles = [{"position": position, "status": "hidden", "is_mine": position in (2, 7)} for position in range(25)]
+        tiles[4]["status"] = "revealed_safe"
+        tiles[7]["status"] = "revealed_mine"
+        session = GameSession(mine_count=2, bet_amount=1.0, tiles=tiles, status="lost")
+        self.assertEqual(session.mine_mask, positions_mask([2, 7]))
+        self.assertEqual(session.revealed_mask, positions_mask([4, 7]))
+        self.assertNotIn("tiles", session.dict())
+
+    def test_view_hides_mines_until_the_game_ends(self):
+        """The derived tile list only shows unrevealed mines once the game is over"""
+        session = GameSession(mine_count=3, bet_amount=1.0, mine_mask=positions_mask([1, 5, 9]),
+                              revealed_mask=positions_mask([0, 2]), tiles_revealed=2)
+        view = session.to_view()
+        self.assertEqual(len(view.tiles), 25)
+        self.assertFalse(any(tile.is_mine for tile in view.tiles))
+        self.assertEqual(view.tiles[0].status, TileStatus.REVEALED_SAFE)
+        self.assertEqual(view.tiles[1].status, TileStatus.HIDDEN)
+        self.assertFalse(hasattr(view, "mine_mask"))
+
+        session.revealed_mask |= 1 << 5
+        session.status = GameStatus.LOST
+        view = session.to_view()
+        self.assertEqual(view.tiles[5].status, TileStatus.REVEALED_MINE)
+        self.assertEqual([tile.position for tile in view.tiles if tile.is_mine], [1, 5, 9])
+
+
+if __name__ == "__main__":
+    unittest.main()
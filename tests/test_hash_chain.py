@@ -0,0 +1,59 @@
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from hash_chain import DIGEST_BYTES, HashChain, verify_chain_segment
+
+
+class HashChainTest(unittest.TestCase):
+    """Unit tests for the memory-mapped server seed hash chain"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "seeds.chain")
+        self.chain = HashChain.generate(self.path, 1000, checkpoint_interval=64, root_seed=b"\x01" * DIGEST_BYTES)
+
+    def tearDown(self):
+        self.chain.close()
+        self.directory.cleanup()
+
+    def test_seeds_commit_to_the_previous_seed(self):
+        """Each seed's SHA-256 hex digest is the seed served before it, back to the terminal hash"""
+        self.assertEqual(os.path.getsize(self.path), 1000 * DIGEST_BYTES)
+        self.assertEqual(self.chain.seed_at(999), "01" * DIGEST_BYTES)
+        for index in (0, 1, 500, 999):
+            seed = self.chain.seed_at(index)
+            self.assertEqual(hashlib.sha256(seed.encode()).hexdigest(), self.chain.commitment_at(index))
+        with self.assertRaises(IndexError):
+            self.chain.seed_at(1000)
+
+    def test_whole_chain_and_segments_verify(self):
+        """Segments anchor on the digest before them and together cover the chain"""
+        self.assertIsNone(self.chain.verify_segment())
+        segments = list(self.chain.segments(300))
+        self.assertEqual(segments, [(0, 300), (300, 600), (600, 900), (900, 1000)])
+        for start, stop in segments:
+            self.assertIsNone(verify_chain_segment(self.path, start, stop))
+        self.assertTrue(self.chain.verify_seed(700, self.chain.seed_at(700)))
+        self.assertFalse(self.chain.verify_seed(700, self.chain.seed_at(701)))
+
+    def test_tampering_is_located(self):
+        """A corrupted digest is reported at its own index"""
+        with open(self.path, "r+b") as chain_file:
+            chain_file.seek(437 * DIGEST_BYTES)
+            chain_file.write(b"\x00" * DIGEST_BYTES)
+        reopened = HashChain.open(self.path)
+        try:
+            self.assertEqual(reopened.verify_segment(), 437)
+            self.assertEqual(reopened.verify_segment(400, 500), 437)
+            self.assertIsNone(reopened.verify_segment(500, 1000))
+        finally:
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from migrations import migrate_tile_lists
+
+
+def legacy_game(game_id: int, mines, revealed):
+    """A game session document in the tile list layout"""
+    tiles = [{"position": position, "status": "revealed_safe" if position in revealed else "hidden",
+              "is_mine": position in mines} for position in range(25)]
+    return {"_id": game_id, "mine_count": len(mines), "tiles": tiles}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    """In-memory game_sessions collection that applies UpdateOne bulk writes"""
+
+    def __init__(self, docs):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.batch_sizes = []
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(doc) for doc in self.docs.values() if "tiles" in doc])
+
+    async def bulk_write(self, operations, ordered=True):
+        self.batch_sizes.append(len(operations))
+        for operation in operations:
+            doc = self.docs[operation._filter["_id"]]
+            doc.update(operation._doc["$set"])
+            for field in operation._doc["$unset"]:
+                doc.pop(field, None)
+
+
+class MigrateTileListsTest(unittest.TestCase):
+    """Unit tests for the tile list to bitmask migration"""
+
+    def setUp(self):
+        migrated_doc = {"_id": 99, "mine_count": 1, "mine_mask": 1 << 24, "revealed_mask": 1}
+        self.collection = FakeCollection([legacy_game(game_id, {game_id, 24}, {game_id + 1})
+                                          for game_id in range(5)] + [migrated_doc])
+
+    def test_tile_lists_become_masks(self):
+        """Every legacy game gets masks in full batches plus a final partial one"""
+        migrated = asyncio.run(migrate_tile_lists(self.collection, batch_size=2))
+        self.assertEqual(migrated, 5)
+        self.assertEqual(self.collection.batch_sizes, [2, 2, 1])
+
+        doc = self.collection.docs[3]
+        self.assertNotIn("tiles", doc)
+        self.assertEqual(doc["mine_mask"], (1 << 3) | (1 << 24))
+        self.assertEqual(doc["revealed_mask"], 1 << 4)
+        self.assertEqual(self.collection.docs[99], {"_id": 99, "mine_count": 1, "mine_mask": 1 << 24,
+                                                    "revealed_mask": 1})
+
+    def test_rerun_leaves_migrated_games_alone(self):
+        """A second run finds nothing left to convert"""
+        asyncio.run(migrate_tile_lists(self.collection, batch_size=2))
+        migrated_docs = {game_id: dict(doc) for game_id, doc in self.collection.docs.items()}
+
+        self.assertEqual(asyncio.run(migrate_tile_lists(self.collection, batch_size=2)), 0)
+        self.assertEqual(self.collection.batch_sizes, [2, 2, 1])
+        self.assertEqual(self.collection.docs, migrated_docs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import numpy as np
+
+from models import MonteCarloRequest, BankrollSimulationRequest, PayoutDistributionRequest, StrategyPolicySpec
+from monte_carlo_engine import MonteCarloSimulationEngine
+
+
+def survival_probability(mine_count: int, tiles: int) -> float:
+    """Exact probability that the first `tiles` reveals are all safe"""
+    probability = 1.0
+    for i in range(tiles):
+        probability *= (25 - mine_count - i) / (25 - i)
+    return probability
+
+
+class MonteCarloEngineTest(unittest.TestCase):
+    """Unit tests for the Monte Carlo simulation engine"""
+
+    def setUp(self):
+        self.engine = MonteCarloSimulationEngine(batch_size=4096)
+
+    def test_safe_runs_match_survival_probabilities(self):
+        """Simulated safe runs follow the exact hypergeometric survival curve"""
+        rng = np.random.default_rng(1234)
+        safe_runs = self.engine.simulate_safe_runs(5, 200000, rng)
+        self.assertLessEqual(int(safe_runs.max()), 20)
+        for tiles in (1, 3, 6):
+            expected = survival_probability(5, tiles)
+            observed = np.mean(safe_runs >= tiles)
+            self.assertAlmostEqual(observed, expected, delta=0.005)
+
+    def test_vectorized_and_legacy_engines_agree(self):
+        """Both engines estimate the same success rates for fixed cash-out points"""
+        for engine in ("vectorized", "legacy"):
+            request = MonteCarloRequest(mine_count=3, iterations=20000, cash_out_points=[2], engine=engine)
+            result = self.engine.run_monte_carlo_simulation(request)
+            self.assertEqual(result.optimal_cash_out_point, 2)
+            self.assertAlmostEqual(result.success_rate, survival_probability(3, 2), delta=0.015)
+            self.assertLessEqual(result.confidence_interval['lower'], result.average_multiplier)
+            self.assertGreaterEqual(result.confidence_interval['upper'], result.average_multiplier)
+
+    def test_single_pass_counts_are_nested(self):
+        """One shared set of games gives survivor counts that shrink with depth"""
+        request = MonteCarloRequest(mine_count=5, iterations=50000, single_pass=True)
+        result = self.engine.run_monte_carlo_simulation(request)
+        self.assertEqual(result.iterations, 50000)
+
+        counts = self.engine._success_counts(5, [1, 2, 3, 4, 30], 50000, single_pass=True)
+        self.assertGreaterEqual(counts[1], counts[2])
+        self.assertGreaterEqual(counts[2], counts[3])
+        self.assertGreaterEqual(counts[3], counts[4])
+        self.assertEqual(counts[30], 0)
+        self.assertAlmostEqual(counts[2] / 50000, survival_probability(5, 2), delta=0.01)
+
+    def test_seeded_runs_are_reproducible_across_worker_counts(self):
+        """Seeded shards give identical results inline and on a process pool"""
+        request = MonteCarloRequest(mine_count=4, iterations=20000, seed=42)
+        inline = MonteCarloSimulationEngine(batch_size=2048, shard_size=5000)
+        pooled = MonteCarloSimulationEngine(batch_size=2048, shard_size=5000, max_workers=2)
+        try:
+            self.assertEqual(inline.run_monte_carlo_simulation(request).dict(exclude={'id'}),
+                             pooled.run_monte_carlo_simulation(request).dict(exclude={'id'}))
+        finally:
+            pooled.shutdown()
+
+    def test_adaptive_run_stops_when_precision_is_met(self):
+        """Precision-targeted runs report per-point effort and achieved precision"""
+        request = MonteCarloRequest(mine_count=2, iterations=2000, cash_out_points=[1, 8],
+                                    target_relative_error=0.02, max_iterations=200000, seed=3)
+        result = self.engine.run_monte_carlo_simulation(request)
+        self.assertTrue(result.target_met)
+        self.assertEqual(set(result.iterations_used), {'1', '8'})
+        # The shallow point is almost always safe and needs far fewer games
+        self.assertLess(result.iterations_used['1'], result.iterations_used['8'])
+        for precision in result.achieved_precision.values():
+            self.assertLessEqual(precision['relative_error'], 0.02)
+
+    def test_exact_engine_has_no_sampling_error(self):
+        """The exact engine reproduces the closed-form survival curve"""
+        request = MonteCarloRequest(mine_count=6, cash_out_points=[1, 2, 3, 4], engine="exact")
+        result = self.engine.run_monte_carlo_simulation(request)
+        point = result.optimal_cash_out_point
+        self.assertAlmostEqual(result.success_rate, survival_probability(6, point))
+        self.assertEqual(result.confidence_interval['lower'], result.confidence_interval['upper'])
+
+        profile = self.engine.analyze_risk_reward_profile(6, engine="exact")
+        self.assertAlmostEqual(profile[3]['success_rate'], survival_probability(6, 3))
+
+    def test_points_past_the_last_safe_tile_never_pay(self):
+        """Cash-out points beyond the safe tiles are reported as certain losses in every mode"""
+        for options in ({}, {"engine": "exact"}, {"variance_reduction": "importance_sampling"},
+                        {"variance_reduction": "antithetic"}, {"variance_reduction": "control_variate"}):
+            request = MonteCarloRequest(mine_count=24, iterations=10000, cash_out_points=[1, 2], seed=3, **options)
+            result = self.engine.run_monte_carlo_simulation(request)
+            self.assertEqual(result.optimal_cash_out_point, 1)
+
+            if request.engine == "exact":
+                point_results = self.engine._exact_point_results(request, [1, 2])
+            else:
+                point_results = self.engine._vectorized_point_results(request, [1, 2])
+            self.assertEqual(point_results[2]['success_rate'], 0.0)
+            self.assertEqual(point_results[2]['expected_value'], 0.0)
+
+    def test_importance_sampling_estimates_rare_points(self):
+        """Tilted reveals estimate deep cash-out points that naive sampling never reaches"""
+        request = MonteCarloRequest(mine_count=20, iterations=20000, cash_out_points=[2, 5],
+                                    variance_reduction="importance_sampling", seed=5)
+        result = self.engine.run_monte_carlo_simulation(request)
+        point_results = self.engine._variance_reduced_point_results(request, [2, 5])
+        for point in (2, 5):
+            expected = survival_probability(20, point)
+            self.assertAlmostEqual(point_results[point]['success_rate'] / expected, 1.0, delta=0.05)
+        # Naive sampling would need millions of games to see a single success at point 5
+        self.assertGreater(point_results[5]['effective_sample_size'], 1e6)
+        self.assertIsNotNone(result.effective_sample_size)
+
+    def test_antithetic_and_control_variate_reduce_variance(self):
+        """Both modes stay unbiased and beat naive sampling at a mid-depth point"""
+        for variance_reduction, min_factor in (("antithetic", 1.1), ("control_variate", 1.5)):
+            profile = self.engine.analyze_risk_reward_profile(3, iterations=20000, seed=8,
+                                                              variance_reduction=variance_reduction)
+            self.assertAlmostEqual(profile[5]['success_rate'], survival_probability(3, 5), delta=0.01)
+            self.assertGreater(profile[5]['variance_reduction_factor'], min_factor)
+
+        request = MonteCarloRequest(mine_count=3, iterations=20000, cash_out_points=[5],
+                                    variance_reduction="control_variate", seed=8)
+        result = self.engine.run_monte_carlo_simulation(request)
+        self.assertGreater(result.effective_sample_size, result.iterations)
+
+    def test_bankroll_paths_report_ruin_statistics(self):
+        """Small bankrolls on risky settings are usually ruined"""
+        request = BankrollSimulationRequest(mine_count=10, cash_out_point=3, initial_bankroll=5.0,
+                                            bet_size=1.0, num_games=500, num_paths=2000, seed=11)
+        result = self.engine.simulate_bankroll_paths(request)
+        self.assertGreater(result.ruin_probability, 0.5)
+        self.assertLessEqual(result.time_to_ruin_quantiles['p5'], result.time_to_ruin_quantiles['p95'])
+        self.assertEqual(result.percentile_bands[0]['p50'], 5.0)
+        self.assertEqual(result.dict(exclude={'id'}),
+                         self.engine.simulate_bankroll_paths(request).dict(exclude={'id'}))
+
+    def test_exact_distribution_of_policies(self):
+        """Forward propagation gives the exact payout distribution without sampling"""
+        request = PayoutDistributionRequest(mine_count=5, bet_amount=2.0, profit_thresholds=[1.0],
+                                            policy=StrategyPolicySpec(type="fixed", cash_out_point=3))
+        result = self.engine.exact_payout_distribution(request)
+        win = survival_probability(5, 3)
+        multiplier = self.engine.prob_engine.calculate_multiplier(5, 3)
+        self.assertEqual([outcome.outcome for outcome in result.pmf], ["bust", "bust", "bust", "cash_out"])
+        self.assertAlmostEqual(sum(outcome.probability for outcome in result.pmf), 1.0)
+        self.assertAlmostEqual(result.pmf[-1].probability, win)
+        self.assertAlmostEqual(result.mean_profit, 2.0 * (win * multiplier - 1))
+        self.assertAlmostEqual(result.profit_variance, (2.0 * multiplier) ** 2 * win * (1 - win))
+        self.assertAlmostEqual(result.tail_probabilities['loss'], 1 - win)
+        self.assertEqual(result.profit_quantiles['p5'], -2.0)
+        self.assertAlmostEqual(result.profit_quantiles['p95'], 2.0 * (multiplier - 1))
+
+        target = PayoutDistributionRequest(mine_count=3, policy=StrategyPolicySpec(type="target_multiplier",
+                                                                                   target_multiplier=1.5))
+        result = self.engine.exact_payout_distribution(target)
+        self.assertGreaterEqual(result.pmf[-1].multiplier, 1.5)
+        self.assertLess(self.engine.prob_engine.calculate_multiplier(3, result.pmf[-1].tiles_revealed - 1), 1.5)
+
+    def test_risk_profile_reports_every_point(self):
+        """Risk analysis covers all cash-out points up to the safe tile limit"""
+        analysis = self.engine.analyze_risk_reward_profile(22, iterations=5000)
+        self.assertEqual(sorted(analysis), [1, 2, 3])
+        for metrics in analysis.values():
+            self.assertGreaterEqual(metrics['volatility'], 0)
+            self.assertLessEqual(metrics['max_drawdown'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
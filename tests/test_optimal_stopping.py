@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from models import GameSession
+from probability_engine import MinesProbabilityEngine
+
+
+class OptimalStoppingTest(unittest.TestCase):
+    """Unit tests for the backward-induction stopping policy"""
+
+    def setUp(self):
+        self.engine = MinesProbabilityEngine()
+
+    def test_risk_neutral_policy_always_cashes_out(self):
+        """Every reveal loses 5% in expectation, so a risk-neutral player never continues"""
+        policy = self.engine.optimal_policy()
+        self.assertEqual(set(policy.optimal_points.values()), {0})
+        for mine_count in range(1, 25):
+            self.assertEqual(self.engine.calculate_optimal_stopping_point(mine_count), 0)
+            continue_ce, stop_ce = policy.certainty_equivalents(mine_count, 0)
+            self.assertAlmostEqual(continue_ce, 0.95, places=3)
+            self.assertEqual(stop_ce, 1.0)
+
+    def test_utility_objectives_change_the_policy(self):
+        """Risk seekers chase the long shots that risk-averse players avoid"""
+        seeking = self.engine.optimal_policy("crra", risk_aversion=-1.0)
+        self.assertEqual(seeking.optimal_points[24], 1)
+        for objective in ("crra", "cara"):
+            averse = self.engine.optimal_policy(objective, risk_aversion=2.0)
+            self.assertEqual(set(averse.optimal_points.values()), {0})
+
+    def test_policies_are_memoized_per_objective(self):
+        """Parameters an objective ignores reuse the same solution"""
+        self.assertIs(self.engine.optimal_policy(), self.engine.optimal_policy("risk_neutral", 3.0, 50.0))
+        self.assertIs(self.engine.optimal_policy("cara", 0.5), self.engine.optimal_policy("cara", 0.5, 10.0))
+        # Exponential utility of the deepest multipliers overflows for risk seekers
+        with self.assertRaises(ValueError):
+            self.engine.optimal_policy("cara", risk_aversion=-0.5)
+        with self.assertRaises(ValueError):
+            self.engine.optimal_policy("kelly")
+
+    def test_recommendations_follow_the_policy(self):
+        """Recommendations read their action from the solved policy"""
+        game_session = GameSession(mine_count=24, bet_amount=1.0, current_multiplier=1.0, tiles_revealed=0)
+        self.assertEqual(self.engine.generate_strategy_recommendation(game_session).action, "cash_out")
+        recommendation = self.engine.generate_strategy_recommendation(game_session, "crra", -1.0)
+        self.assertEqual(recommendation.action, "continue")
+        self.assertLessEqual(recommendation.confidence, 0.95)
+
+        finished = GameSession(mine_count=24, bet_amount=1.0, current_multiplier=23.75, tiles_revealed=1)
+        recommendation = self.engine.generate_strategy_recommendation(finished, "crra", -1.0)
+        self.assertEqual(recommendation.action, "cash_out")
+        self.assertEqual(recommendation.confidence, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
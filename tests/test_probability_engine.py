@@ -0,0 +1,99 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from models import GameSession
+from probability_engine import MinesProbabilityEngine
+
+
+def reference_multiplier(mines: int, tiles_revealed: int) -> float:
+    """The original product-loop multiplier"""
+    if tiles_revealed == 0:
+        return 1.0
+    multiplier = 1.0
+    for i in range(tiles_revealed):
+        multiplier *= (25 - i) / (25 - mines - i) * 0.95
+    return round(multiplier, 4)
+
+
+class ProbabilityTablesTest(unittest.TestCase):
+    """Unit tests for the precomputed probability tables"""
+
+    def setUp(self):
+        self.engine = MinesProbabilityEngine()
+
+    def test_lookups_match_the_scalar_formulas(self):
+        """Table lookups reproduce the loop formulas exactly for every reachable state"""
+        for mines in range(1, 25):
+            survival = 1.0
+            for tiles in range(26 - mines):
+                self.assertEqual(self.engine.calculate_multiplier(mines, tiles), reference_multiplier(mines, tiles))
+                self.assertEqual(self.engine.calculate_survival_probability(mines, tiles), survival)
+                if tiles < 25 - mines:
+                    survival *= (25 - mines - tiles) / (25 - tiles)
+            self.assertEqual(self.engine.calculate_survival_probability(mines, 26 - mines), 0.0)
+
+    def test_rows_give_whole_curves(self):
+        """Rows expose the EV curve and step probabilities for one mine count"""
+        row = self.engine.expected_value_table[3]
+        self.assertAlmostEqual(row[2], self.engine.survival_table[3, 2] * self.engine.multiplier_table[3, 2])
+        self.assertAlmostEqual(self.engine.step_safe_table[3, 0], 22 / 25)
+        self.assertEqual(self.engine.multiplier_table[3, 23], 0.0)
+        self.assertFalse(self.engine.multiplier_table.flags.writeable)
+
+    def test_finished_games_can_be_analyzed(self):
+        """A game with every safe tile revealed has nothing left to gain"""
+        finished = GameSession(mine_count=24, bet_amount=1.0, current_multiplier=23.75, tiles_revealed=1)
+        analysis = self.engine.analyze_game_state(finished)
+        self.assertEqual(analysis.safe_probability, 0.0)
+        self.assertEqual(analysis.expected_value, 0.0)
+        self.assertTrue(analysis.optimal_cash_out)
+
+    def test_batch_analysis_matches_single_states(self):
+        """Vectorized analysis and recommendations agree with the per-game methods"""
+        sessions = [
+            GameSession(mine_count=mines, bet_amount=2.5, tiles_revealed=tiles,
+                        current_multiplier=self.engine.calculate_multiplier(mines, tiles))
+            for mines in range(1, 25) for tiles in range(25 - mines)
+        ]
+        columns = ([s.mine_count for s in sessions], [s.tiles_revealed for s in sessions],
+                   [s.current_multiplier for s in sessions], [s.bet_amount for s in sessions])
+        analyses = self.engine.analyze_game_states(*columns)
+        for objective, risk_aversion in (("risk_neutral", 0.0), ("crra", -1.0)):
+            recommendations = self.engine.generate_strategy_recommendations(*columns, objective, risk_aversion,
+                                                                            analyses=analyses)
+            for session, analysis, recommendation in zip(sessions, analyses, recommendations):
+                self.assertEqual(analysis, self.engine.analyze_game_state(session))
+                self.assertEqual(recommendation,
+                                 self.engine.generate_strategy_recommendation(session, objective, risk_aversion))
+
+    def test_recommendations_are_memoized_across_bets(self):
+        """Bets share one memo entry and only rescale the expected values"""
+        multiplier = self.engine.calculate_multiplier(3, 2)
+        small = GameSession(mine_count=3, bet_amount=1.0, current_multiplier=multiplier, tiles_revealed=2)
+        large = GameSession(mine_count=3, bet_amount=250.0, current_multiplier=multiplier, tiles_revealed=2)
+        first = self.engine.generate_strategy_recommendation(small)
+        second = self.engine.generate_strategy_recommendation(large)
+        stats = self.engine.recommendation_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+        self.assertEqual((first.action, first.reasoning, first.confidence),
+                         (second.action, second.reasoning, second.confidence))
+        self.assertEqual(second.expected_value, self.engine.analyze_game_state(large).expected_value)
+        self.assertEqual(first.expected_value, self.engine.analyze_game_state(small).expected_value)
+
+        # A stored multiplier that drifted in the last digits is still the same state
+        rounded = GameSession(mine_count=3, bet_amount=1.0, current_multiplier=round(multiplier, 2), tiles_revealed=2)
+        third = self.engine.generate_strategy_recommendation(rounded)
+        self.assertEqual(self.engine.recommendation_cache_stats()['entries'], 1)
+        self.assertEqual(third.expected_value, self.engine.analyze_game_state(rounded).expected_value)
+
+        self.engine.generate_strategy_recommendation(large, "crra", -1.0)
+        self.assertEqual(self.engine.recommendation_cache_stats()['entries'], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from game_config import GameConfig
+from models import ProvablyFairVerification
+from provably_fair import ProvablyFairSystem, verify_chunk
+
+# Outputs of the original list-scan implementation, which the rewrite must reproduce exactly
+GOLDEN_VECTORS = [
+    ("a" * 64, "client", 0, 1, [19]),
+    ("a" * 64, "client", 0, 3, [6, 19, 22]),
+    ("5f2c" * 16, "lucky-seed", 7, 8, [1, 5, 9, 14, 16, 17, 20, 23]),
+    ("5f2c" * 16, "lucky-seed", 7, 9, [1, 5, 9, 14, 16, 17, 18, 20, 23]),
+    ("0123456789abcdef" * 4, "abc", 42, 24,
+     [0, 1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24]),
+    ("0123456789abcdef" * 4, "abc", 1000000, 17, [0, 1, 3, 6, 8, 9, 12, 13, 14, 15, 16, 17, 18, 20, 22, 23, 24]),
+]
+
+
+class ProvablyFairTest(unittest.TestCase):
+    """Unit tests for provably fair mine placement"""
+
+    def setUp(self):
+        self.system = ProvablyFairSystem()
+
+    def test_golden_vectors(self):
+        """Layouts match the original generator, including after HMAC refills"""
+        for server_seed, client_seed, nonce, mine_count, expected in GOLDEN_VECTORS:
+            self.assertEqual(self.system.generate_game_result(server_seed, client_seed, nonce, mine_count), expected)
+
+    def test_larger_boards_refill_repeatedly(self):
+        """Boards needing several HMAC blocks keep the original refill labels"""
+        system = ProvablyFairSystem(GameConfig(name="test_pf_6x6", rows=6, columns=6))
+        self.assertEqual(
+            system.generate_game_result("ff" * 32, "x", 3, 30),
+            [0, 2, 3, 4, 5, 6, 7, 9, 10, 11, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 26, 27, 28, 29, 30,
+             31, 32, 34, 35]
+        )
+
+    def test_batch_matches_single_games(self):
+        """A nonce range gives the same layouts as generating each game on its own"""
+        layouts = self.system.generate_game_results("a" * 64, "client", 5, 50, 4)
+        self.assertEqual(len(layouts), 50)
+        for offset, layout in enumerate(layouts):
+            self.assertEqual(layout, self.system.generate_game_result("a" * 64, "client", 5 + offset, 4))
+        self.assertEqual(self.system.generate_game_results("a" * 64, "client", 0, 1, 3), [[6, 19, 22]])
+
+    def test_bulk_records_match_single_verification(self):
+        """Bulk verification accepts parsed objects and raw NDJSON lines and flags bad records"""
+        server_seed = "5f2c" * 16
+        records = [
+            {"server_seed": server_seed, "client_seed": "lucky-seed", "nonce": 7,
+             "game_result": [1, 5, 9, 14, 16, 17, 18, 20, 23]},
+            '{"server_seed": "%s", "client_seed": "lucky-seed", "nonce": 7, "game_result": [0, 1, 2]}' % server_seed,
+            '{"server_seed": "not hex"',
+            {"server_seed": "zz", "client_seed": "c", "nonce": 1, "game_result": [1]},
+        ]
+        results = verify_chunk(self.system.config, 10, records)
+        self.assertEqual([result['index'] for result in results], [10, 11, 12, 13])
+        self.assertTrue(results[0]['is_valid'])
+        self.assertFalse(results[1]['is_valid'])
+        self.assertNotIn('error', results[1])
+        self.assertIn('error', results[2])
+        self.assertIn('error', results[3])
+
+        single = self.system.verify_game_result(ProvablyFairVerification(
+            server_seed=server_seed, client_seed="lucky-seed", nonce=7, game_result=[1, 5, 9, 14, 16, 17, 18, 20, 23],
+            is_valid=False, verification_hash=""
+        ))
+        self.assertEqual(single.verification_hash, results[0]['verification_hash'])
+        self.assertEqual(single.game_result, results[0]['expected_result'])
+
+    def test_seed_pool_serves_committed_seeds(self):
+        """Pooled seeds come with matching hashes and an empty pool falls back to inline generation"""
+        system = ProvablyFairSystem(seed_pool_size=4)
+        self.assertEqual(system.refill_seed_pool(), 4)
+        self.assertEqual(system.refill_seed_pool(), 0)
+        seeds = [system.take_committed_seed() for _ in range(5)]
+        for server_seed, server_seed_hash in seeds:
+            self.assertEqual(system.create_seed_hash(server_seed), server_seed_hash)
+        self.assertEqual(len({server_seed for server_seed, _ in seeds}), 5)
+        self.assertEqual(system.seed_pool_stats(), {"available": 0, "capacity": 4, "misses": 1})
+
+        setup = system.create_game_setup("client")
+        self.assertEqual(setup['client_seed'], "client")
+        self.assertEqual(system.create_seed_hash(setup['server_seed']), setup['server_seed_hash'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from pymongo import ReturnDocument
+
+from provably_fair import ProvablyFairSystem
+from seed_vault import SeedPairInUse, SeedVault
+
+
+def matches(doc, query):
+    """Field equality plus the $in and $gt operators; a missing field reads as None"""
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$gt" in condition and (value is None or value <= condition["$gt"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCollection:
+    """In-memory stand-in for the seed_pairs collection"""
+
+    def __init__(self):
+        self.docs = []
+
+    def _find(self, query):
+        for doc in self.docs:
+            if matches(doc, query):
+                return doc
+        return None
+
+    @staticmethod
+    def _apply(doc, update):
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        doc.update(update.get("$set", {}))
+
+    async def create_index(self, keys, **kwargs):
+        pass
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def find_one(self, query, projection=None):
+        doc = self._find(query)
+        return dict(doc) if doc else None
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=ReturnDocument.BEFORE):
+        doc = self._find(query)
+        if doc is None:
+            return None
+        before = dict(doc)
+        self._apply(doc, update)
+        return dict(doc) if return_document == ReturnDocument.AFTER else before
+
+    async def update_one(self, query, update):
+        doc = self._find(query)
+        if doc is not None:
+            self._apply(doc, update)
+
+
+class SeedVaultTest(unittest.TestCase):
+    """Unit tests for per-user seed pairs"""
+
+    def setUp(self):
+        self.pairs = FakeCollection()
+        self.vault = SeedVault(self.pairs, ProvablyFairSystem())
+
+    def test_nonces_advance_on_one_pair(self):
+        """Games on the same client seed share the pair and take consecutive nonces"""
+        async def scenario():
+            first = await self.vault.next_game("alice", "lucky")
+            second = await self.vault.next_game("alice", "lucky")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first["seed_pair_id"], second["seed_pair_id"])
+        self.assertEqual((first["nonce"], second["nonce"]), (0, 1))
+        self.assertEqual(first["server_seed_hash"], ProvablyFairSystem().create_seed_hash(first["server_seed"]))
+
+    def test_server_seed_stays_secret_while_games_are_active(self):
+        """Neither rotation path reveals a seed that an unfinished game was played on"""
+        async def scenario():
+            setup = await self.vault.next_game("alice", "lucky")
+            self.assertEqual((await self.vault.get_active("alice")).active_games, 1)
+
+            with self.assertRaises(SeedPairInUse):
+                await self.vault.rotate("alice")
+            self.assertIsNone((await self.vault.get_pair(setup["seed_pair_id"])).server_seed)
+
+            # A new client seed is refused rather than silently replaced by the pair's
+            with self.assertRaises(SeedPairInUse):
+                await self.vault.next_game("alice", "unlucky")
+            pair = await self.vault.get_pair(setup["seed_pair_id"])
+            self.assertIsNone(pair.server_seed)
+            self.assertEqual((pair.nonce, pair.active_games), (1, 1))
+
+            await self.vault.finish_game(setup["seed_pair_id"])
+            rotation = await self.vault.rotate("alice", "unlucky")
+            return setup, rotation
+
+        setup, rotation = asyncio.run(scenario())
+        self.assertEqual(rotation.revealed.server_seed, setup["server_seed"])
+        self.assertNotEqual(rotation.active.id, setup["seed_pair_id"])
+        self.assertIsNone(rotation.active.server_seed)
+        self.assertEqual(rotation.active.client_seed, "unlucky")
+
+
+if __name__ == "__main__":
+    unittest.main()
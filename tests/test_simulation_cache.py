@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from simulation_cache import SimulationCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SimulationCacheTest(unittest.TestCase):
+    """Unit tests for the in-process tier of the simulation result cache"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = SimulationCache(max_entries=2, ttl_seconds=10, clock=self.clock)
+
+    def test_keys_ignore_parameter_order_but_not_version(self):
+        """Keys are stable across dict ordering and change with the formula version"""
+        key = self.cache.make_key("risk_analysis", {"mine_count": 3, "iterations": 10000})
+        self.assertEqual(key, self.cache.make_key("risk_analysis", {"iterations": 10000, "mine_count": 3}))
+        self.assertNotEqual(key, self.cache.make_key("monte_carlo", {"mine_count": 3, "iterations": 10000}))
+        other_version = SimulationCache(version="test")
+        self.assertNotEqual(key, other_version.make_key("risk_analysis", {"mine_count": 3, "iterations": 10000}))
+
+    def test_lru_eviction_and_ttl_expiry(self):
+        """Least recently used entries are evicted first and stale entries miss"""
+        async def scenario():
+            await self.cache.set("risk_analysis", {"mine_count": 1}, {"value": 1})
+            await self.cache.set("risk_analysis", {"mine_count": 2}, {"value": 2})
+            self.assertEqual(await self.cache.get("risk_analysis", {"mine_count": 1}), {"value": 1})
+            await self.cache.set("risk_analysis", {"mine_count": 3}, {"value": 3})
+            self.assertIsNone(await self.cache.get("risk_analysis", {"mine_count": 2}))
+
+            self.clock.now = 11
+            self.assertIsNone(await self.cache.get("risk_analysis", {"mine_count": 1}))
+
+        asyncio.run(scenario())
+        stats = self.cache.stats()
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_invalidate_by_namespace(self):
+        """Invalidation can target one endpoint's results"""
+        async def scenario():
+            await self.cache.set("risk_analysis", {"mine_count": 1}, {"value": 1})
+            await self.cache.set("monte_carlo", {"mine_count": 1}, {"value": 2})
+            self.assertEqual(await self.cache.invalidate("monte_carlo"), 1)
+            self.assertIsNone(await self.cache.get("monte_carlo", {"mine_count": 1}))
+            self.assertIsNotNone(await self.cache.get("risk_analysis", {"mine_count": 1}))
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from models import JobStatus
+from simulation_jobs import SimulationJobManager
+
+
+class FakeCollection:
+    """In-memory stand-in for the simulation_jobs collection, keyed by job id"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def insert_one(self, doc):
+        self.docs[doc["id"]] = dict(doc)
+
+    async def update_one(self, query, update):
+        doc = self.docs.get(query["id"])
+        if doc is not None and all(doc.get(field) == value for field, value in query.items()):
+            doc.update(update["$set"])
+
+    async def replace_one(self, query, doc):
+        self.docs[query["id"]] = dict(doc)
+
+    async def find_one(self, query):
+        doc = self.docs.get(query["id"])
+        return dict(doc) if doc else None
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.simulation_jobs = FakeCollection()
+
+
+class SimulationJobManagerTest(unittest.TestCase):
+    """Unit tests for background simulation jobs"""
+
+    def setUp(self):
+        self.db = FakeDatabase()
+        self.manager = SimulationJobManager(self.db)
+
+    def run_job(self, on_result):
+        """Submit a job that returns 42 and collect every event streamed for it"""
+        async def scenario():
+            job = await self.manager.submit("monte_carlo", {}, lambda progress, cancel_event: 42,
+                                            lambda result: {"value": result}, on_result)
+            events = [event async for event in self.manager.stream(job.id) if event is not None]
+            return job, events
+
+        return asyncio.run(scenario())
+
+    def test_completed_jobs_store_their_result(self):
+        """A successful run is stored once and reported as completed"""
+        stored = []
+
+        async def on_result(result):
+            stored.append(result)
+
+        job, events = self.run_job(on_result)
+        self.assertEqual(stored, [42])
+        self.assertEqual(events[-1]["status"], JobStatus.COMPLETED)
+        self.assertEqual(self.db.simulation_jobs.docs[job.id]["result"], {"value": 42})
+
+    def test_failing_result_hook_fails_the_job(self):
+        """An error while storing the result ends the job as failed instead of leaving it running"""
+        async def on_result(result):
+            raise RuntimeError("cache unavailable")
+
+        job, events = self.run_job(on_result)
+        self.assertEqual(events[-1]["status"], JobStatus.FAILED)
+        self.assertEqual(events[-1]["error"], "cache unavailable")
+
+        stored = self.db.simulation_jobs.docs[job.id]
+        self.assertEqual(stored["status"], JobStatus.FAILED)
+        self.assertIsNone(stored["result"])
+        self.assertEqual(asyncio.run(self.manager.get(job.id)).status, JobStatus.FAILED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from single_flight import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+    """Unit tests for request coalescing"""
+
+    def test_concurrent_identical_requests_share_one_computation(self):
+        """Only the first caller computes; the rest await its result"""
+        flights = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": len(calls)}
+
+        async def scenario():
+            results = await asyncio.gather(*(flights.do("risk:3", compute) for _ in range(5)))
+            later = await flights.do("risk:3", compute)
+            return results, later
+
+        results, later = asyncio.run(scenario())
+        self.assertEqual(results, [{"value": 1}] * 5)
+        self.assertEqual(later, {"value": 2})
+        self.assertEqual(flights.stats(), {"in_flight": 0, "executions": 2, "coalesced_requests": 4})
+
+    def test_errors_reach_every_waiter(self):
+        """A failed computation is reported to all coalesced callers"""
+        flights = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def scenario():
+            return await asyncio.gather(*(flights.do("mc", compute) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from models import StrategyComparisonRequest, StrategyPolicySpec
+from monte_carlo_engine import MonteCarloSimulationEngine
+from probability_engine import MinesProbabilityEngine
+from strategy_policies import FixedCashOutPolicy, RecommendationPolicy, StrategyPolicy, TargetMultiplierPolicy
+
+
+class StrategyPolicyTest(unittest.TestCase):
+    """Unit tests for compiled strategy policies and their batched comparison"""
+
+    def setUp(self):
+        self.prob_engine = MinesProbabilityEngine()
+        self.engine = MonteCarloSimulationEngine(batch_size=4096)
+
+    def test_compiled_tables_stop_where_the_rule_says(self):
+        """Compiled tables reproduce each policy's stopping point"""
+        fixed = FixedCashOutPolicy(4)
+        self.assertEqual(fixed.cash_out_point(fixed.compile(self.prob_engine), 3), 4)
+        # Cannot reveal more tiles than are safe
+        self.assertEqual(fixed.cash_out_point(fixed.compile(self.prob_engine), 23), 2)
+
+        target = TargetMultiplierPolicy(2.0)
+        point = target.cash_out_point(target.compile(self.prob_engine), 5)
+        self.assertGreaterEqual(self.prob_engine.calculate_multiplier(5, point), 2.0)
+        self.assertLess(self.prob_engine.calculate_multiplier(5, point - 1), 2.0)
+
+        recommendation = RecommendationPolicy()
+        table = recommendation.compile(self.prob_engine)
+        self.assertEqual(table.shape, (25, 26))
+        self.assertFalse(table[24, 1])
+
+    def test_policies_without_a_stopping_rule_cannot_be_created(self):
+        """A subclass that leaves should_continue out fails when built, not inside a simulation"""
+        class IncompletePolicy(StrategyPolicy):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompletePolicy("incomplete")
+
+    def test_equivalent_policies_tie_on_common_random_numbers(self):
+        """Policies that stop at the same point play identical sessions"""
+        target = TargetMultiplierPolicy(2.0)
+        point = target.cash_out_point(target.compile(self.prob_engine), 5)
+        request = StrategyComparisonRequest(
+            mine_count=5, games_per_session=50, num_sessions=2000, seed=4,
+            policies=[
+                StrategyPolicySpec(type="fixed", cash_out_point=point),
+                StrategyPolicySpec(type="target_multiplier", target_multiplier=2.0),
+                StrategyPolicySpec(type="fixed", cash_out_point=point, stop_loss=5.0)
+            ]
+        )
+        result = self.engine.compare_strategies(request)
+        first, second, limited = result.evaluations
+        self.assertEqual(first.mean_session_profit, second.mean_session_profit)
+        self.assertEqual(result.head_to_head[0]['tie_probability'], 1.0)
+
+        # Sessions that hit the stop-loss end early
+        self.assertGreater(limited.stop_loss_rate, 0)
+        self.assertLess(limited.average_games_played, first.average_games_played)
+        self.assertEqual(self.engine.compare_strategies(request).dict(exclude={'id'}), result.dict(exclude={'id'}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import statistics
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import numpy as np
+
+from streaming_stats import RunningStats
+
+
+class RunningStatsTest(unittest.TestCase):
+    """Unit tests for the constant-memory running statistics"""
+
+    def setUp(self):
+        self.values = [((i * 7919) % 101) / 10 - 3 for i in range(500)]
+
+    def test_matches_batch_statistics(self):
+        """Welford updates agree with the statistics module"""
+        stats = RunningStats()
+        for value in self.values:
+            stats.update(value)
+        self.assertAlmostEqual(stats.mean, statistics.mean(self.values))
+        self.assertAlmostEqual(stats.variance, statistics.variance(self.values))
+        self.assertEqual(stats.minimum, min(self.values))
+        self.assertEqual(stats.maximum, max(self.values))
+
+    def test_merge_blocks_and_constants(self):
+        """Merged shards, blocks and repeated values give the same moments"""
+        left, right = RunningStats(), RunningStats()
+        left.update_batch(np.array(self.values[:123]))
+        right.update_batch(np.array(self.values[123:]))
+        left.merge(right)
+        self.assertAlmostEqual(left.mean, statistics.mean(self.values))
+        self.assertAlmostEqual(left.variance, statistics.variance(self.values))
+
+        constant = RunningStats()
+        constant.update_constant(2.5, 30)
+        constant.update_constant(0.0, 70)
+        expanded = [2.5] * 30 + [0.0] * 70
+        self.assertAlmostEqual(constant.mean, statistics.mean(expanded))
+        self.assertAlmostEqual(constant.variance, statistics.variance(expanded))
+        self.assertEqual(constant.minimum, 0.0)
+
+    def test_empty_statistics(self):
+        """No observations report zero spread"""
+        stats = RunningStats()
+        self.assertEqual(stats.count, 0)
+        self.assertEqual(stats.variance, 0.0)
+        self.assertEqual(stats.stdev, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()